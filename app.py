@@ -2,13 +2,24 @@ import os
 
 from flask import Flask
 
+from core.assets import asset_bundle, init_assets
+from core.compression import init_compression
 from core.config import (
     DOC_UPLOAD_FOLDER,
+    JOB_UPLOAD_FOLDER,
     SECRET_KEY,
     SPOT_UPLOAD_FOLDER,
     UPLOAD_FOLDER,
 )
 from core.db import ensure_runtime_schema
+from core.db_stats import init_db_stats
+from core.images import image_variant_path, responsive_image
+from core.metrics import init_metrics
+from core.page_cache import init_page_cache
+from core.profiler import init_profiler
+from core.static_files import init_static_files
+from core.storage import init_upload_limits
+from core.templating import init_template_timing
 from routes import register_all_routes
 
 
@@ -18,6 +29,7 @@ def create_app():
     app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
     app.config["DOC_UPLOAD_FOLDER"] = DOC_UPLOAD_FOLDER
     app.config["SPOT_UPLOAD_FOLDER"] = SPOT_UPLOAD_FOLDER
+    app.config["JOB_UPLOAD_FOLDER"] = JOB_UPLOAD_FOLDER
 
     try:
         ensure_runtime_schema()
@@ -25,6 +37,20 @@ def create_app():
         # Keep app boot resilient even if DB is temporarily unavailable.
         print(f"[schema-warning] Could not ensure runtime schema: {exc}")
 
+    app.jinja_env.globals.update(
+        asset_bundle=asset_bundle,
+        image_variant_path=image_variant_path,
+        responsive_image=responsive_image,
+    )
+    init_metrics(app)
+    init_db_stats(app)
+    init_profiler(app)
+    init_template_timing(app)
+    init_page_cache(app)
+    init_static_files(app)
+    init_assets(app)
+    init_upload_limits(app)
+    init_compression(app)
     register_all_routes(app)
     return app
 
@@ -36,4 +62,5 @@ if __name__ == "__main__":
     os.makedirs(app.config["UPLOAD_FOLDER"], exist_ok=True)
     os.makedirs(app.config["DOC_UPLOAD_FOLDER"], exist_ok=True)
     os.makedirs(app.config["SPOT_UPLOAD_FOLDER"], exist_ok=True)
+    os.makedirs(app.config["JOB_UPLOAD_FOLDER"], exist_ok=True)
     app.run(debug=True, port=5001)
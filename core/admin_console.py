@@ -0,0 +1,404 @@
+"""Paginated admin console tables and the cached dashboard summary."""
+
+import base64
+import json
+import threading
+import time
+from datetime import date, datetime
+from decimal import Decimal
+
+from core.config import ADMIN_PAGE_SIZE, ADMIN_PAGE_SIZE_MAX, ADMIN_SUMMARY_TTL_SECONDS
+from core.db import query_db
+from core.helpers import to_int
+
+
+_TOUR_LIFECYCLE_SQL = {
+    "upcoming": "t.start_date > CURDATE()",
+    "current": "t.start_date <= CURDATE() AND t.end_date >= CURDATE()",
+    "completed": "t.end_date < CURDATE()",
+}
+
+# Each table is one SELECT plus the filters/sorts an admin may apply to it.
+# Sort expressions must be non-NULL so the (sort value, id) keyset cursor is
+# totally ordered; the id column breaks ties.
+ADMIN_TABLES = {
+    "users": {
+        "select": """
+            SELECT
+                u.id, u.full_name, u.email, u.phone, u.role, u.status,
+                up.provider_category, up.business_name, up.kyc_stage, up.verification_badge
+            FROM users u
+            LEFT JOIN user_profiles up ON up.user_id=u.id
+        """,
+        "id_col": "u.id",
+        "search": ("u.full_name", "u.email", "u.phone"),
+        "filters": {"role": "u.role=%s", "status": "u.status=%s"},
+        "sorts": {"id": "u.id", "name": "COALESCE(u.full_name, '')", "role": "COALESCE(u.role, '')"},
+    },
+    "pending_users": {
+        "select": """
+            SELECT
+                u.id, u.full_name, u.email, u.phone, u.role, u.status, u.document_path,
+                up.requested_role, up.business_name, up.provider_category,
+                up.kyc_completed, up.kyc_stage, up.verification_badge, up.admin_note,
+                up.identity_proof_path, up.business_proof_path, up.property_proof_path,
+                up.vehicle_proof_path, up.driver_verification_path, up.bank_proof_path,
+                up.address_proof_path, up.operational_photo_path
+            FROM users u
+            LEFT JOIN user_profiles up ON up.user_id = u.id
+        """,
+        "id_col": "u.id",
+        "where": ("u.status='pending'",),
+        "search": ("u.full_name", "u.email", "u.phone"),
+        "filters": {"role": "u.role=%s"},
+        "sorts": {"id": "u.id"},
+    },
+    "tours": {
+        "select": """
+            SELECT
+                t.id, t.title, t.start_point, t.end_point, t.start_date, t.end_date, t.price,
+                CASE
+                    WHEN t.start_date > CURDATE() THEN 'upcoming'
+                    WHEN t.start_date <= CURDATE() AND t.end_date >= CURDATE() THEN 'current'
+                    WHEN t.end_date < CURDATE() THEN 'completed'
+                    ELSE 'unknown'
+                END AS lifecycle_status
+            FROM tours t
+        """,
+        "id_col": "t.id",
+        "search": ("t.title", "t.start_point", "t.end_point"),
+        "filters": {},
+        "choice_filters": {"lifecycle": _TOUR_LIFECYCLE_SQL},
+        "sorts": {
+            "id": "t.id",
+            "start_date": "COALESCE(t.start_date, '1000-01-01')",
+            "price": "COALESCE(t.price, 0)",
+        },
+    },
+    "services": {
+        "select": """
+            SELECT
+                s.id, s.service_name, s.service_type, s.price,
+                u.full_name AS provider_name, c.city_name
+            FROM services s
+            LEFT JOIN users u ON u.id=s.provider_id
+            LEFT JOIN cities c ON c.id=s.city_id
+        """,
+        "id_col": "s.id",
+        "search": ("s.service_name", "u.full_name", "c.city_name"),
+        "filters": {"service_type": "s.service_type=%s"},
+        "sorts": {"id": "s.id", "name": "COALESCE(s.service_name, '')", "price": "COALESCE(s.price, 0)"},
+    },
+    "bookings": {
+        "select": """
+            SELECT
+                b.id, b.date, b.status, u.full_name, t.title
+            FROM bookings b
+            JOIN users u ON u.id=b.user_id
+            JOIN tours t ON t.id=b.tour_id
+        """,
+        "id_col": "b.id",
+        "search": ("u.full_name", "t.title"),
+        "filters": {"status": "b.status=%s"},
+        "sorts": {"id": "b.id"},
+        "page_size": 20,
+    },
+    "spot_requests": {
+        "select": """
+            SELECT
+                r.id,
+                r.organizer_id,
+                r.request_type,
+                r.status,
+                r.spot_id,
+                r.city_id,
+                r.spot_name,
+                r.image_url,
+                r.photo_source,
+                r.latitude,
+                r.longitude,
+                r.spot_details,
+                r.admin_note,
+                r.created_at,
+                u.full_name AS organizer_name,
+                u.email AS organizer_email,
+                c.city_name,
+                s.state_name,
+                ms.spot_name AS current_spot_name,
+                ms.image_url AS current_image_url,
+                ms.photo_source AS current_photo_source
+            FROM spot_change_requests r
+            JOIN users u ON u.id=r.organizer_id
+            LEFT JOIN cities c ON c.id=r.city_id
+            LEFT JOIN states s ON s.id=c.state_id
+            LEFT JOIN master_spots ms ON ms.id=r.spot_id
+        """,
+        "id_col": "r.id",
+        "search": ("r.spot_name", "u.full_name", "c.city_name"),
+        "filters": {"status": "r.status=%s", "request_type": "r.request_type=%s"},
+        "defaults": {"status": "pending"},
+        "sorts": {"id": "r.id"},
+    },
+    "reviews": {
+        "select": """
+            SELECT
+                r.id,
+                r.target_type,
+                r.target_id,
+                r.rating,
+                r.review_text,
+                r.created_at,
+                u.full_name AS user_name,
+                u.role AS user_role
+            FROM platform_reviews r
+            JOIN users u ON u.id=r.user_id
+        """,
+        "id_col": "r.id",
+        "search": ("r.review_text", "u.full_name"),
+        "filters": {"target_type": "r.target_type=%s", "rating": "r.rating=%s"},
+        "sorts": {"id": "r.id", "rating": "COALESCE(r.rating, 0)"},
+    },
+    "issues": {
+        "select": """
+            SELECT
+                s.id,
+                s.user_id,
+                s.user_role,
+                s.subject,
+                s.issue_text,
+                s.status,
+                s.admin_note,
+                s.created_at,
+                s.updated_at,
+                u.full_name AS user_name
+            FROM support_issues s
+            JOIN users u ON u.id=s.user_id
+        """,
+        "id_col": "s.id",
+        "search": ("s.subject", "s.issue_text", "u.full_name"),
+        "filters": {"status": "s.status=%s"},
+        "sorts": {"id": "s.id"},
+    },
+    "approval_logs": {
+        "select": """
+            SELECT
+                l.id, l.created_at, l.action_taken, l.note,
+                u.full_name AS target_user_name,
+                a.full_name AS admin_name
+            FROM user_approval_logs l
+            JOIN users u ON u.id=l.user_id
+            JOIN users a ON a.id=l.admin_id
+        """,
+        "id_col": "l.id",
+        "filters": {"action": "l.action_taken=%s"},
+        "sorts": {"id": "l.id"},
+        "page_size": 30,
+    },
+}
+
+
+def _cursor_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat(sep=" ") if isinstance(value, datetime) else value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _encode_cursor(sort, order, sort_value, row_id):
+    raw = json.dumps([sort, order, _cursor_value(sort_value), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor, sort, order):
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, cursor_order, sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError):
+        return None
+    # A cursor from another sort/order would skip or repeat rows; restart instead.
+    if cursor_sort != sort or cursor_order != order or not isinstance(row_id, int):
+        return None
+    return sort_value, row_id
+
+
+def table_args(args, table_key):
+    """Pick ``<table_key>_<name>`` query args out of a shared admin page URL."""
+    prefix = f"{table_key}_"
+    return {key[len(prefix) :]: value for key, value in args.items() if key.startswith(prefix)}
+
+
+def fetch_admin_page(table_key, params):
+    """Return one keyset page of an admin table.
+
+    ``params`` may carry ``q``, the table's filter names, ``sort``, ``order``
+    (``asc``/``desc``), ``limit`` and ``cursor`` (from a previous page's
+    ``next_cursor``).
+    """
+    spec = ADMIN_TABLES[table_key]
+    params = dict(params or {})
+    for key, value in spec.get("defaults", {}).items():
+        params.setdefault(key, value)
+
+    sort = params.get("sort") if params.get("sort") in spec["sorts"] else "id"
+    order = "asc" if (params.get("order") or "").lower() == "asc" else "desc"
+    default_size = spec.get("page_size", ADMIN_PAGE_SIZE)
+    limit = max(1, min(to_int(params.get("limit"), default_size) or default_size, ADMIN_PAGE_SIZE_MAX))
+    sort_expr = spec["sorts"][sort]
+    id_col = spec["id_col"]
+
+    clauses = list(spec.get("where", ()))
+    args = []
+    applied = {}
+    search = (params.get("q") or "").strip()
+    if search and spec.get("search"):
+        clauses.append("(" + " OR ".join(f"{col} LIKE %s" for col in spec["search"]) + ")")
+        args.extend([f"%{search}%"] * len(spec["search"]))
+        applied["q"] = search
+    for name, sql in spec.get("filters", {}).items():
+        value = (params.get(name) or "").strip()
+        if not value:
+            continue
+        applied[name] = value
+        # "all" is kept in the links so it can override a table default.
+        if value != "all":
+            clauses.append(sql)
+            args.append(value)
+    for name, choices in spec.get("choice_filters", {}).items():
+        value = (params.get(name) or "").strip()
+        if value in choices:
+            clauses.append(f"({choices[value]})")
+            applied[name] = value
+
+    after = _decode_cursor(params.get("cursor"), sort, order)
+    if after is not None:
+        op = ">" if order == "asc" else "<"
+        if sort == "id":
+            clauses.append(f"{id_col} {op} %s")
+            args.append(after[1])
+        else:
+            clauses.append(f"({sort_expr} {op} %s OR ({sort_expr} = %s AND {id_col} {op} %s))")
+            args.extend([after[0], after[0], after[1]])
+
+    where_sql = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    direction = order.upper()
+    rows = query_db(
+        f"""
+        {spec["select"].replace("SELECT", f"SELECT {sort_expr} AS _sort_value,", 1)}
+        {where_sql}
+        ORDER BY {sort_expr} {direction}, {id_col} {direction}
+        LIMIT %s
+        """,
+        tuple(args) + (limit + 1,),
+    )
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = _encode_cursor(sort, order, last["_sort_value"], int(last["id"]))
+    for row in rows:
+        row.pop("_sort_value", None)
+
+    return {
+        "table": table_key,
+        "rows": rows,
+        "next_cursor": next_cursor,
+        "is_first_page": after is None,
+        "sort": sort,
+        "order": order,
+        "limit": limit,
+        "filters": applied,
+    }
+
+
+def page_link_args(page, cursor=None):
+    """Prefixed query args that reproduce ``page``'s filters at ``cursor``."""
+    prefix = page["table"]
+    link_args = {f"{prefix}_{name}": value for name, value in page["filters"].items()}
+    if page["sort"] != "id":
+        link_args[f"{prefix}_sort"] = page["sort"]
+    if page["order"] != "desc":
+        link_args[f"{prefix}_order"] = page["order"]
+    if cursor:
+        link_args[f"{prefix}_cursor"] = cursor
+    return link_args
+
+
+_summary_lock = threading.Lock()
+_summary_cache = {"value": None, "expires_at": 0.0}
+
+
+def _load_admin_summary():
+    return query_db(
+        """
+        SELECT us.*, ts.*, bs.*, ss.*, ps.*, sr.*
+        FROM (
+            SELECT
+                COUNT(*) AS total_users,
+                SUM(CASE WHEN role='customer' THEN 1 ELSE 0 END) AS total_travelers,
+                SUM(CASE WHEN role='organizer' THEN 1 ELSE 0 END) AS total_organizers,
+                SUM(CASE WHEN role='hotel_provider' THEN 1 ELSE 0 END) AS total_providers,
+                SUM(CASE WHEN role='admin' THEN 1 ELSE 0 END) AS total_admins,
+                SUM(CASE WHEN status='pending' THEN 1 ELSE 0 END) AS pending_approvals
+            FROM users
+        ) us
+        CROSS JOIN (
+            SELECT
+                COUNT(*) AS total_tours,
+                SUM(CASE WHEN start_date > CURDATE() THEN 1 ELSE 0 END) AS upcoming_tours,
+                SUM(CASE WHEN start_date <= CURDATE() AND end_date >= CURDATE() THEN 1 ELSE 0 END) AS current_tours,
+                SUM(CASE WHEN end_date < CURDATE() THEN 1 ELSE 0 END) AS completed_tours,
+                MIN(start_date) AS nearest_tour_date
+            FROM tours
+        ) ts
+        CROSS JOIN (
+            SELECT
+                COUNT(*) AS total_bookings,
+                SUM(CASE WHEN status='paid' THEN 1 ELSE 0 END) AS paid_bookings,
+                SUM(CASE WHEN status='pending' THEN 1 ELSE 0 END) AS pending_bookings
+            FROM bookings
+        ) bs
+        CROSS JOIN (
+            SELECT COUNT(*) AS total_services
+            FROM services
+        ) ss
+        CROSS JOIN (
+            SELECT
+                COALESCE(SUM(amount), 0) AS total_revenue,
+                COALESCE(SUM(admin_commission), 0) AS total_admin_commission,
+                COUNT(*) AS total_payments
+            FROM payments
+            WHERE paid=1
+        ) ps
+        CROSS JOIN (
+            SELECT COUNT(*) AS pending_spot_requests
+            FROM spot_change_requests
+            WHERE status='pending'
+        ) sr
+        """,
+        one=True,
+    ) or {}
+
+
+def get_admin_summary():
+    """Dashboard counters, recomputed at most once per ``ADMIN_SUMMARY_TTL_SECONDS``."""
+    now = time.monotonic()
+    cached = _summary_cache["value"]
+    if cached is not None and now < _summary_cache["expires_at"]:
+        return cached
+    with _summary_lock:
+        if _summary_cache["value"] is not None and time.monotonic() < _summary_cache["expires_at"]:
+            return _summary_cache["value"]
+        summary = _load_admin_summary()
+        _summary_cache["value"] = summary
+        _summary_cache["expires_at"] = time.monotonic() + ADMIN_SUMMARY_TTL_SECONDS
+        return summary
+
+
+def invalidate_admin_summary():
+    with _summary_lock:
+        _summary_cache["value"] = None
+        _summary_cache["expires_at"] = 0.0
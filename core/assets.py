@@ -0,0 +1,231 @@
+"""Self-hosted vendor files and concatenated CSS/JS bundles.
+
+``scripts/vendor_assets.py`` downloads the pinned files in
+``VENDOR_ASSETS`` into ``static/vendor``. ``scripts/build_static_assets.py``
+concatenates each entry of ``ASSET_BUNDLES`` into ``static/bundles``,
+minifying sources that are not minified yet, and precompresses the result.
+Relative CSS ``url()`` references (e.g. icon fonts) are rewritten to
+fingerprinted paths on the way.
+
+Templates reference bundles only through ``{{ asset_bundle("core.css") }}``.
+The tag gets its URL from ``url_for('static', ...)``, so it is fingerprinted
+and cached for a year. Fonts listed under ``preload`` are emitted as
+``<link rel="preload">``. If a bundle has not been built, or is older than
+one of its sources, the helper emits one tag per source instead.
+
+Vendoring is a required build step: ``init_assets`` refuses to start the
+app while a vendor file is missing. With ``VENDOR_CDN_FALLBACK`` on (for
+development), a missing file loads from its CDN URL only when
+``static/vendor/vendor-lock.json`` pins it, and the tag carries that
+``integrity`` value. Unpinned files are never loaded from the CDN.
+"""
+
+import json
+import os
+import posixpath
+import re
+from functools import lru_cache
+
+from flask import current_app, url_for
+from markupsafe import Markup, escape
+
+from core.config import VENDOR_CDN_FALLBACK
+from core.static_files import FINGERPRINT_LENGTH, static_file_info
+
+
+BUNDLE_FOLDER = "bundles"
+VENDOR_LOCK_FILE = "vendor/vendor-lock.json"
+JSDELIVR = "https://cdn.jsdelivr.net/npm"
+
+# static-relative path -> pinned upstream URL
+VENDOR_ASSETS = {
+    "vendor/bootstrap/bootstrap.min.css": f"{JSDELIVR}/bootstrap@5.3.3/dist/css/bootstrap.min.css",
+    "vendor/bootstrap/bootstrap.bundle.min.js": f"{JSDELIVR}/bootstrap@5.3.3/dist/js/bootstrap.bundle.min.js",
+    "vendor/bootstrap-icons/bootstrap-icons.css": f"{JSDELIVR}/bootstrap-icons@1.11.3/font/bootstrap-icons.css",
+    "vendor/bootstrap-icons/fonts/bootstrap-icons.woff2": (
+        f"{JSDELIVR}/bootstrap-icons@1.11.3/font/fonts/bootstrap-icons.woff2"
+    ),
+    "vendor/bootstrap-icons/fonts/bootstrap-icons.woff": (
+        f"{JSDELIVR}/bootstrap-icons@1.11.3/font/fonts/bootstrap-icons.woff"
+    ),
+}
+
+# Page stylesheets load between core.css and theme.css, so theme.css is
+# kept out of the bundle to preserve the cascade.
+ASSET_BUNDLES = {
+    "core.css": {
+        "files": (
+            "vendor/bootstrap/bootstrap.min.css",
+            "vendor/bootstrap-icons/bootstrap-icons.css",
+            "css/base.css",
+        ),
+        "preload": ("vendor/bootstrap-icons/fonts/bootstrap-icons.woff2",),
+    },
+    "core.js": {
+        "files": (
+            "vendor/bootstrap/bootstrap.bundle.min.js",
+            "js/theme.js",
+        ),
+    },
+}
+
+_PRELOAD_TYPES = {".woff2": ("font", "font/woff2"), ".woff": ("font", "font/woff")}
+_CSS_URL_RE = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""")
+_CSS_CHARSET_RE = re.compile(r"""@charset\s+["'][^"']*["']\s*;\s*""", re.IGNORECASE)
+_SOURCE_MAP_RE = re.compile(r"^\s*(?:/\*#\s*sourceMappingURL=.*?\*/|//#\s*sourceMappingURL=.*)$", re.MULTILINE)
+
+
+def bundle_path(name):
+    return f"{BUNDLE_FOLDER}/{name}"
+
+
+def _is_fresh(static_root, name):
+    info = static_file_info(static_root, bundle_path(name))
+    if info is None:
+        return False
+    for source in ASSET_BUNDLES[name]["files"]:
+        source_info = static_file_info(static_root, source)
+        if source_info is not None and source_info[0] > info[0]:
+            return False
+    return True
+
+
+@lru_cache(maxsize=4)
+def _vendor_lock(static_root):
+    try:
+        with open(os.path.join(static_root, *VENDOR_LOCK_FILE.split("/")), encoding="utf-8") as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return {}
+
+
+def _pinned_integrity(static_root, filename):
+    entry = _vendor_lock(static_root).get(filename) or {}
+    return entry.get("integrity") if entry.get("url") == VENDOR_ASSETS.get(filename) else None
+
+
+def missing_vendor_assets(static_root):
+    return [
+        filename
+        for filename in VENDOR_ASSETS
+        if not os.path.isfile(os.path.join(static_root, *filename.split("/")))
+    ]
+
+
+def _source_url(static_root, filename):
+    """``(url, integrity)``; integrity is only set for the CDN fallback."""
+    if VENDOR_CDN_FALLBACK and filename in VENDOR_ASSETS and static_file_info(static_root, filename) is None:
+        integrity = _pinned_integrity(static_root, filename)
+        if integrity:
+            return VENDOR_ASSETS[filename], integrity
+    return url_for("static", filename=filename), None
+
+
+def _tag(url, kind, integrity=None):
+    extra = f' integrity="{escape(integrity)}" crossorigin="anonymous"' if integrity else ""
+    if kind == ".css":
+        return f'<link rel="stylesheet" href="{escape(url)}"{extra}>'
+    return f'<script src="{escape(url)}"{extra}></script>'
+
+
+def _preload_tag(url, filename, integrity=None):
+    as_type, mimetype = _PRELOAD_TYPES.get(
+        os.path.splitext(filename)[1],
+        ("style", "text/css") if filename.endswith(".css") else ("script", "text/javascript"),
+    )
+    attrs = " crossorigin" if as_type == "font" else ""
+    if integrity:
+        # Must match the stylesheet/script tag, or the browser fetches twice.
+        attrs = f' integrity="{escape(integrity)}" crossorigin="anonymous"'
+    return f'<link rel="preload" href="{escape(url)}" as="{as_type}" type="{mimetype}"{attrs}>'
+
+
+def asset_bundle(name, preload=False):
+    """Tags for bundle ``name``; with ``preload=True``, only ``<link rel=preload>`` hints."""
+    bundle = ASSET_BUNDLES[name]
+    static_root = current_app.static_folder
+    kind = os.path.splitext(name)[1]
+    if _is_fresh(static_root, name):
+        entries = [(url_for("static", filename=bundle_path(name)), bundle_path(name), None)]
+    else:
+        entries = []
+        for source in bundle["files"]:
+            url, integrity = _source_url(static_root, source)
+            entries.append((url, source, integrity))
+    if preload:
+        return Markup("\n".join(_preload_tag(url, filename, integrity) for url, filename, integrity in entries))
+    tags = []
+    for font in bundle.get("preload", ()):
+        if static_file_info(static_root, font) is not None:
+            tags.append(_preload_tag(url_for("static", filename=font), font))
+    tags.extend(_tag(url, kind, integrity) for url, _, integrity in entries)
+    return Markup("\n".join(tags))
+
+
+def init_assets(app):
+    missing = missing_vendor_assets(app.static_folder)
+    if not missing:
+        return
+    if not VENDOR_CDN_FALLBACK:
+        raise RuntimeError(
+            f"Vendor assets missing: {', '.join(missing)}. Run scripts/vendor_assets.py and "
+            "scripts/build_static_assets.py, or set VENDOR_CDN_FALLBACK=1 for development."
+        )
+    unpinned = [filename for filename in missing if not _pinned_integrity(app.static_folder, filename)]
+    print(f"[assets-warning] Loading {len(missing) - len(unpinned)} vendor file(s) from the CDN (VENDOR_CDN_FALLBACK).")
+    if unpinned:
+        print(f"[assets-warning] Not pinned, so not loaded from the CDN: {', '.join(unpinned)}")
+
+
+def _fingerprinted(static_root, filename):
+    info = static_file_info(static_root, filename)
+    if info is None:
+        return filename
+    stem, ext = os.path.splitext(filename)
+    return f"{stem}.{info[2][:FINGERPRINT_LENGTH]}{ext}"
+
+
+def rewrite_css_urls(css, source, static_root):
+    """Point relative ``url()`` references in ``source`` at fingerprinted paths from the bundle folder."""
+    source_dir = posixpath.dirname(source)
+
+    def _replace(match):
+        quote, target = match.group(1), match.group(2).strip()
+        if target.startswith(("data:", "http:", "https:", "//", "/", "#")):
+            return match.group(0)
+        path, hash_sep, fragment = target.partition("#")
+        path = path.split("?", 1)[0]
+        resolved = posixpath.normpath(posixpath.join(source_dir, path))
+        relative = posixpath.relpath(_fingerprinted(static_root, resolved), BUNDLE_FOLDER)
+        return f"url({quote}{relative}{hash_sep}{fragment}{quote})"
+
+    return _CSS_URL_RE.sub(_replace, css)
+
+
+def render_bundle(static_root, name, minify=None):
+    """``(text, missing_sources)``; ``text`` is ``None`` when a source is missing.
+
+    ``minify(text, ext)`` is applied to sources that are not ``*.min.*``.
+    """
+    parts = []
+    missing = []
+    kind = os.path.splitext(name)[1]
+    for source in ASSET_BUNDLES[name]["files"]:
+        path = os.path.join(static_root, *source.split("/"))
+        if not os.path.isfile(path):
+            missing.append(source)
+            continue
+        with open(path, encoding="utf-8") as handle:
+            text = _SOURCE_MAP_RE.sub("", handle.read())
+        if minify is not None and ".min." not in posixpath.basename(source):
+            text = minify(text, kind)
+        if kind == ".css":
+            text = rewrite_css_urls(_CSS_CHARSET_RE.sub("", text), source, static_root)
+        parts.append(f"/* {source} */\n{text.strip()}\n")
+    if missing:
+        return None, missing
+    separator = "\n" if kind == ".css" else ";\n"
+    text = separator.join(parts)
+    if kind == ".css":
+        text = '@charset "UTF-8";\n' + text
+    return text, []
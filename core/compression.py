@@ -0,0 +1,227 @@
+"""gzip/brotli response compression as WSGI middleware.
+
+The middleware wraps ``app.wsgi_app``, so it sees the final headers of
+every response: views, page-cache hits and static files. A response is
+compressed when all of these hold:
+- the client accepts ``br`` or ``gzip``
+- the content type is text-like (see ``COMPRESSIBLE_TYPES``)
+- it has no ``Content-Encoding`` yet
+- its size is unknown or at least ``COMPRESSION_MIN_BYTES``
+
+Bodies of known length up to ``COMPRESSION_BUFFER_MAX_BYTES`` are
+compressed in one piece and keep a ``Content-Length``. Streamed and larger
+bodies are compressed chunk by chunk. Each chunk is flushed, so streamed
+output still reaches the client as it is produced.
+
+Brotli needs the optional ``brotli`` package; without it only gzip is
+offered. Precompressed static assets are served by ``core.static_files``.
+"""
+
+import zlib
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+from core.config import (
+    COMPRESSION_BROTLI_QUALITY,
+    COMPRESSION_BUFFER_MAX_BYTES,
+    COMPRESSION_ENABLED,
+    COMPRESSION_GZIP_LEVEL,
+    COMPRESSION_MIN_BYTES,
+)
+
+
+COMPRESSIBLE_TYPES = {
+    "application/javascript",
+    "application/json",
+    "application/manifest+json",
+    "application/xml",
+    "image/svg+xml",
+    "text/javascript",
+}
+# Preferred first when the client rates encodings equally.
+ENCODING_PREFERENCE = ("br", "gzip")
+_SKIP_HEADERS = ("content-encoding", "x-sendfile", "x-accel-redirect")
+
+
+def available_encodings():
+    return ENCODING_PREFERENCE if brotli is not None else ("gzip",)
+
+
+def negotiate_encoding(accept_encoding, available):
+    """Best of ``available`` for an ``Accept-Encoding`` value, or ``None``."""
+    qualities = {}
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[name] = quality
+    best = None
+    best_quality = 0.0
+    for encoding in available:
+        quality = qualities.get(encoding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def is_compressible_type(content_type):
+    mimetype = (content_type or "").split(";", 1)[0].strip().lower()
+    return mimetype.startswith("text/") or mimetype in COMPRESSIBLE_TYPES
+
+
+class Compressor:
+    """Incremental gzip or brotli encoder."""
+
+    def __init__(self, encoding):
+        self.encoding = encoding
+        if encoding == "br":
+            self._impl = brotli.Compressor(quality=COMPRESSION_BROTLI_QUALITY)
+        else:
+            self._impl = zlib.compressobj(COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data, flush=False):
+        if self.encoding == "br":
+            out = self._impl.process(data)
+            return out + self._impl.flush() if flush else out
+        out = self._impl.compress(data)
+        return out + self._impl.flush(zlib.Z_SYNC_FLUSH) if flush else out
+
+    def finish(self):
+        if self.encoding == "br":
+            return self._impl.finish()
+        return self._impl.flush()
+
+
+def compress_bytes(data, encoding):
+    compressor = Compressor(encoding)
+    return compressor.compress(data) + compressor.finish()
+
+
+def _header(headers, name):
+    name = name.lower()
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+
+def _without(headers, *names):
+    names = {name.lower() for name in names}
+    return [(key, value) for key, value in headers if key.lower() not in names]
+
+
+def _add_vary(headers):
+    vary = _header(headers, "Vary")
+    if vary is None:
+        return headers + [("Vary", "Accept-Encoding")]
+    if "accept-encoding" in vary.lower() or vary.strip() == "*":
+        return headers
+    return _without(headers, "Vary") + [("Vary", f"{vary}, Accept-Encoding")]
+
+
+def _encoded_headers(headers, encoding):
+    headers = _without(headers, "Content-Length") + [("Content-Encoding", encoding)]
+    etag = _header(headers, "ETag")
+    if etag and not etag.startswith("W/"):
+        # The bytes differ from the identity response, so the tag is weak.
+        headers = _without(headers, "ETag") + [("ETag", f"W/{etag}")]
+    return headers
+
+
+def _plan(environ, status, headers):
+    """``(encoding, buffered)`` for a response, or ``None`` to pass it through."""
+    code = int(status.split(" ", 1)[0])
+    if code < 200 or code in (204, 206, 304) or environ.get("REQUEST_METHOD") == "HEAD":
+        return None
+    if any(_header(headers, name) is not None for name in _SKIP_HEADERS):
+        return None
+    if "no-transform" in (_header(headers, "Cache-Control") or "").lower():
+        return None
+    if not is_compressible_type(_header(headers, "Content-Type")):
+        return None
+    length = _header(headers, "Content-Length")
+    length = int(length) if length and length.isdigit() else None
+    if length is not None and length < COMPRESSION_MIN_BYTES:
+        return None
+    encoding = negotiate_encoding(environ.get("HTTP_ACCEPT_ENCODING"), available_encodings())
+    return encoding, length is not None and length <= COMPRESSION_BUFFER_MAX_BYTES
+
+
+class CompressionMiddleware:
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+
+    def __call__(self, environ, start_response):
+        state = {}
+
+        def _start_response(status, headers, exc_info=None):
+            plan = _plan(environ, status, headers)
+            if plan is None:
+                state["mode"] = "identity"
+                return start_response(status, headers, exc_info)
+            headers = _add_vary(headers)
+            encoding, buffered = plan
+            if encoding is None:
+                state["mode"] = "identity"
+                return start_response(status, headers, exc_info)
+            if buffered:
+                # Sent once the body is compressed and its length is known.
+                state.update(mode="buffer", encoding=encoding, status=status, headers=headers, exc_info=exc_info)
+                state["written"] = []
+                return state["written"].append
+            compressor = Compressor(encoding)
+            state.update(mode="stream", compressor=compressor)
+            write = start_response(status, _encoded_headers(headers, encoding), exc_info)
+            return lambda data: write(compressor.compress(data, flush=True))
+
+        app_iter = self.wsgi_app(environ, _start_response)
+        mode = state.get("mode")
+        if mode == "buffer":
+            return self._buffered(app_iter, state, start_response)
+        if mode == "stream":
+            return self._streamed(app_iter, state["compressor"])
+        return app_iter
+
+    @staticmethod
+    def _buffered(app_iter, state, start_response):
+        try:
+            body = b"".join(state["written"]) + b"".join(app_iter)
+        finally:
+            if hasattr(app_iter, "close"):
+                app_iter.close()
+        compressed = compress_bytes(body, state["encoding"])
+        headers = state["headers"]
+        if len(compressed) < len(body):
+            headers = _encoded_headers(headers, state["encoding"])
+            body = compressed
+        headers = _without(headers, "Content-Length") + [("Content-Length", str(len(body)))]
+        start_response(state["status"], headers, state["exc_info"])
+        return [body]
+
+    @staticmethod
+    def _streamed(app_iter, compressor):
+        try:
+            for chunk in app_iter:
+                if chunk:
+                    yield compressor.compress(chunk, flush=True)
+            yield compressor.finish()
+        finally:
+            if hasattr(app_iter, "close"):
+                app_iter.close()
+
+
+def init_compression(app):
+    """Compress text responses with brotli or gzip per ``Accept-Encoding``."""
+    if COMPRESSION_ENABLED:
+        app.wsgi_app = CompressionMiddleware(app.wsgi_app)
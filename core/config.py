@@ -7,6 +7,124 @@ SECRET_KEY = os.getenv("SECRET_KEY", "tourgen-secret-key")
 UPLOAD_FOLDER = "static/uploads"
 DOC_UPLOAD_FOLDER = "static/uploads/documents"
 SPOT_UPLOAD_FOLDER = "static/uploads/spots"
+DERIVED_UPLOAD_FOLDER = "static/uploads/derived"
+# Files handed to background jobs; kept out of static/ so they are never served.
+JOB_UPLOAD_FOLDER = os.getenv("JOB_UPLOAD_FOLDER", "instance/job_uploads")
+
+# Upload limits. MAX_UPLOAD_REQUEST_BYTES is the global request-body cap
+# (Flask MAX_CONTENT_LENGTH); endpoints listed below get a tighter cap that is
+# checked from Content-Length before the body is parsed. Override endpoint
+# caps with UPLOAD_ENDPOINT_LIMITS_MB="signup=10,booking=10".
+_MB = 1024 * 1024
+MAX_UPLOAD_REQUEST_BYTES = int(float(os.getenv("MAX_UPLOAD_REQUEST_MB", "120")) * _MB)
+UPLOAD_MAX_IMAGE_BYTES = int(float(os.getenv("UPLOAD_MAX_IMAGE_MB", "8")) * _MB)
+UPLOAD_MAX_DOCUMENT_BYTES = int(float(os.getenv("UPLOAD_MAX_DOCUMENT_MB", "10")) * _MB)
+UPLOAD_MAX_CSV_BYTES = int(float(os.getenv("UPLOAD_MAX_CSV_MB", "20")) * _MB)
+UPLOAD_ENDPOINT_LIMITS = {
+    "signup": 30 * _MB,
+    "booking": 12 * _MB,
+    "organizer_dashboard": 25 * _MB,
+    "provider_dashboard": 120 * _MB,
+    "provider_add_hotel": 120 * _MB,
+    "provider_hotels_management": 120 * _MB,
+    "provider_hotel_manage_detail": 120 * _MB,
+}
+for _item in (os.getenv("UPLOAD_ENDPOINT_LIMITS_MB") or "").split(","):
+    _endpoint, _, _limit_mb = _item.partition("=")
+    if _endpoint.strip() and _limit_mb.strip():
+        UPLOAD_ENDPOINT_LIMITS[_endpoint.strip()] = int(float(_limit_mb) * _MB)
+
+# scripts/gc_uploads.py: unreferenced uploads younger than this are kept.
+UPLOAD_GC_GRACE_HOURS = float(os.getenv("UPLOAD_GC_GRACE_HOURS", "72"))
+UPLOAD_QUARANTINE_FOLDER = os.getenv("UPLOAD_QUARANTINE_FOLDER", "instance/upload_quarantine")
+
+JOB_WORKER_THREADS = int(os.getenv("JOB_WORKER_THREADS", "2"))
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "2"))
+JOB_STALE_MINUTES = int(os.getenv("JOB_STALE_MINUTES", "30"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+
+ADMIN_PAGE_SIZE = int(os.getenv("ADMIN_PAGE_SIZE", "25"))
+ADMIN_PAGE_SIZE_MAX = int(os.getenv("ADMIN_PAGE_SIZE_MAX", "100"))
+ADMIN_SUMMARY_TTL_SECONDS = float(os.getenv("ADMIN_SUMMARY_TTL_SECONDS", "30"))
+
+# Static files: fingerprinted URLs are cached for a year; see core/static_files.py.
+STATIC_FINGERPRINT = os.getenv("STATIC_FINGERPRINT", "1").strip().lower() not in ("0", "false", "no", "off")
+STATIC_FINGERPRINT_CHECK_SECONDS = float(os.getenv("STATIC_FINGERPRINT_CHECK_SECONDS", "5"))
+# Cached fingerprints (LRU); missing files are never cached.
+STATIC_FILE_INFO_MAX_ENTRIES = int(os.getenv("STATIC_FILE_INFO_MAX_ENTRIES", "4096"))
+STATIC_MAX_AGE_SECONDS = int(os.getenv("STATIC_MAX_AGE_SECONDS", "31536000"))
+# "" (serve from Python), "x-sendfile" or "x-accel-redirect".
+STATIC_SENDFILE_MODE = os.getenv("STATIC_SENDFILE_MODE", "").strip().lower()
+STATIC_ACCEL_PREFIX = os.getenv("STATIC_ACCEL_PREFIX", "/protected-static/")
+# Serve *.min.css/js and .br/.gz variants written by scripts/build_static_assets.py.
+STATIC_PRECOMPRESSED = os.getenv("STATIC_PRECOMPRESSED", "1").strip().lower() not in ("0", "false", "no", "off")
+
+# Vendor files (core/assets.py) must be downloaded by scripts/vendor_assets.py;
+# the app refuses to start without them unless this is on. It is meant for
+# development only: missing files that have an integrity pin then load from
+# the CDN, and unpinned ones are never loaded from it.
+VENDOR_CDN_FALLBACK = os.getenv("VENDOR_CDN_FALLBACK", "0").strip().lower() not in ("0", "false", "no", "off")
+
+# Response compression (core/compression.py); brotli needs the "brotli" package.
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "1").strip().lower() not in ("0", "false", "no", "off")
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+COMPRESSION_BUFFER_MAX_BYTES = int(float(os.getenv("COMPRESSION_BUFFER_MAX_MB", "4")) * _MB)
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+
+# /api/nearby: in-memory k-d trees are rebuilt after this many seconds.
+SPATIAL_INDEX_TTL_SECONDS = float(os.getenv("SPATIAL_INDEX_TTL_SECONDS", "300"))
+NEARBY_MAX_RADIUS_KM = float(os.getenv("NEARBY_MAX_RADIUS_KM", "200"))
+NEARBY_MAX_RESULTS = int(os.getenv("NEARBY_MAX_RESULTS", "100"))
+
+# Per-request DB instrumentation. DB_STATS_SERVER_TIMING is "auto" (only when
+# app.debug), "1" or "0"; without the header a "[db-stats]" JSON warning goes
+# to app.logger for requests issuing at least DB_STATS_LOG_MIN_QUERIES
+# statements (0 turns that off) or with a statement fingerprint repeated
+# DB_N_PLUS_ONE_THRESHOLD times.
+DB_STATS_ENABLED = os.getenv("DB_STATS_ENABLED", "1").strip().lower() not in ("0", "false", "no", "off")
+DB_STATS_SERVER_TIMING = os.getenv("DB_STATS_SERVER_TIMING", "auto").strip().lower()
+DB_STATS_LOG_MIN_QUERIES = int(os.getenv("DB_STATS_LOG_MIN_QUERIES", "50"))
+DB_N_PLUS_ONE_THRESHOLD = int(os.getenv("DB_N_PLUS_ONE_THRESHOLD", "5"))
+
+# Slow query log (threshold: SLOW_QUERY_MS in core/db.py). Target is "file",
+# "table" or "both"; the file rotates at SLOW_QUERY_LOG_MAX_MB.
+SLOW_QUERY_LOG_TARGET = os.getenv("SLOW_QUERY_LOG_TARGET", "file").strip().lower()
+SLOW_QUERY_LOG_FILE = os.getenv("SLOW_QUERY_LOG_FILE", "instance/slow_queries.log")
+SLOW_QUERY_LOG_MAX_BYTES = int(float(os.getenv("SLOW_QUERY_LOG_MAX_MB", "10")) * _MB)
+SLOW_QUERY_LOG_BACKUPS = int(os.getenv("SLOW_QUERY_LOG_BACKUPS", "5"))
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "1").strip().lower() not in ("0", "false", "no", "off")
+# Each fingerprint is EXPLAINed at most once per cooldown.
+SLOW_QUERY_EXPLAIN_COOLDOWN_SECONDS = float(os.getenv("SLOW_QUERY_EXPLAIN_COOLDOWN_SECONDS", "300"))
+
+# GET /metrics (Prometheus text format) requires this token as a Bearer
+# Authorization header or ?token=; the endpoint is disabled while it is empty.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+# Request profiler (core/profiler.py): admins add "X-Profile: 1" or
+# ?_profile=1; PROFILE_SAMPLE_RATE=N also profiles 1 in N requests.
+PROFILE_SAMPLE_RATE = int(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_OUTPUT_FOLDER = os.getenv("PROFILE_OUTPUT_FOLDER", "instance/profiles")
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "200"))
+
+# Template fragment cache (core/templating.py). Entries are keyed on data
+# version counters; other processes see a bump within DATA_VERSION_TTL_SECONDS.
+FRAGMENT_CACHE_ENABLED = os.getenv("FRAGMENT_CACHE_ENABLED", "1").strip().lower() not in ("0", "false", "no", "off")
+FRAGMENT_CACHE_MAX_BYTES = int(float(os.getenv("FRAGMENT_CACHE_MAX_MB", "32")) * _MB)
+DATA_VERSION_TTL_SECONDS = float(os.getenv("DATA_VERSION_TTL_SECONDS", "2"))
+
+# Full-page cache for anonymous public pages (core/page_cache.py).
+# PAGE_CACHE_STORE: "memory", or "file"/"sqlite" to share pages between
+# workers on one host through PAGE_CACHE_PATH.
+PAGE_CACHE_ENABLED = os.getenv("PAGE_CACHE_ENABLED", "1").strip().lower() not in ("0", "false", "no", "off")
+PAGE_CACHE_TTL_SECONDS = float(os.getenv("PAGE_CACHE_TTL_SECONDS", "60"))
+PAGE_CACHE_MAX_BYTES = int(float(os.getenv("PAGE_CACHE_MAX_MB", "64")) * _MB)
+PAGE_CACHE_STORE = os.getenv("PAGE_CACHE_STORE", "memory").strip().lower()
+PAGE_CACHE_PATH = os.getenv("PAGE_CACHE_PATH", "")
+
+# /organizer/api/optimize-itinerary: largest draft accepted in one request.
+ITINERARY_OPTIMIZE_MAX_STOPS = int(os.getenv("ITINERARY_OPTIMIZE_MAX_STOPS", "200"))
 
 RAZORPAY_KEY_ID = os.getenv("RAZORPAY_KEY_ID", "")
 RAZORPAY_KEY_SECRET = os.getenv("RAZORPAY_KEY_SECRET", "")
@@ -6,11 +6,15 @@ import time
 import mysql.connector
 
 from core.config import MYSQL_CONFIG
+from core.db_stats import instrument_connection
+from core.slow_queries import log_slow_query
 
 
 DB_RETRY_ATTEMPTS = max(1, int(os.getenv("DB_RETRY_ATTEMPTS", "3")))
 DB_RETRY_DELAY_SEC = max(0.0, float(os.getenv("DB_RETRY_DELAY_SEC", "0.4")))
 TRANSIENT_DB_ERROR_CODES = {1205, 1213, 2002, 2003, 2006, 2013, 2055}
+# Statements slower than this are sent to core.slow_queries; 0 disables the log.
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "250"))
 
 
 def _is_retryable_db_error(exc):
@@ -37,9 +41,19 @@ def _run_with_retry(operation, runner, attempts=DB_RETRY_ATTEMPTS):
     raise last_exc
 
 
+def _check_slow_statement(statement, params, seconds, many=False):
+    if seconds * 1000 >= SLOW_QUERY_MS:
+        log_slow_query(statement, params, seconds, many=many)
+
+
 def get_db(retries=None):
     retry_attempts = DB_RETRY_ATTEMPTS if retries is None else max(1, int(retries))
-    return _run_with_retry("connect", lambda: mysql.connector.connect(**MYSQL_CONFIG), attempts=retry_attempts)
+    on_statement = _check_slow_statement if SLOW_QUERY_MS > 0 else None
+    return _run_with_retry(
+        "connect",
+        lambda: instrument_connection(lambda: mysql.connector.connect(**MYSQL_CONFIG), on_statement),
+        attempts=retry_attempts,
+    )
 
 
 def query_db(query, args=(), one=False):
@@ -140,6 +154,21 @@ def _column_type(cur, table_name, column_name):
     return row[0] if row else None
 
 
+def _index_exists(cur, table_name, index_name):
+    cur.execute(
+        """
+        SELECT 1
+        FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE()
+          AND TABLE_NAME = %s
+          AND INDEX_NAME = %s
+        LIMIT 1
+        """,
+        (table_name, index_name),
+    )
+    return cur.fetchone() is not None
+
+
 def _add_column_if_missing(cur, table_name, column_name, column_definition):
     if not _table_exists(cur, table_name):
         return
@@ -297,6 +326,129 @@ def ensure_runtime_schema():
                 """
             )
 
+        if has_tours:
+            # Itinerary route metrics (core/route_metrics.py); legs_json is
+            # keyed by tour_itinerary.id and signature covers the coordinates
+            # the row was computed from.
+            cur.execute(
+                """
+                CREATE TABLE IF NOT EXISTS tour_route_metrics (
+                    tour_id INT NOT NULL PRIMARY KEY,
+                    total_distance_km DECIMAL(10,1) NOT NULL DEFAULT 0.0,
+                    point_count INT NOT NULL DEFAULT 0,
+                    valid_point_count INT NOT NULL DEFAULT 0,
+                    legs_json MEDIUMTEXT,
+                    signature CHAR(40) NOT NULL,
+                    computed_at TIMESTAMP NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                    CONSTRAINT fk_tour_route_metrics_tour
+                        FOREIGN KEY (tour_id) REFERENCES tours(id) ON DELETE CASCADE
+                )
+                """
+            )
+
+        rollups_missing = False
+        if has_tours and has_bookings:
+            rollups_missing = not _table_exists(cur, "organizer_tour_rollups")
+            cur.execute(
+                """
+                CREATE TABLE IF NOT EXISTS organizer_tour_rollups (
+                    tour_id INT NOT NULL PRIMARY KEY,
+                    organizer_id INT NOT NULL,
+                    internal_booking_count INT NOT NULL DEFAULT 0,
+                    internal_pax INT NOT NULL DEFAULT 0,
+                    active_pax INT NOT NULL DEFAULT 0,
+                    paid_booking_count INT NOT NULL DEFAULT 0,
+                    paid_pax INT NOT NULL DEFAULT 0,
+                    external_booking_count INT NOT NULL DEFAULT 0,
+                    external_pax INT NOT NULL DEFAULT 0,
+                    organizer_profit DECIMAL(12,2) NOT NULL DEFAULT 0.00,
+                    admin_commission DECIMAL(12,2) NOT NULL DEFAULT 0.00,
+                    updated_at TIMESTAMP NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                    KEY idx_tour_rollup_organizer (organizer_id),
+                    CONSTRAINT fk_tour_rollup_tour
+                        FOREIGN KEY (tour_id) REFERENCES tours(id) ON DELETE CASCADE
+                )
+                """
+            )
+
+        if has_users:
+            cur.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INT AUTO_INCREMENT PRIMARY KEY,
+                    job_type VARCHAR(60) NOT NULL,
+                    status VARCHAR(20) NOT NULL DEFAULT 'queued',
+                    created_by INT DEFAULT NULL,
+                    payload TEXT,
+                    result TEXT,
+                    error_message VARCHAR(500) DEFAULT NULL,
+                    progress_done INT NOT NULL DEFAULT 0,
+                    progress_total INT DEFAULT NULL,
+                    progress_message VARCHAR(255) DEFAULT NULL,
+                    worker_id VARCHAR(120) DEFAULT NULL,
+                    attempts INT NOT NULL DEFAULT 0,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    started_at TIMESTAMP NULL DEFAULT NULL,
+                    finished_at TIMESTAMP NULL DEFAULT NULL,
+                    updated_at TIMESTAMP NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                    KEY idx_jobs_status (status, id),
+                    KEY idx_jobs_creator (created_by, id),
+                    CONSTRAINT fk_jobs_creator
+                        FOREIGN KEY (created_by) REFERENCES users(id) ON DELETE SET NULL
+                )
+                """
+            )
+
+        # Content-addressed uploads (core/storage.py); storage_path is
+        # relative to static/uploads.
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS stored_files (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                sha256 CHAR(64) NOT NULL,
+                storage_path VARCHAR(255) NOT NULL,
+                size_bytes BIGINT NOT NULL DEFAULT 0,
+                original_name VARCHAR(255) DEFAULT NULL,
+                upload_count INT NOT NULL DEFAULT 1,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                last_uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE KEY uk_stored_files_path (storage_path),
+                KEY idx_stored_files_sha (sha256)
+            )
+            """
+        )
+
+        # Slow statements over SLOW_QUERY_MS (core/slow_queries.py).
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS slow_query_log (
+                id BIGINT AUTO_INCREMENT PRIMARY KEY,
+                fingerprint_sha CHAR(40) NOT NULL,
+                fingerprint TEXT NOT NULL,
+                statement_ms DECIMAL(12,2) NOT NULL,
+                endpoint VARCHAR(120) DEFAULT NULL,
+                caller VARCHAR(255) DEFAULT NULL,
+                param_shapes TEXT,
+                explain_json MEDIUMTEXT,
+                full_scan_tables VARCHAR(255) DEFAULT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                KEY idx_slow_query_fingerprint (fingerprint_sha, created_at),
+                KEY idx_slow_query_created (created_at)
+            )
+            """
+        )
+
+        # Version counters for cached template fragments (core/templating.py).
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS data_versions (
+                name VARCHAR(64) NOT NULL PRIMARY KEY,
+                version BIGINT NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+            )
+            """
+        )
+
         if has_users:
             role_col_type = (_column_type(cur, "users", "role") or "").lower()
             if role_col_type.startswith("enum("):
@@ -473,6 +625,12 @@ def ensure_runtime_schema():
         for table_name, column_name, column_definition in column_patches:
             _add_column_if_missing(cur, table_name, column_name, column_definition)
 
+        if rollups_missing and _table_exists(cur, "payments"):
+            # First boot with rollups: seed them once from existing bookings.
+            from core.rollups import rebuild_tour_rollups
+
+            rebuild_tour_rollups(cur)
+
         # Merge booking guide/room request detail tables into bookings.
         if has_bookings and _table_exists(cur, "booking_guide_requests"):
             cur.execute(
@@ -546,6 +704,18 @@ def ensure_runtime_schema():
                 except mysql.connector.Error:
                     pass
 
+        # Spot CSV imports upsert on (city_id, spot_name).
+        if has_master_spots and not _index_exists(cur, "master_spots", "uk_master_spot_city_name"):
+            try:
+                cur.execute(
+                    """
+                    ALTER TABLE master_spots
+                    ADD UNIQUE KEY uk_master_spot_city_name (city_id, spot_name)
+                    """
+                )
+            except mysql.connector.Error as exc:
+                print(f"[schema-warning] Could not add unique spot key (duplicate spots?): {exc}")
+
         # Backfill coordinates from legacy typo columns if they exist.
         if has_master_spots and _column_exists(cur, "master_spots", "latitude"):
             if _column_exists(cur, "master_spots", "letitude"):
@@ -565,6 +735,29 @@ def ensure_runtime_schema():
                     """
                 )
 
+        # 0.1-degree grid cell for proximity prefilters (core/spatial.py:geo_cell
+        # must use the same formula). Stored generated columns stay current on
+        # every insert/update path without application code.
+        for geo_table in ("master_spots", "hotel_profiles"):
+            if (
+                _table_exists(cur, geo_table)
+                and _column_exists(cur, geo_table, "latitude")
+                and _column_exists(cur, geo_table, "longitude")
+                and not _column_exists(cur, geo_table, "geo_cell")
+            ):
+                try:
+                    cur.execute(
+                        f"""
+                        ALTER TABLE `{geo_table}`
+                        ADD COLUMN geo_cell INT GENERATED ALWAYS AS (
+                            FLOOR((latitude + 90) * 10) * 3600 + FLOOR((longitude + 180) * 10)
+                        ) STORED,
+                        ADD KEY idx_{geo_table}_geo_cell (geo_cell)
+                        """
+                    )
+                except mysql.connector.Error as exc:
+                    print(f"[schema-warning] Could not add {geo_table}.geo_cell: {exc}")
+
         # Ensure each user has one profile row for consistent onboarding/location fields.
         has_user_profiles = _table_exists(cur, "user_profiles")
         if has_user_profiles and has_users:
@@ -0,0 +1,301 @@
+"""Per-request database instrumentation.
+
+While a request is active, connections from ``get_db()`` (including the
+ones behind ``query_db``/``execute_db``) hand out timed cursors. Every
+statement is recorded against the request's :class:`QueryStats` under a
+normalised fingerprint, with literals and placeholder lists collapsed. A
+fingerprint repeated ``DB_N_PLUS_ONE_THRESHOLD`` times in one request is
+reported as a likely N+1 loop.
+
+Outside a request (jobs, scripts) only the ``on_statement`` hook (the slow
+query log) sees statements; with neither, connections are returned untouched.
+"""
+
+import contextvars
+import json
+import re
+import time
+from functools import lru_cache
+
+from flask import request
+
+from core.config import (
+    DB_N_PLUS_ONE_THRESHOLD,
+    DB_STATS_ENABLED,
+    DB_STATS_LOG_MIN_QUERIES,
+    DB_STATS_SERVER_TIMING,
+)
+
+
+FINGERPRINT_MAX_LENGTH = 200
+REPORTED_REPEATS = 5
+
+_current_stats = contextvars.ContextVar("db_query_stats", default=None)
+
+_STRING_RE = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"")
+_NUMBER_RE = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER_RE = re.compile(r"%\(\w+\)s|%s")
+_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_ROWS_RE = re.compile(r"\(\?\+\)(?:\s*,\s*\(\?\+\))+")
+_SPACE_RE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=1024)
+def fingerprint(statement):
+    """Normalise SQL so the same statement with different values compares equal."""
+    if isinstance(statement, bytes):
+        statement = statement.decode("utf-8", "replace")
+    text = _SPACE_RE.sub(" ", str(statement)).strip()
+    text = _STRING_RE.sub("?", text)
+    text = _PLACEHOLDER_RE.sub("?", text)
+    text = _NUMBER_RE.sub("?", text)
+    text = _LIST_RE.sub("(?+)", text)
+    text = _ROWS_RE.sub("(?+)", text)
+    return text[:FINGERPRINT_MAX_LENGTH]
+
+
+class QueryStats:
+    """Counters for one request."""
+
+    __slots__ = (
+        "queries",
+        "db_seconds",
+        "connections",
+        "connect_seconds",
+        "slowest_seconds",
+        "slowest_sql",
+        "by_fingerprint",
+        "_last",
+    )
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.connections = 0
+        self.connect_seconds = 0.0
+        self.slowest_seconds = 0.0
+        self.slowest_sql = None
+        self.by_fingerprint = {}
+        self._last = None
+
+    def record_connect(self, seconds):
+        self.connections += 1
+        self.connect_seconds += seconds
+
+    def record_query(self, statement, seconds):
+        sql = fingerprint(statement)
+        self.queries += 1
+        self.db_seconds += seconds
+        entry = self.by_fingerprint.get(sql)
+        if entry is None:
+            entry = self.by_fingerprint[sql] = [0, 0.0]
+        entry[0] += 1
+        entry[1] += seconds
+        self._last = sql
+        if seconds > self.slowest_seconds:
+            self.slowest_seconds = seconds
+            self.slowest_sql = sql
+
+    def record_time(self, seconds):
+        """Fetches and commits: DB time that is not a new statement."""
+        self.db_seconds += seconds
+        if self._last is not None:
+            self.by_fingerprint[self._last][1] += seconds
+
+    def repeated(self, threshold=DB_N_PLUS_ONE_THRESHOLD):
+        """``[(fingerprint, count, seconds), ...]`` at or over ``threshold``, worst first."""
+        rows = [(sql, count, seconds) for sql, (count, seconds) in self.by_fingerprint.items() if count >= threshold]
+        rows.sort(key=lambda row: (-row[1], -row[2]))
+        return rows
+
+    def summary(self):
+        return {
+            "queries": self.queries,
+            "db_ms": round(self.db_seconds * 1000, 2),
+            "connections": self.connections,
+            "connect_ms": round(self.connect_seconds * 1000, 2),
+            "slowest_ms": round(self.slowest_seconds * 1000, 2),
+            "slowest_sql": self.slowest_sql,
+            "n_plus_one": [
+                {"sql": sql, "count": count, "ms": round(seconds * 1000, 2)}
+                for sql, count, seconds in self.repeated()[:REPORTED_REPEATS]
+            ],
+        }
+
+
+class _TimedCursor:
+    __slots__ = ("_cursor", "_stats", "_on_statement")
+
+    def __init__(self, cursor, stats, on_statement=None):
+        self._cursor = cursor
+        self._stats = stats
+        self._on_statement = on_statement
+
+    def _record(self, operation, params, seconds, many):
+        if self._stats is not None:
+            self._stats.record_query(operation, seconds)
+        if self._on_statement is not None:
+            self._on_statement(operation, params, seconds, many=many)
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return self._cursor.execute(operation, params, *args, **kwargs)
+        finally:
+            self._record(operation, params, time.perf_counter() - started, False)
+
+    def executemany(self, operation, seq_params, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return self._cursor.executemany(operation, seq_params, *args, **kwargs)
+        finally:
+            self._record(operation, seq_params, time.perf_counter() - started, True)
+
+    def _timed_fetch(self, method, *args):
+        if self._stats is None:
+            return getattr(self._cursor, method)(*args)
+        started = time.perf_counter()
+        try:
+            return getattr(self._cursor, method)(*args)
+        finally:
+            self._stats.record_time(time.perf_counter() - started)
+
+    def fetchone(self):
+        return self._timed_fetch("fetchone")
+
+    def fetchall(self):
+        return self._timed_fetch("fetchall")
+
+    def fetchmany(self, *args):
+        return self._timed_fetch("fetchmany", *args)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self._cursor.close()
+        return False
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class _TimedConnection:
+    __slots__ = ("_connection", "_stats", "_on_statement")
+
+    def __init__(self, connection, stats, on_statement=None):
+        self._connection = connection
+        self._stats = stats
+        self._on_statement = on_statement
+
+    def cursor(self, *args, **kwargs):
+        return _TimedCursor(self._connection.cursor(*args, **kwargs), self._stats, self._on_statement)
+
+    def commit(self):
+        if self._stats is None:
+            return self._connection.commit()
+        started = time.perf_counter()
+        try:
+            return self._connection.commit()
+        finally:
+            self._stats.record_time(time.perf_counter() - started)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self._connection.close()
+        return False
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+
+def current_stats():
+    return _current_stats.get()
+
+
+def instrument_connection(connect, on_statement=None):
+    """Open a connection with ``connect()`` and wrap it when anything is listening.
+
+    ``on_statement(statement, params, seconds, many=False)`` is called after
+    every statement, inside or outside a request.
+    """
+    stats = _current_stats.get()
+    if stats is None and on_statement is None:
+        return connect()
+    started = time.perf_counter()
+    connection = connect()
+    if stats is not None:
+        stats.record_connect(time.perf_counter() - started)
+    return _TimedConnection(connection, stats, on_statement)
+
+
+def _header_text(value):
+    text = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return text.encode("latin-1", "replace").decode("latin-1")
+
+
+def server_timing(summary):
+    parts = [
+        f'db;dur={summary["db_ms"]};desc="{summary["queries"]} queries"',
+        f'db-connect;dur={summary["connect_ms"]};desc="{summary["connections"]} connections"',
+    ]
+    if summary["slowest_sql"]:
+        parts.append(f'db-slowest;dur={summary["slowest_ms"]};desc="{_header_text(summary["slowest_sql"])}"')
+    for index, repeat in enumerate(summary["n_plus_one"], start=1):
+        parts.append(
+            f'db-repeat-{index};dur={repeat["ms"]};desc="{repeat["count"]}x {_header_text(repeat["sql"])}"'
+        )
+    return ", ".join(parts)
+
+
+def init_db_stats(app):
+    """Measure DB work per request; report via Server-Timing or a log line.
+
+    Without the header only heavy requests and likely N+1 loops are logged.
+    """
+    if not DB_STATS_ENABLED:
+        return
+
+    def send_header():
+        # "auto" is resolved per request: app.run(debug=True) sets debug after init.
+        if DB_STATS_SERVER_TIMING == "auto":
+            return app.debug
+        return DB_STATS_SERVER_TIMING not in ("0", "false", "no", "off")
+
+    @app.before_request
+    def _start_db_stats():
+        request.environ["tourgen.db_stats_token"] = _current_stats.set(QueryStats())
+
+    @app.after_request
+    def _report_db_stats(response):
+        stats = _current_stats.get()
+        if stats is None:
+            return response
+        summary = stats.summary()
+        if send_header():
+            response.headers.add("Server-Timing", server_timing(summary))
+        elif summary["n_plus_one"] or 0 < DB_STATS_LOG_MIN_QUERIES <= stats.queries:
+            record = {
+                "method": request.method,
+                "path": request.path,
+                "endpoint": request.endpoint,
+                "status": response.status_code,
+            }
+            record.update(summary)
+            app.logger.warning("[db-stats] %s", json.dumps(record, separators=(",", ":"), default=str))
+        return response
+
+    @app.teardown_request
+    def _stop_db_stats(exc=None):
+        token = request.environ.pop("tourgen.db_stats_token", None)
+        if token is not None:
+            try:
+                _current_stats.reset(token)
+            except ValueError:
+                # Token created in another context; just clear this one.
+                _current_stats.set(None)
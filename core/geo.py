@@ -0,0 +1,85 @@
+"""Batch coordinate validation and distances for itineraries and routes.
+
+Points are ``(lat, lng)`` pairs in any numeric or string form; missing or
+unparsable values are treated as invalid. NumPy is used when installed,
+otherwise the same results come from plain ``math``.
+"""
+
+from __future__ import annotations
+
+import math
+
+from core.india_geo import points_in_india
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def _split_points(points):
+    lats = []
+    lngs = []
+    for point in points:
+        lat, lng = point if point is not None else (None, None)
+        lats.append(lat)
+        lngs.append(lng)
+    return lats, lngs
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Great-circle distance between two points in kilometres."""
+    phi1 = math.radians(float(lat1))
+    phi2 = math.radians(float(lat2))
+    dphi = math.radians(float(lat2) - float(lat1))
+    dlambda = math.radians(float(lng2) - float(lng1))
+    a = (math.sin(dphi / 2) ** 2) + math.cos(phi1) * math.cos(phi2) * (math.sin(dlambda / 2) ** 2)
+    return EARTH_RADIUS_KM * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+def validate_points(points):
+    """Return one flag per point: True when it parses and lies inside India."""
+    lats, lngs = _split_points(points)
+    if not lats:
+        return []
+    return points_in_india(lats, lngs)
+
+
+def route_legs(points, valid=None):
+    """Return ``(legs, total_km)`` for an ordered list of points.
+
+    ``legs[i]`` is the distance from the previous valid point to point ``i``.
+    It is ``None`` for the first valid point and for invalid points, which are
+    skipped so the route runs straight from the last valid point to the next
+    one. ``valid`` defaults to :func:`validate_points`.
+    """
+    points = list(points)
+    if valid is None:
+        valid = validate_points(points)
+    legs = [None] * len(points)
+    indices = [index for index, ok in enumerate(valid) if ok]
+    if len(indices) < 2:
+        return legs, 0.0
+
+    if np is None:
+        total_km = 0.0
+        prev = points[indices[0]]
+        for index in indices[1:]:
+            point = points[index]
+            legs[index] = haversine_km(prev[0], prev[1], point[0], point[1])
+            total_km += legs[index]
+            prev = point
+        return legs, total_km
+
+    coords = np.radians(np.array([[float(points[i][0]), float(points[i][1])] for i in indices]))
+    phi = coords[:, 0]
+    dphi = np.diff(phi)
+    dlambda = np.diff(coords[:, 1])
+    a = np.sin(dphi / 2) ** 2 + np.cos(phi[:-1]) * np.cos(phi[1:]) * np.sin(dlambda / 2) ** 2
+    distances = EARTH_RADIUS_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+    for index, distance in zip(indices[1:], distances.tolist()):
+        legs[index] = distance
+    return legs, float(distances.sum())
@@ -5,12 +5,16 @@ import re
 from datetime import datetime
 from decimal import Decimal, InvalidOperation
 
-from flask import current_app
+from flask import current_app, flash
 from werkzeug.utils import secure_filename
 
+from core.config import UPLOAD_MAX_CSV_BYTES, UPLOAD_MAX_DOCUMENT_BYTES, UPLOAD_MAX_IMAGE_BYTES
 from core.india_geo import is_point_in_india
 
 from core.db import execute_db, query_db
+from core.images import generate_derivatives
+from core.storage import UploadRejected, record_stored_file, store_stream, write_stream
+from core.templating import bump_data_version
 
 
 DOC_FIELD_LABELS = {
@@ -43,20 +47,56 @@ ALLOWED_DOCUMENT_EXTENSIONS = {"pdf", "png", "jpg", "jpeg", "webp"}
 ALLOWED_IMAGE_EXTENSIONS = {"png", "jpg", "jpeg", "webp"}
 
 
-def save_upload(file_obj, folder=None):
+def _upload_size_cap(extension):
+    extension = extension.lower().lstrip(".")
+    if extension in ALLOWED_IMAGE_EXTENSIONS:
+        return UPLOAD_MAX_IMAGE_BYTES
+    if extension == "csv":
+        return UPLOAD_MAX_CSV_BYTES
+    return UPLOAD_MAX_DOCUMENT_BYTES
+
+
+def save_upload(file_obj, folder=None, make_derivatives=False, content_addressed=True, max_bytes=None):
+    """Save an upload and return its path relative to ``folder``.
+
+    Files are streamed in chunks to a temp file and renamed into place; their
+    magic bytes must match the extension and they must fit ``max_bytes``
+    (default: the per-type cap from config). Rejections are flashed and
+    return ``None``.
+
+    Files are content-addressed (``cas/<aa>/<bb>/<sha256><ext>``) so identical
+    uploads are stored once. Pass ``content_addressed=False`` for scratch files
+    that are deleted after use; those keep a unique timestamped name.
+    With ``make_derivatives`` the thumb/card/hero resizes are written too.
+    """
     if not file_obj or not file_obj.filename:
         return None
     filename = secure_filename(file_obj.filename)
     if not filename:
         return None
 
-    stamp = datetime.now().strftime("%Y%m%d%H%M%S%f")
-    final_name = f"{stamp}_{filename}"
-
+    extension = os.path.splitext(filename)[1]
+    if max_bytes is None:
+        max_bytes = _upload_size_cap(extension)
     destination = folder or current_app.config["UPLOAD_FOLDER"]
-    os.makedirs(destination, exist_ok=True)
-    file_path = os.path.join(destination, final_name)
-    file_obj.save(file_path)
+    upload_root = current_app.config["UPLOAD_FOLDER"]
+    try:
+        if content_addressed:
+            final_name, digest, size, _ = store_stream(file_obj.stream, destination, extension, max_bytes)
+            file_path = os.path.join(destination, final_name)
+            storage_path = os.path.relpath(file_path, upload_root).replace(os.sep, "/")
+            if not storage_path.startswith("../"):
+                record_stored_file(digest, storage_path, size, filename)
+        else:
+            stamp = datetime.now().strftime("%Y%m%d%H%M%S%f")
+            final_name = f"{stamp}_{filename}"
+            file_path = os.path.join(destination, final_name)
+            write_stream(file_obj.stream, file_path, max_bytes)
+    except UploadRejected as exc:
+        flash(f"{filename}: {exc}")
+        return None
+    if make_derivatives:
+        generate_derivatives(os.path.relpath(file_path, upload_root).replace(os.sep, "/"), upload_root)
     return final_name
 
 
@@ -216,6 +256,7 @@ def update_room_inventory_for_provider(room_type_id, new_available, provider_use
         """,
         (room_type_id, provider_user_id, old_available, new_available, note or None),
     )
+    bump_data_version("hotels")
     return True, "Room availability updated."
 
 
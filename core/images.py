@@ -0,0 +1,226 @@
+"""Resized image derivatives (thumb/card/hero in WebP + JPEG) for uploads.
+
+Derivatives live under ``DERIVED_UPLOAD_FOLDER`` mirroring the upload path,
+e.g. ``spots/Aru_Valley.jpg`` -> ``derived/card/spots/Aru_Valley.jpg.webp``.
+Pillow is optional: without it uploads still work and templates fall back
+to the original file.
+"""
+
+import os
+import threading
+import time
+
+from flask import url_for
+from markupsafe import Markup, escape
+
+from core.config import DERIVED_UPLOAD_FOLDER, UPLOAD_FOLDER
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # pragma: no cover - optional dependency
+    Image = None
+    ImageOps = None
+
+
+# Widths are upper bounds; smaller originals are never upscaled.
+IMAGE_VARIANTS = {
+    "thumb": 320,
+    "card": 640,
+    "hero": 1600,
+}
+IMAGE_FORMATS = ("webp", "jpg")
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp")
+
+_DEFAULT_SIZES = {
+    "thumb": "160px",
+    "card": "(max-width: 768px) 100vw, (max-width: 1200px) 50vw, 33vw",
+    "hero": "100vw",
+}
+_JPEG_QUALITY = 80
+_WEBP_QUALITY = 78
+_EXISTS_TTL_SECONDS = 300
+
+_exists_cache = {}
+_exists_lock = threading.Lock()
+_missing_pillow_reported = False
+
+
+def _derived_folder_name():
+    return os.path.relpath(DERIVED_UPLOAD_FOLDER, UPLOAD_FOLDER).replace(os.sep, "/")
+
+
+def is_local_image(image_value):
+    text = (image_value or "").strip()
+    if not text or text.lower().startswith(("http://", "https://")):
+        return False
+    return text.lower().endswith(IMAGE_EXTENSIONS)
+
+
+def derivative_relpath(image_value, variant, fmt):
+    """Path of a derivative relative to ``UPLOAD_FOLDER``."""
+    normalized = (image_value or "").replace("\\", "/").lstrip("/")
+    return f"{_derived_folder_name()}/{variant}/{normalized}.{fmt}"
+
+
+def _derivative_exists(relpath):
+    now = time.monotonic()
+    cached = _exists_cache.get(relpath)
+    if cached and now - cached[1] < _EXISTS_TTL_SECONDS:
+        return cached[0]
+    exists = os.path.isfile(os.path.join(UPLOAD_FOLDER, relpath))
+    with _exists_lock:
+        _exists_cache[relpath] = (exists, now)
+    return exists
+
+
+def _forget_derivatives(image_value):
+    with _exists_lock:
+        for variant in IMAGE_VARIANTS:
+            for fmt in IMAGE_FORMATS:
+                _exists_cache.pop(derivative_relpath(image_value, variant, fmt), None)
+
+
+def generate_derivatives(image_value, upload_root=UPLOAD_FOLDER, force=False):
+    """Write every variant/format for one upload; return the paths written.
+
+    Up-to-date derivatives (newer than the source) are skipped unless
+    ``force``. Unreadable images are reported and skipped.
+    """
+    global _missing_pillow_reported
+    if not is_local_image(image_value):
+        return []
+    if Image is None:
+        if not _missing_pillow_reported:
+            print("[image-warning] Pillow is not installed; skipping image derivatives.")
+            _missing_pillow_reported = True
+        return []
+
+    source_path = os.path.join(upload_root, image_value)
+    try:
+        source_mtime = os.path.getmtime(source_path)
+    except OSError:
+        return []
+
+    targets = []
+    for variant, width in IMAGE_VARIANTS.items():
+        for fmt in IMAGE_FORMATS:
+            target = os.path.join(upload_root, derivative_relpath(image_value, variant, fmt))
+            if force or not os.path.isfile(target) or os.path.getmtime(target) < source_mtime:
+                targets.append((variant, width, fmt, target))
+    if not targets:
+        return []
+
+    written = []
+    try:
+        with Image.open(source_path) as original:
+            largest = max(width for _, width, _, _ in targets)
+            if original.format == "JPEG":
+                # Let the JPEG decoder downscale by a power of two first.
+                original.draft("RGB", (largest, largest * original.height // max(original.width, 1)))
+            image = ImageOps.exif_transpose(original)
+            if image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+
+            resized_by_width = {}
+            for variant, width, fmt, target in targets:
+                target_width = min(width, image.width)
+                resized = resized_by_width.get(target_width)
+                if resized is None:
+                    target_height = max(1, round(image.height * target_width / image.width))
+                    resized = image.resize((target_width, target_height), Image.LANCZOS)
+                    resized_by_width[target_width] = resized
+
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                tmp_path = f"{target}.tmp"
+                if fmt == "webp":
+                    resized.save(tmp_path, "WEBP", quality=_WEBP_QUALITY, method=4)
+                else:
+                    flattened = resized
+                    if resized.mode == "RGBA":
+                        flattened = Image.new("RGB", resized.size, (255, 255, 255))
+                        flattened.paste(resized, mask=resized.split()[-1])
+                    flattened.save(tmp_path, "JPEG", quality=_JPEG_QUALITY, optimize=True, progressive=True)
+                os.replace(tmp_path, target)
+                written.append(target)
+    except (OSError, ValueError) as exc:
+        print(f"[image-warning] Could not create derivatives for {image_value}: {exc}")
+    finally:
+        _forget_derivatives(image_value)
+    return written
+
+
+def iter_local_images(upload_root=UPLOAD_FOLDER, skip_dirs=("documents",)):
+    """Yield upload-relative paths of every original image under ``upload_root``."""
+    skipped = {_derived_folder_name().split("/")[0], *skip_dirs}
+    for dirpath, dirnames, filenames in os.walk(upload_root):
+        rel_dir = os.path.relpath(dirpath, upload_root).replace(os.sep, "/")
+        if rel_dir == ".":
+            dirnames[:] = [name for name in dirnames if name not in skipped]
+            rel_dir = ""
+        for filename in filenames:
+            if filename.lower().endswith(IMAGE_EXTENSIONS):
+                yield f"{rel_dir}/{filename}" if rel_dir else filename
+
+
+def image_variant_path(image_value, variant="card", fmt="jpg"):
+    """Static path (under ``static/``) of the best available file for ``variant``."""
+    normalized = (image_value or "demo.jpg").replace("\\", "/").lstrip("/")
+    if is_local_image(normalized):
+        relpath = derivative_relpath(normalized, variant, fmt)
+        if _derivative_exists(relpath):
+            return f"uploads/{relpath}"
+    return f"uploads/{normalized}"
+
+
+def responsive_image(image_value, variant="card", photo_source=None, alt="", sizes=None, **attrs):
+    """Render a ``<picture>`` with WebP/JPEG srcsets, or a plain ``<img>``.
+
+    External URLs and images without derivatives render the original file.
+    Extra keyword args become ``<img>`` attributes (``class_`` -> ``class``);
+    pass ``loading=None`` to drop the default lazy loading.
+    """
+    img_attrs = {"alt": alt, "loading": "lazy", "decoding": "async"}
+    for key, value in attrs.items():
+        name = key.rstrip("_").replace("_", "-")
+        if value is None:
+            img_attrs.pop(name, None)
+        else:
+            img_attrs[name] = value
+
+    def render_img(src, srcset=None, img_sizes=None):
+        parts = [f'src="{escape(src)}"']
+        if srcset:
+            parts.append(f'srcset="{escape(srcset)}"')
+            parts.append(f'sizes="{escape(img_sizes)}"')
+        parts.extend(f'{key}="{escape(value)}"' for key, value in img_attrs.items())
+        return f"<img {' '.join(parts)}>"
+
+    text = (image_value or "").strip() or "demo.jpg"
+    if photo_source == "external_url" or text.lower().startswith(("http://", "https://")):
+        return Markup(render_img(text))
+
+    normalized = text.replace("\\", "/").lstrip("/")
+    max_width = IMAGE_VARIANTS.get(variant, IMAGE_VARIANTS["card"])
+    widths = [(name, width) for name, width in IMAGE_VARIANTS.items() if width <= max_width]
+    srcsets = {}
+    if is_local_image(normalized):
+        for fmt in IMAGE_FORMATS:
+            entries = []
+            for name, width in widths:
+                relpath = derivative_relpath(normalized, name, fmt)
+                if _derivative_exists(relpath):
+                    entries.append(f"{url_for('static', filename='uploads/' + relpath)} {width}w")
+            if entries:
+                srcsets[fmt] = ", ".join(entries)
+
+    fallback_src = url_for("static", filename=image_variant_path(normalized, variant, "jpg"))
+    if not srcsets:
+        return Markup(render_img(fallback_src))
+
+    img_sizes = sizes or _DEFAULT_SIZES.get(variant, "100vw")
+    html = ["<picture>"]
+    if "webp" in srcsets:
+        html.append(f'<source type="image/webp" srcset="{escape(srcsets["webp"])}" sizes="{escape(img_sizes)}">')
+    html.append(render_img(fallback_src, srcsets.get("jpg"), img_sizes))
+    html.append("</picture>")
+    return Markup("".join(html))
@@ -1,11 +1,25 @@
-"""Geospatial helpers for validating if a coordinate is inside India."""
+"""Geospatial helpers for validating if a coordinate is inside India.
+
+The boundary is prepared once: ring edges are bucketed into latitude bands,
+and a raster over the bounding box marks every cell as fully inside, fully
+outside or on the boundary. Most lookups are answered from the raster; only
+points in boundary cells ray-cast, and only against the edges of their band.
+:func:`points_in_india` vectorises the same test with NumPy when it is
+installed.
+"""
 
 from __future__ import annotations
 
 import json
+import math
 from functools import lru_cache
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, NamedTuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
 
 
 _INDIA_BOUNDARY_FILE = Path(__file__).resolve().parent / "data" / "india_boundary_110m.geojson"
@@ -16,6 +30,12 @@ _INDIA_FALLBACK_BOUNDS = {
     "lng_max": 97.3956,
 }
 
+LATITUDE_BANDS = 256
+RASTER_CELL_DEG = 0.1
+_CELL_OUTSIDE = 0
+_CELL_INSIDE = 1
+_CELL_BOUNDARY = 2
+
 
 def _point_in_ring(lng: float, lat: float, ring: list[list[float]]) -> bool:
     """Ray-casting point-in-polygon test for one linear ring."""
@@ -97,8 +117,131 @@ def _india_bbox():
     return min(xs), min(ys), max(xs), max(ys)
 
 
-def is_point_in_india(lat: float, lng: float) -> bool:
-    """Return True when point is inside India polygon (with safe fallback bounds)."""
+class _PreparedGeometry(NamedTuple):
+    min_lng: float
+    min_lat: float
+    max_lng: float
+    max_lat: float
+    band_height: float
+    band_edges: list  # per band: [(x1, y1, x2, y2), ...]
+    cell_deg: float
+    rows: int
+    cols: int
+    raster: bytearray
+    arrays: dict | None  # NumPy copies for the batch path
+
+
+def _to_float(value):
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return math.nan
+    return number
+
+
+def _band_of(prepared: _PreparedGeometry, lat: float) -> int:
+    return min(int((lat - prepared.min_lat) / prepared.band_height), LATITUDE_BANDS - 1)
+
+
+def _ray_cast(lng: float, lat: float, edges) -> bool:
+    inside = False
+    for x1, y1, x2, y2 in edges:
+        if ((y1 > lat) != (y2 > lat)) and lng < (x2 - x1) * (lat - y1) / (y2 - y1) + x1:
+            inside = not inside
+    return inside
+
+
+def _mark_boundary_cells(raster, rows, cols, min_lng, min_lat, cell_deg, edge):
+    """Flag every cell the edge passes through, plus a one-cell margin."""
+    x1, y1, x2, y2 = edge
+    steps = max(1, int(math.ceil(max(abs(x2 - x1), abs(y2 - y1)) / (cell_deg / 4))))
+    for step in range(steps + 1):
+        t = step / steps
+        row = int((y1 + (y2 - y1) * t - min_lat) / cell_deg)
+        col = int((x1 + (x2 - x1) * t - min_lng) / cell_deg)
+        for r in range(max(0, row - 1), min(rows, row + 2)):
+            base = r * cols
+            for c in range(max(0, col - 1), min(cols, col + 2)):
+                raster[base + c] = _CELL_BOUNDARY
+
+
+@lru_cache(maxsize=1)
+def _prepared_india():
+    polygons = _load_india_geometry()
+    if not polygons:
+        return None
+    min_lng, min_lat, max_lng, max_lat = _india_bbox()
+
+    # Edges of every ring (outer and holes): even-odd crossing parity over all
+    # of them matches "inside an outer ring and not inside a hole". Horizontal
+    # edges never straddle a latitude, so they are dropped.
+    edges = []
+    for polygon in polygons:
+        for ring in polygon:
+            if len(ring) < 3:
+                continue
+            j = len(ring) - 1
+            for i in range(len(ring)):
+                x1, y1 = float(ring[i][0]), float(ring[i][1])
+                x2, y2 = float(ring[j][0]), float(ring[j][1])
+                if y1 != y2:
+                    edges.append((x1, y1, x2, y2))
+                j = i
+
+    band_height = (max_lat - min_lat) / LATITUDE_BANDS or 1e-9
+    band_ids = [[] for _ in range(LATITUDE_BANDS)]
+    for edge_id, (_, y1, _, y2) in enumerate(edges):
+        first = min(int((min(y1, y2) - min_lat) / band_height), LATITUDE_BANDS - 1)
+        last = min(int((max(y1, y2) - min_lat) / band_height), LATITUDE_BANDS - 1)
+        for band in range(first, last + 1):
+            band_ids[band].append(edge_id)
+    band_edges = [[edges[edge_id] for edge_id in ids] for ids in band_ids]
+
+    rows = int((max_lat - min_lat) / RASTER_CELL_DEG) + 1
+    cols = int((max_lng - min_lng) / RASTER_CELL_DEG) + 1
+    raster = bytearray(rows * cols)
+    for edge in edges:
+        _mark_boundary_cells(raster, rows, cols, min_lng, min_lat, RASTER_CELL_DEG, edge)
+
+    prepared = _PreparedGeometry(
+        min_lng, min_lat, max_lng, max_lat, band_height, band_edges, RASTER_CELL_DEG, rows, cols, raster, None
+    )
+    # No edge touches a run of non-boundary cells in a row, so one ray cast
+    # (at the first cell's centre) classifies the whole run.
+    for row in range(rows):
+        base = row * cols
+        centre_lat = min_lat + (row + 0.5) * RASTER_CELL_DEG
+        band = band_edges[_band_of(prepared, min(centre_lat, max_lat))]
+        status = None
+        for col in range(cols):
+            if raster[base + col] == _CELL_BOUNDARY:
+                status = None
+                continue
+            if status is None:
+                centre_lng = min_lng + (col + 0.5) * RASTER_CELL_DEG
+                status = _CELL_INSIDE if _ray_cast(centre_lng, centre_lat, band) else _CELL_OUTSIDE
+            raster[base + col] = status
+
+    if np is not None:
+        offsets = np.zeros(LATITUDE_BANDS + 1, dtype=np.intp)
+        offsets[1:] = np.cumsum([len(ids) for ids in band_ids])
+        edge_array = np.asarray(edges, dtype=float).reshape(-1, 4)
+        prepared = prepared._replace(
+            arrays={
+                "x1": edge_array[:, 0],
+                "y1": edge_array[:, 1],
+                "x2": edge_array[:, 2],
+                "y2": edge_array[:, 3],
+                "band_offsets": offsets,
+                "band_ids": np.fromiter((i for ids in band_ids for i in ids), dtype=np.intp),
+                "raster": np.frombuffer(bytes(raster), dtype=np.uint8),
+            }
+        )
+    return prepared
+
+
+def is_point_in_india_reference(lat: float, lng: float) -> bool:
+    """Unprepared ray cast over every ring; the baseline for benchmarks/tests."""
     if lat is None or lng is None:
         return False
 
@@ -123,3 +266,81 @@ def is_point_in_india(lat: float, lng: float) -> bool:
         if _point_in_polygon(lng, lat, polygon):
             return True
     return False
+
+
+def is_point_in_india(lat: float, lng: float) -> bool:
+    """Return True when point is inside India polygon (with safe fallback bounds)."""
+    if lat is None or lng is None:
+        return False
+    lat = _to_float(lat)
+    lng = _to_float(lng)
+
+    prepared = _prepared_india()
+    if prepared is None:
+        return is_point_in_india_reference(lat, lng)
+    if not (prepared.min_lat <= lat <= prepared.max_lat and prepared.min_lng <= lng <= prepared.max_lng):
+        return False
+
+    row = int((lat - prepared.min_lat) / prepared.cell_deg)
+    col = int((lng - prepared.min_lng) / prepared.cell_deg)
+    status = prepared.raster[row * prepared.cols + col]
+    if status != _CELL_BOUNDARY:
+        return status == _CELL_INSIDE
+    return _ray_cast(lng, lat, prepared.band_edges[_band_of(prepared, lat)])
+
+
+def _as_float_array(values):
+    try:
+        return np.asarray(values, dtype=float).reshape(-1)
+    except (TypeError, ValueError):
+        return np.fromiter((_to_float(value) for value in values), dtype=float)
+
+
+def _ray_cast_batch(prepared: _PreparedGeometry, lngs, lats):
+    arrays = prepared.arrays
+    bands = np.minimum(((lats - prepared.min_lat) / prepared.band_height).astype(np.intp), LATITUDE_BANDS - 1)
+    order = np.argsort(bands, kind="stable")
+    unique_bands, starts = np.unique(bands[order], return_index=True)
+    ends = np.append(starts[1:], order.size)
+    inside = np.zeros(lats.size, dtype=bool)
+    for band, start, end in zip(unique_bands, starts, ends):
+        edge_ids = arrays["band_ids"][arrays["band_offsets"][band] : arrays["band_offsets"][band + 1]]
+        if edge_ids.size == 0:
+            continue
+        points = order[start:end]
+        px = lngs[points][:, None]
+        py = lats[points][:, None]
+        x1, y1 = arrays["x1"][edge_ids], arrays["y1"][edge_ids]
+        x2, y2 = arrays["x2"][edge_ids], arrays["y2"][edge_ids]
+        crosses = ((y1 > py) != (y2 > py)) & (px < (x2 - x1) * (py - y1) / (y2 - y1) + x1)
+        inside[points] = np.count_nonzero(crosses, axis=1) % 2 == 1
+    return inside
+
+
+def points_in_india(lats, lngs) -> list[bool]:
+    """Batch :func:`is_point_in_india`; invalid or missing values give False."""
+    prepared = _prepared_india()
+    if np is None or prepared is None:
+        return [is_point_in_india(lat, lng) for lat, lng in zip(lats, lngs)]
+
+    lat = _as_float_array(lats)
+    lng = _as_float_array(lngs)
+    if lat.size != lng.size:
+        raise ValueError("lats and lngs must have the same length")
+    result = np.zeros(lat.size, dtype=bool)
+    with np.errstate(invalid="ignore"):
+        candidates = np.nonzero(
+            (lat >= prepared.min_lat)
+            & (lat <= prepared.max_lat)
+            & (lng >= prepared.min_lng)
+            & (lng <= prepared.max_lng)
+        )[0]
+    if candidates.size:
+        rows = ((lat[candidates] - prepared.min_lat) / prepared.cell_deg).astype(np.intp)
+        cols = ((lng[candidates] - prepared.min_lng) / prepared.cell_deg).astype(np.intp)
+        status = prepared.arrays["raster"][rows * prepared.cols + cols]
+        result[candidates[status == _CELL_INSIDE]] = True
+        boundary = candidates[status == _CELL_BOUNDARY]
+        if boundary.size:
+            result[boundary] = _ray_cast_batch(prepared, lng[boundary], lat[boundary])
+    return result.tolist()
@@ -0,0 +1,212 @@
+"""Suggest shorter day-wise itinerary orders (nearest neighbour + 2-opt).
+
+The distance matrix is computed once per draft. Each day is then reordered
+on its own, so spots never move between days. A day's route starts where
+the previous day ended and favours ending near the next day's stops; days
+whose new order lengthens the whole tour keep their submitted order. The first day tries every start for the nearest
+neighbour (up to ``MULTI_START_MAX_STOPS`` stops). Stops whose coordinates
+are missing or outside India cannot be placed; they keep their submitted
+order after the optimised ones.
+"""
+
+from __future__ import annotations
+
+import math
+import time
+
+from core.geo import EARTH_RADIUS_KM, validate_points
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+
+MULTI_START_MAX_STOPS = 30
+TWO_OPT_MAX_PASSES = 50
+_EPSILON = 1e-9
+
+
+def distance_matrix(points):
+    """Pairwise haversine km for ``[(lat, lng), ...]`` as a list of rows."""
+    if not points:
+        return []
+    if np is not None:
+        coords = np.radians(np.asarray(points, dtype=float))
+        lat = coords[:, 0][:, None]
+        lng = coords[:, 1][:, None]
+        a = np.sin((lat - lat.T) / 2) ** 2 + np.cos(lat) * np.cos(lat.T) * np.sin((lng - lng.T) / 2) ** 2
+        return (EARTH_RADIUS_KM * 2 * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))).tolist()
+    radians = [(math.radians(lat), math.radians(lng)) for lat, lng in points]
+    matrix = [[0.0] * len(points) for _ in points]
+    for i, (phi1, lam1) in enumerate(radians):
+        for j in range(i + 1, len(points)):
+            phi2, lam2 = radians[j]
+            a = math.sin((phi2 - phi1) / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin((lam2 - lam1) / 2) ** 2
+            matrix[i][j] = matrix[j][i] = EARTH_RADIUS_KM * 2 * math.asin(math.sqrt(min(1.0, a)))
+    return matrix
+
+
+def path_length(path, matrix, anchor=None):
+    total = matrix[anchor][path[0]] if anchor is not None and path else 0.0
+    for a, b in zip(path, path[1:]):
+        total += matrix[a][b]
+    return total
+
+
+def _nearest_neighbour(nodes, matrix, start, anchor=None):
+    """Greedy path through ``nodes`` beginning at ``start``."""
+    remaining = set(nodes)
+    if start is None:
+        start = min(remaining, key=lambda node: matrix[anchor][node])
+    remaining.discard(start)
+    path = [start]
+    while remaining:
+        last = path[-1]
+        nearest = min(remaining, key=lambda node: matrix[last][node])
+        remaining.discard(nearest)
+        path.append(nearest)
+    return path
+
+
+def _two_opt(path, matrix, anchor=None):
+    """Improve an open path in place; ``anchor`` (if any) precedes it and stays fixed."""
+    nodes = ([anchor] if anchor is not None else []) + path
+    first = 1 if anchor is not None else 0
+    size = len(nodes)
+    for _ in range(TWO_OPT_MAX_PASSES):
+        improved = False
+        for i in range(max(first, 1), size - 1):
+            before = nodes[i - 1]
+            for k in range(i + 1, size):
+                # Reverse nodes[i..k]: edges (i-1, i) and (k, k+1) are swapped for
+                # (i-1, k) and (i, k+1); an open path has no edge after its end.
+                delta = matrix[before][nodes[k]] - matrix[before][nodes[i]]
+                if k + 1 < size:
+                    delta += matrix[nodes[i]][nodes[k + 1]] - matrix[nodes[k]][nodes[k + 1]]
+                if delta < -_EPSILON:
+                    nodes[i : k + 1] = reversed(nodes[i : k + 1])
+                    improved = True
+        if first == 0 and size > 2:
+            # Without an anchor the path may also start elsewhere: reversing a
+            # prefix only changes the edge after it.
+            for k in range(1, size - 1):
+                if matrix[nodes[0]][nodes[k + 1]] < matrix[nodes[k]][nodes[k + 1]] - _EPSILON:
+                    nodes[0 : k + 1] = reversed(nodes[0 : k + 1])
+                    improved = True
+        if not improved:
+            break
+    return nodes[first:]
+
+
+def _day_cost(path, matrix, anchor, next_nodes):
+    """Length of ``path`` from ``anchor`` plus the hop to the nearest stop of the next day."""
+    total = path_length(path, matrix, anchor)
+    if path and next_nodes:
+        total += min(matrix[path[-1]][node] for node in next_nodes)
+    return total
+
+
+def _optimise_day(nodes, matrix, anchor, next_nodes=()):
+    if len(nodes) <= 1:
+        return list(nodes)
+    if anchor is not None:
+        candidates = [_nearest_neighbour(nodes, matrix, None, anchor)]
+    elif len(nodes) <= MULTI_START_MAX_STOPS:
+        candidates = [_nearest_neighbour(nodes, matrix, start) for start in nodes]
+    else:
+        candidates = [_nearest_neighbour(nodes, matrix, nodes[0])]
+    best = min(candidates, key=lambda path: _day_cost(path, matrix, anchor, next_nodes))
+    # 2-opt ignores where the day has to end, so keep it only when it helps.
+    improved = _two_opt(list(best), matrix, anchor)
+    if _day_cost(improved, matrix, anchor, next_nodes) < _day_cost(best, matrix, anchor, next_nodes):
+        best = improved
+    # Never suggest something worse than what was submitted.
+    if _day_cost(best, matrix, anchor, next_nodes) > _day_cost(list(nodes), matrix, anchor, next_nodes) - _EPSILON:
+        return list(nodes)
+    return best
+
+
+def _tour_length(day_orders, matrix):
+    nodes = [node for order in day_orders for node in order]
+    return path_length(nodes, matrix) if nodes else 0.0
+
+
+def _keep_shorter_days(submitted, ordered, matrix):
+    """Revert reordered days that make the whole tour longer.
+
+    Days are optimised one after another, so a day can end far from where
+    the next one starts. Each reordered day is put back to its submitted
+    order when that shortens the whole tour; if the tour is still longer
+    than submitted, every day is put back.
+    """
+    ordered = list(ordered)
+    best_km = _tour_length(ordered, matrix)
+    for index, nodes in enumerate(submitted):
+        if ordered[index] == nodes:
+            continue
+        trial = ordered[:index] + [list(nodes)] + ordered[index + 1 :]
+        trial_km = _tour_length(trial, matrix)
+        if trial_km < best_km - _EPSILON:
+            ordered, best_km = trial, trial_km
+    if best_km > _tour_length(submitted, matrix) - _EPSILON:
+        return [list(nodes) for nodes in submitted]
+    return ordered
+
+
+def optimise_itinerary(stops):
+    """Suggest a per-day order for ``stops``.
+
+    ``stops`` is the submitted itinerary in order: dicts with ``spot_id``,
+    ``day_number``, ``latitude`` and ``longitude``. Returns per-day suggested
+    spot ids plus original/optimised/saved km, measured like the booking
+    page (consecutive valid stops across the whole tour). The suggestion is
+    never longer than the submitted order over the whole tour.
+    """
+    started = time.perf_counter()
+    valid = validate_points((stop.get("latitude"), stop.get("longitude")) for stop in stops)
+    placed = [index for index, ok in enumerate(valid) if ok]
+    matrix_points = [(float(stops[i]["latitude"]), float(stops[i]["longitude"])) for i in placed]
+    matrix = distance_matrix(matrix_points)
+    node_of = {stop_index: node for node, stop_index in enumerate(placed)}
+
+    days = {}
+    for index, stop in enumerate(stops):
+        days.setdefault(int(stop["day_number"]), []).append(index)
+    day_numbers = sorted(days)
+    submitted = [[node_of[i] for i in days[day_number] if i in node_of] for day_number in day_numbers]
+
+    ordered_days = []
+    anchor = None
+    for position, nodes in enumerate(submitted):
+        next_nodes = next((later for later in submitted[position + 1 :] if later), ())
+        ordered = _optimise_day(nodes, matrix, anchor, next_nodes)
+        if ordered:
+            anchor = ordered[-1]
+        ordered_days.append(ordered)
+    ordered_days = _keep_shorter_days(submitted, ordered_days, matrix)
+
+    day_results = []
+    for day_number, nodes, ordered in zip(day_numbers, submitted, ordered_days):
+        unplaced = [i for i in days[day_number] if i not in node_of]
+        day_results.append(
+            {
+                "day_number": day_number,
+                "spot_ids": [int(stops[placed[node]]["spot_id"]) for node in ordered]
+                + [int(stops[i]["spot_id"]) for i in unplaced],
+                "unplaced_spot_ids": [int(stops[i]["spot_id"]) for i in unplaced],
+                "changed": ordered != nodes,
+            }
+        )
+
+    original_km = _tour_length(submitted, matrix)
+    optimised_km = _tour_length(ordered_days, matrix)
+    return {
+        "days": day_results,
+        "original_km": round(original_km, 1),
+        "optimised_km": round(optimised_km, 1),
+        "saved_km": round(original_km - optimised_km, 1),
+        "stop_count": len(stops),
+        "placed_count": len(placed),
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
@@ -0,0 +1,258 @@
+"""DB-backed background jobs for long organizer/admin operations.
+
+Requests enqueue a row in ``jobs`` and return immediately; workers started by
+``scripts/run_job_worker.py`` claim queued rows, run the registered handler
+and record progress so the UI can poll ``/jobs/<id>``.
+"""
+
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+
+from core.config import JOB_MAX_ATTEMPTS, JOB_POLL_SECONDS, JOB_STALE_MINUTES
+from core.db import execute_db, get_db, query_db
+
+
+JOB_HANDLERS = {}
+
+JOB_FINAL_STATUSES = ("succeeded", "failed")
+
+
+def job_handler(job_type):
+    """Register ``func(payload, progress)`` as the runner for ``job_type``."""
+
+    def decorator(func):
+        JOB_HANDLERS[job_type] = func
+        return func
+
+    return decorator
+
+
+def enqueue_job(job_type, payload, created_by=None):
+    if job_type not in JOB_HANDLERS:
+        raise ValueError(f"Unknown job type: {job_type}")
+    return execute_db(
+        "INSERT INTO jobs(job_type, status, created_by, payload) VALUES(%s,'queued',%s,%s)",
+        (job_type, created_by, json.dumps(payload or {})),
+    )
+
+
+def get_job(job_id):
+    job = query_db(
+        """
+        SELECT
+            id, job_type, status, created_by, result, error_message,
+            progress_done, progress_total, progress_message, attempts,
+            created_at, started_at, finished_at
+        FROM jobs
+        WHERE id=%s
+        """,
+        (job_id,),
+        one=True,
+    )
+    if job and job.get("result"):
+        try:
+            job["result"] = json.loads(job["result"])
+        except ValueError:
+            pass
+    return job
+
+
+def list_user_jobs(user_id, limit=10):
+    return query_db(
+        """
+        SELECT
+            id, job_type, status, progress_done, progress_total, progress_message,
+            error_message, created_at, finished_at
+        FROM jobs
+        WHERE created_by=%s
+        ORDER BY id DESC
+        LIMIT %s
+        """,
+        (user_id, limit),
+    )
+
+
+def set_job_progress(job_id, done, total=None, message=None):
+    execute_db(
+        """
+        UPDATE jobs
+        SET progress_done=%s, progress_total=%s, progress_message=%s
+        WHERE id=%s
+        """,
+        (int(done or 0), total, (message or "")[:255] or None, job_id),
+    )
+
+
+def _finish_job(job_id, status, result=None, error_message=None):
+    execute_db(
+        """
+        UPDATE jobs
+        SET status=%s, result=%s, error_message=%s, finished_at=NOW()
+        WHERE id=%s
+        """,
+        (
+            status,
+            json.dumps(result) if result is not None else None,
+            (error_message or "")[:500] or None,
+            job_id,
+        ),
+    )
+
+
+def claim_next_job(worker_id):
+    """Atomically move the oldest queued job to ``running`` for this worker."""
+    claim_token = f"{worker_id}:{uuid.uuid4().hex[:12]}"
+    db = get_db()
+    cur = db.cursor(dictionary=True)
+    try:
+        # Single-row UPDATE ... LIMIT 1 is atomic under InnoDB row locks, so two
+        # workers can never claim the same job.
+        cur.execute(
+            """
+            UPDATE jobs
+            SET status='running', worker_id=%s, started_at=NOW(), attempts=attempts+1
+            WHERE status='queued'
+            ORDER BY id
+            LIMIT 1
+            """,
+            (claim_token,),
+        )
+        db.commit()
+        if cur.rowcount <= 0:
+            return None
+        cur.execute(
+            "SELECT id, job_type, payload, attempts FROM jobs WHERE worker_id=%s LIMIT 1",
+            (claim_token,),
+        )
+        return cur.fetchone()
+    finally:
+        cur.close()
+        db.close()
+
+
+def requeue_stale_jobs(stale_minutes=JOB_STALE_MINUTES, max_attempts=JOB_MAX_ATTEMPTS):
+    """Recover jobs left ``running`` by a worker that died mid-run."""
+    db = get_db()
+    cur = db.cursor()
+    try:
+        cur.execute(
+            """
+            UPDATE jobs
+            SET status=CASE WHEN attempts >= %s THEN 'failed' ELSE 'queued' END,
+                error_message=CASE WHEN attempts >= %s THEN 'Worker stopped responding.' ELSE error_message END,
+                finished_at=CASE WHEN attempts >= %s THEN NOW() ELSE finished_at END,
+                worker_id=NULL
+            WHERE status='running'
+              AND COALESCE(updated_at, started_at) < (NOW() - INTERVAL %s MINUTE)
+            """,
+            (max_attempts, max_attempts, max_attempts, stale_minutes),
+        )
+        db.commit()
+        return cur.rowcount
+    finally:
+        cur.close()
+        db.close()
+
+
+def run_job(job):
+    job_id = job["id"]
+    handler = JOB_HANDLERS.get(job["job_type"])
+    if handler is None:
+        _finish_job(job_id, "failed", error_message=f"No handler for job type {job['job_type']}.")
+        return False
+
+    def progress(done, total=None, message=None):
+        set_job_progress(job_id, done, total, message)
+
+    try:
+        payload = json.loads(job.get("payload") or "{}")
+        result = handler(payload, progress)
+    except Exception as exc:
+        print(f"[job-error] Job #{job_id} ({job['job_type']}) failed: {exc}")
+        _finish_job(job_id, "failed", error_message=str(exc) or exc.__class__.__name__)
+        return False
+
+    _finish_job(job_id, "succeeded", result=result)
+    print(f"[job] Job #{job_id} ({job['job_type']}) succeeded.")
+    return True
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.current_thread().name}"
+
+
+def work_loop(stop_event, poll_seconds=JOB_POLL_SECONDS, once=False):
+    """Claim and run jobs until ``stop_event`` is set (or the queue drains when ``once``)."""
+    worker_id = default_worker_id()
+    while not stop_event.is_set():
+        try:
+            job = claim_next_job(worker_id)
+        except Exception as exc:
+            print(f"[job-warning] {worker_id} could not poll jobs: {exc}")
+            job = None
+            if once:
+                return
+        if job:
+            run_job(job)
+            continue
+        if once:
+            return
+        stop_event.wait(poll_seconds)
+
+
+@job_handler("spot_csv_import")
+def _run_spot_csv_import(payload, progress):
+    from core.spot_import import import_spots_csv
+
+    csv_path = payload["csv_path"]
+    started = time.perf_counter()
+    try:
+        with open(csv_path, encoding="utf-8-sig", newline="") as text_stream:
+            result = import_spots_csv(
+                text_stream,
+                int(payload.get("default_city_id") or 0),
+                payload["upload_folder"],
+                payload["spot_folder"],
+                progress=progress,
+            )
+    finally:
+        try:
+            os.remove(csv_path)
+        except OSError:
+            pass
+    result["seconds"] = round(time.perf_counter() - started, 2)
+    return result
+
+
+@job_handler("tour_route_metrics")
+def _run_tour_route_metrics(payload, progress):
+    """Recompute stored route metrics after spot coordinates change.
+
+    Payload: ``{"spot_ids": [...]}`` and/or ``{"tour_ids": [...]}``.
+    """
+    from core.route_metrics import ROUTE_METRICS_BATCH_SIZE, refresh_tour_route_metrics, tour_ids_for_spots
+
+    tour_ids = set(tour_ids_for_spots(payload.get("spot_ids")))
+    tour_ids.update(int(tour_id) for tour_id in payload.get("tour_ids") or [])
+    tour_ids = sorted(tour_ids)
+    db = get_db()
+    cur = db.cursor()
+    try:
+        done = 0
+        progress(0, len(tour_ids), "Recomputing route metrics")
+        for start in range(0, len(tour_ids), ROUTE_METRICS_BATCH_SIZE):
+            chunk = tour_ids[start : start + ROUTE_METRICS_BATCH_SIZE]
+            done += refresh_tour_route_metrics(cur, chunk)
+            db.commit()
+            progress(done, len(tour_ids), f"Recomputed {done} of {len(tour_ids)} tours")
+        return {"tours": done}
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        cur.close()
+        db.close()
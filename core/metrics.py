@@ -0,0 +1,275 @@
+"""Request metrics in Prometheus text format.
+
+Every request is recorded against its Flask endpoint:
+- a latency histogram with fixed ``LATENCY_BUCKETS``
+- counts by status
+- an in-flight gauge
+- DB statements, DB time and connections opened, from ``core.db_stats``
+
+Each request borrows an accumulator slot from a pool when it starts and
+returns it at teardown. Only the borrowing request writes to a slot, and
+the pool only grows to the peak number of concurrent requests. That holds
+even under ``app.run()``, which starts a new thread per request. Writes take
+the slot's own lock, which only a scrape contends for. :func:`render_metrics`
+copies every slot under that lock and sums the copies, so no slot is ever
+left out of a scrape. Gauges from other modules are registered
+with :func:`register_gauge`.
+
+Values are per process. Under a multi-worker server, scrape each worker or
+aggregate the totals.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+
+from flask import request
+
+from core.db_stats import current_stats
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+UNMATCHED_ENDPOINT = "unmatched"
+METRIC_PREFIX = "tourgen"
+
+_ENVIRON_START = "tourgen.metrics_start"
+_ENVIRON_ENDPOINT = "tourgen.metrics_endpoint"
+_ENVIRON_STATUS = "tourgen.metrics_status"
+_ENVIRON_DB = "tourgen.metrics_db"
+_ENVIRON_SLOT = "tourgen.metrics_slot"
+
+# Every slot ever created, and the ones not currently borrowed.
+_registry = []
+_free_slots = []
+_registry_lock = threading.Lock()
+_gauges = []
+_default_gauges_registered = False
+_process_start = time.time()
+
+
+class _SlotMetrics:
+    __slots__ = ("lock", "buckets", "sums", "statuses", "started", "finished", "db")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # endpoint -> per-bucket counts (non-cumulative; last slot is +Inf)
+        self.buckets = {}
+        self.sums = {}
+        self.statuses = {}
+        self.started = {}
+        self.finished = {}
+        # endpoint -> [statements, seconds, connections]
+        self.db = {}
+
+    def merge_into(self, other):
+        for endpoint, counts in self.buckets.items():
+            target = other.buckets.setdefault(endpoint, [0] * (len(LATENCY_BUCKETS) + 1))
+            for index, count in enumerate(counts):
+                target[index] += count
+        for source, target in (
+            (self.sums, other.sums),
+            (self.statuses, other.statuses),
+            (self.started, other.started),
+            (self.finished, other.finished),
+        ):
+            for key, value in source.items():
+                target[key] = target.get(key, 0) + value
+        for endpoint, values in self.db.items():
+            target = other.db.setdefault(endpoint, [0, 0.0, 0])
+            for index, value in enumerate(values):
+                target[index] += value
+
+
+def _borrow_slot():
+    with _registry_lock:
+        if _free_slots:
+            return _free_slots.pop()
+        slot = _SlotMetrics()
+        _registry.append(slot)
+        return slot
+
+
+def _return_slot(slot):
+    with _registry_lock:
+        _free_slots.append(slot)
+
+
+def registry_size():
+    """Accumulator slots allocated so far (peak concurrent requests)."""
+    return len(_registry)
+
+
+def register_gauge(name, help_text, callback, metric_type="gauge"):
+    """Expose ``callback()`` at scrape time.
+
+    The callback returns a number, or a ``{label_value: number}`` dict that is
+    exported with a ``name`` label. Use ``metric_type="counter"`` for totals
+    the callback keeps itself.
+    """
+    _gauges.append((name, help_text, callback, metric_type))
+
+
+def _record(metrics, endpoint, status, seconds, db_summary):
+    with metrics.lock:
+        _record_locked(metrics, endpoint, status, seconds, db_summary)
+
+
+def _record_locked(metrics, endpoint, status, seconds, db_summary):
+    counts = metrics.buckets.get(endpoint)
+    if counts is None:
+        counts = metrics.buckets[endpoint] = [0] * (len(LATENCY_BUCKETS) + 1)
+    counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+    metrics.sums[endpoint] = metrics.sums.get(endpoint, 0.0) + seconds
+    key = (endpoint, status)
+    metrics.statuses[key] = metrics.statuses.get(key, 0) + 1
+    metrics.finished[endpoint] = metrics.finished.get(endpoint, 0) + 1
+    if db_summary:
+        values = metrics.db.get(endpoint)
+        if values is None:
+            values = metrics.db[endpoint] = [0, 0.0, 0]
+        values[0] += db_summary[0]
+        values[1] += db_summary[1]
+        values[2] += db_summary[2]
+
+
+def _snapshot():
+    """Sum of all slot accumulators."""
+    with _registry_lock:
+        slots = list(_registry)
+    total = _SlotMetrics()
+    for metrics in slots:
+        with metrics.lock:
+            metrics.merge_into(total)
+    return total
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_number(value):
+    if isinstance(value, float):
+        return repr(round(value, 6))
+    return str(value)
+
+
+def render_metrics():
+    total = _snapshot()
+    name = f"{METRIC_PREFIX}_http_request_duration_seconds"
+    lines = [
+        f"# HELP {name} Request latency by Flask endpoint.",
+        f"# TYPE {name} histogram",
+    ]
+    for endpoint in sorted(total.buckets):
+        counts = total.buckets[endpoint]
+        label = _label(endpoint)
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS, counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{endpoint="{label}",le="{bound}"}} {cumulative}')
+        cumulative += counts[-1]
+        lines.append(f'{name}_bucket{{endpoint="{label}",le="+Inf"}} {cumulative}')
+        lines.append(f'{name}_sum{{endpoint="{label}"}} {_format_number(total.sums.get(endpoint, 0.0))}')
+        lines.append(f'{name}_count{{endpoint="{label}"}} {cumulative}')
+
+    name = f"{METRIC_PREFIX}_http_requests_total"
+    lines += [f"# HELP {name} Completed requests by endpoint and status.", f"# TYPE {name} counter"]
+    for (endpoint, status), count in sorted(total.statuses.items()):
+        lines.append(f'{name}{{endpoint="{_label(endpoint)}",status="{status}"}} {count}')
+
+    name = f"{METRIC_PREFIX}_http_requests_in_flight"
+    lines += [f"# HELP {name} Requests currently being handled.", f"# TYPE {name} gauge"]
+    for endpoint in sorted(total.started):
+        in_flight = total.started[endpoint] - total.finished.get(endpoint, 0)
+        lines.append(f'{name}{{endpoint="{_label(endpoint)}"}} {max(0, in_flight)}')
+
+    for index, (suffix, help_text) in enumerate(
+        (
+            ("db_statements_total", "SQL statements issued while handling requests."),
+            ("db_seconds_total", "Time spent in the database while handling requests."),
+            ("db_connections_total", "Database connections opened while handling requests."),
+        )
+    ):
+        name = f"{METRIC_PREFIX}_{suffix}"
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+        for endpoint in sorted(total.db):
+            lines.append(f'{name}{{endpoint="{_label(endpoint)}"}} {_format_number(total.db[endpoint][index])}')
+
+    for gauge_name, help_text, callback, metric_type in _gauges:
+        name = f"{METRIC_PREFIX}_{gauge_name}"
+        try:
+            value = callback()
+        except Exception as exc:
+            print(f"[metrics-warning] Gauge {gauge_name} failed: {exc}")
+            continue
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"]
+        if isinstance(value, dict):
+            for label_value, number in sorted(value.items()):
+                lines.append(f'{name}{{name="{_label(label_value)}"}} {_format_number(number)}')
+        else:
+            lines.append(f"{name} {_format_number(value)}")
+
+    name = f"{METRIC_PREFIX}_process_start_time_seconds"
+    lines += [f"# HELP {name} Unix time the process started.", f"# TYPE {name} gauge", f"{name} {_process_start:.3f}"]
+    return "\n".join(lines) + "\n"
+
+
+def _register_default_gauges():
+    from core.db_stats import fingerprint
+    from core.slow_queries import slow_query_queue_stats
+    from core.spatial import spatial_index_stats
+    from core.static_files import static_file_cache_size
+
+    register_gauge("spatial_index_records", "Records held by each in-memory spatial index.", spatial_index_stats)
+    register_gauge("static_file_cache_entries", "Static files with a cached fingerprint.", static_file_cache_size)
+    register_gauge("sql_fingerprint_cache_entries", "Cached SQL fingerprints.", lambda: fingerprint.cache_info().currsize)
+    register_gauge("slow_query_log", "Slow query log queue depth and dropped entries.", slow_query_queue_stats)
+    register_gauge("metrics_slots", "Request metric accumulator slots (peak concurrency).", registry_size)
+
+
+def init_metrics(app):
+    """Record per-endpoint latency, status, in-flight and DB counters.
+
+    Call this before other ``init_*`` hooks, so its ``before_request`` still
+    runs when a later hook short-circuits the request (e.g. a 413).
+    """
+    global _default_gauges_registered
+    if not _default_gauges_registered:
+        _default_gauges_registered = True
+        _register_default_gauges()
+
+    @app.before_request
+    def _start_request_metrics():
+        endpoint = request.endpoint or UNMATCHED_ENDPOINT
+        environ = request.environ
+        environ[_ENVIRON_START] = time.perf_counter()
+        environ[_ENVIRON_ENDPOINT] = endpoint
+        slot = environ[_ENVIRON_SLOT] = _borrow_slot()
+        with slot.lock:
+            slot.started[endpoint] = slot.started.get(endpoint, 0) + 1
+
+    @app.after_request
+    def _note_response_status(response):
+        request.environ[_ENVIRON_STATUS] = response.status_code
+        stats = current_stats()
+        if stats is not None:
+            request.environ[_ENVIRON_DB] = (stats.queries, stats.db_seconds, stats.connections)
+        return response
+
+    @app.teardown_request
+    def _finish_request_metrics(exc=None):
+        environ = request.environ
+        started = environ.pop(_ENVIRON_START, None)
+        slot = environ.pop(_ENVIRON_SLOT, None)
+        if started is None or slot is None:
+            return
+        try:
+            _record(
+                slot,
+                environ.pop(_ENVIRON_ENDPOINT, UNMATCHED_ENDPOINT),
+                environ.pop(_ENVIRON_STATUS, 500),
+                time.perf_counter() - started,
+                environ.pop(_ENVIRON_DB, None),
+            )
+        finally:
+            _return_slot(slot)
@@ -0,0 +1,380 @@
+"""Full-page cache for anonymous GETs of the public listing pages.
+
+A page can be served from the cache when:
+- the request is a GET or HEAD to an endpoint in ``PAGE_CACHE_ENDPOINTS``
+- the session has no ``user_id`` and no pending flash messages
+- the stored response was a 200 ``text/html`` with no ``Set-Cookie``
+
+Keys combine the endpoint, the normalised query string and the current
+``data_versions`` of the endpoint's dependencies. The query string is
+normalised by sorting it and dropping blank values and tracking
+parameters. When :func:`core.templating.bump_data_version` runs, the new
+version makes older entries unreachable in every process. The bump
+listener also drops them from this process's memory LRU and the shared
+store at once.
+
+Entries live in an in-memory LRU capped at ``PAGE_CACHE_MAX_MB``. With
+``PAGE_CACHE_STORE`` set to "file" or "sqlite", they are also written to a
+local store under ``PAGE_CACHE_PATH`` that all workers on the host share.
+Responses carry ``X-Page-Cache: HIT`` or ``MISS``, plus ``Age`` on hits.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode
+
+from flask import request, session
+
+from core.config import (
+    PAGE_CACHE_ENABLED,
+    PAGE_CACHE_MAX_BYTES,
+    PAGE_CACHE_PATH,
+    PAGE_CACHE_STORE,
+    PAGE_CACHE_TTL_SECONDS,
+)
+from core.metrics import register_gauge
+from core.templating import data_versions, on_data_version_bump
+
+
+# endpoint -> data version names its page depends on
+PAGE_CACHE_ENDPOINTS = {
+    "home": ("tours",),
+    "about": (),
+    "contact": (),
+    "spots": ("spots", "geo"),
+    "tour": ("tours", "geo"),
+    "hotels": ("hotels", "geo"),
+}
+IGNORED_QUERY_ARGS = {"fbclid", "gclid", "_profile"}
+IGNORED_QUERY_PREFIXES = ("utm_",)
+MAX_QUERY_STRING_LENGTH = 1024
+PAGE_CACHE_STORES = ("memory", "file", "sqlite")
+# Expired entries in the shared store are pruned every N writes.
+SHARED_PRUNE_EVERY = 200
+
+_ENVIRON_KEY = "tourgen.page_cache_key"
+
+_pages = OrderedDict()
+_page_bytes = 0
+_stats = {"hits": 0, "shared_hits": 0, "misses": 0, "stores": 0}
+_lock = threading.Lock()
+_shared = None
+
+
+class CachedPage:
+    __slots__ = ("endpoint", "created", "content_type", "body")
+
+    def __init__(self, endpoint, created, content_type, body):
+        self.endpoint = endpoint
+        self.created = created
+        self.content_type = content_type
+        self.body = body
+
+    def fresh(self, now=None):
+        return (now or time.time()) - self.created < PAGE_CACHE_TTL_SECONDS
+
+
+class FilePageStore:
+    """One file per page: a JSON header line followed by the body."""
+
+    def __init__(self, folder):
+        self.folder = folder
+        self._writes = 0
+        os.makedirs(folder, exist_ok=True)
+
+    def _path(self, endpoint, digest):
+        return os.path.join(self.folder, f"{endpoint}-{digest}.page")
+
+    def get(self, endpoint, digest):
+        try:
+            with open(self._path(endpoint, digest), "rb") as handle:
+                header = json.loads(handle.readline())
+                body = handle.read()
+        except (OSError, ValueError):
+            return None
+        return CachedPage(endpoint, header["created"], header["content_type"], body)
+
+    def set(self, digest, page):
+        header = json.dumps({"created": page.created, "content_type": page.content_type}).encode("utf-8")
+        fd, temp_path = tempfile.mkstemp(dir=self.folder, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(header + b"\n")
+                handle.write(page.body)
+            os.replace(temp_path, self._path(page.endpoint, digest))
+        except OSError:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+        self._writes += 1
+        if self._writes % SHARED_PRUNE_EVERY == 0:
+            self.prune()
+
+    def _remove_matching(self, should_remove):
+        try:
+            names = os.listdir(self.folder)
+        except OSError:
+            return
+        for name in names:
+            if not name.endswith(".page"):
+                continue
+            path = os.path.join(self.folder, name)
+            try:
+                if should_remove(name, path):
+                    os.remove(path)
+            except OSError:
+                pass
+
+    def prune(self):
+        cutoff = time.time() - PAGE_CACHE_TTL_SECONDS
+        self._remove_matching(lambda name, path: os.path.getmtime(path) < cutoff)
+
+    def drop_endpoints(self, endpoints):
+        prefixes = tuple(f"{endpoint}-" for endpoint in endpoints)
+        self._remove_matching(lambda name, path: name.startswith(prefixes))
+
+
+class SQLitePageStore:
+    """Pages in a local SQLite file (WAL mode), one connection per thread."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self._connection().execute(
+            """
+            CREATE TABLE IF NOT EXISTS pages(
+                cache_key TEXT PRIMARY KEY,
+                endpoint TEXT NOT NULL,
+                created REAL NOT NULL,
+                content_type TEXT NOT NULL,
+                body BLOB NOT NULL
+            )
+            """
+        )
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=2, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def get(self, endpoint, digest):
+        row = self._connection().execute(
+            "SELECT created, content_type, body FROM pages WHERE cache_key=?",
+            (digest,),
+        ).fetchone()
+        if not row:
+            return None
+        return CachedPage(endpoint, row[0], row[1], bytes(row[2]))
+
+    def set(self, digest, page):
+        self._connection().execute(
+            "INSERT OR REPLACE INTO pages(cache_key, endpoint, created, content_type, body) VALUES(?,?,?,?,?)",
+            (digest, page.endpoint, page.created, page.content_type, page.body),
+        )
+        self._writes += 1
+        if self._writes % SHARED_PRUNE_EVERY == 0:
+            self.prune()
+
+    def prune(self):
+        self._connection().execute("DELETE FROM pages WHERE created < ?", (time.time() - PAGE_CACHE_TTL_SECONDS,))
+
+    def drop_endpoints(self, endpoints):
+        endpoints = list(endpoints)
+        placeholders = ",".join("?" for _ in endpoints)
+        self._connection().execute(f"DELETE FROM pages WHERE endpoint IN ({placeholders})", endpoints)
+
+
+def _open_shared_store():
+    store = PAGE_CACHE_STORE if PAGE_CACHE_STORE in PAGE_CACHE_STORES else "memory"
+    if store == "file":
+        return FilePageStore(PAGE_CACHE_PATH or os.path.join("instance", "page_cache"))
+    if store == "sqlite":
+        return SQLitePageStore(PAGE_CACHE_PATH or os.path.join("instance", "page_cache.sqlite3"))
+    return None
+
+
+def normalised_query_string(args):
+    """Sorted ``key=value`` pairs without blanks or tracking parameters."""
+    pairs = []
+    for key, value in args.items(multi=True):
+        value = value.strip()
+        if not value or key in IGNORED_QUERY_ARGS or key.startswith(IGNORED_QUERY_PREFIXES):
+            continue
+        pairs.append((key, value))
+    pairs.sort()
+    return urlencode(pairs)
+
+
+def _cache_key():
+    """``(endpoint, digest)`` for the current request, or ``None`` to bypass."""
+    if request.method not in ("GET", "HEAD"):
+        return None
+    endpoint = request.endpoint
+    deps = PAGE_CACHE_ENDPOINTS.get(endpoint)
+    if deps is None:
+        return None
+    if session.get("user_id") or "_flashes" in session:
+        return None
+    if len(request.query_string) > MAX_QUERY_STRING_LENGTH:
+        return None
+    versions = data_versions(*deps) if deps else ()
+    if versions is None:
+        return None
+    raw = f"{endpoint}?{normalised_query_string(request.args)}|{','.join(map(str, versions))}"
+    return endpoint, hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _evict_pages():
+    global _page_bytes
+    while _pages and _page_bytes > PAGE_CACHE_MAX_BYTES:
+        _, page = _pages.popitem(last=False)
+        _page_bytes -= len(page.body)
+
+
+def _remember(digest, page):
+    global _page_bytes
+    with _lock:
+        previous = _pages.pop(digest, None)
+        if previous is not None:
+            _page_bytes -= len(previous.body)
+        _pages[digest] = page
+        _page_bytes += len(page.body)
+        _evict_pages()
+
+
+def lookup_page(endpoint, digest):
+    global _page_bytes
+    now = time.time()
+    with _lock:
+        page = _pages.get(digest)
+        if page is not None:
+            if page.fresh(now):
+                _pages.move_to_end(digest)
+                _stats["hits"] += 1
+                return page
+            del _pages[digest]
+            _page_bytes -= len(page.body)
+    if _shared is not None:
+        try:
+            page = _shared.get(endpoint, digest)
+        except Exception as exc:
+            print(f"[page-cache-warning] Shared store read failed: {exc}")
+            page = None
+        if page is not None and page.fresh(now):
+            _remember(digest, page)
+            with _lock:
+                _stats["shared_hits"] += 1
+            return page
+    with _lock:
+        _stats["misses"] += 1
+    return None
+
+
+def store_page(endpoint, digest, content_type, body):
+    page = CachedPage(endpoint, time.time(), content_type, body)
+    if len(body) <= PAGE_CACHE_MAX_BYTES // 4:
+        _remember(digest, page)
+    with _lock:
+        _stats["stores"] += 1
+    if _shared is not None:
+        try:
+            _shared.set(digest, page)
+        except Exception as exc:
+            print(f"[page-cache-warning] Shared store write failed: {exc}")
+
+
+def invalidate_pages(names):
+    """Drop cached pages of every endpoint depending on one of ``names``."""
+    global _page_bytes
+    endpoints = {endpoint for endpoint, deps in PAGE_CACHE_ENDPOINTS.items() if set(deps) & set(names)}
+    if not endpoints:
+        return
+    with _lock:
+        for digest in [digest for digest, page in _pages.items() if page.endpoint in endpoints]:
+            _page_bytes -= len(_pages.pop(digest).body)
+    if _shared is not None:
+        try:
+            _shared.drop_endpoints(endpoints)
+        except Exception as exc:
+            print(f"[page-cache-warning] Shared store invalidation failed: {exc}")
+
+
+def clear_page_cache():
+    global _page_bytes
+    with _lock:
+        _pages.clear()
+        _page_bytes = 0
+    if _shared is not None:
+        try:
+            _shared.drop_endpoints(PAGE_CACHE_ENDPOINTS)
+        except Exception as exc:
+            print(f"[page-cache-warning] Shared store invalidation failed: {exc}")
+
+
+def page_cache_stats():
+    with _lock:
+        return dict(_stats, entries=len(_pages), bytes=_page_bytes)
+
+
+def _cacheable(response):
+    return (
+        response.status_code == 200
+        and response.mimetype == "text/html"
+        and not response.is_streamed
+        and not response.direct_passthrough
+        and "Set-Cookie" not in response.headers
+    )
+
+
+def init_page_cache(app):
+    """Serve anonymous public pages from the cache and store misses."""
+    global _shared
+    if not PAGE_CACHE_ENABLED:
+        return
+    try:
+        _shared = _open_shared_store()
+    except Exception as exc:
+        print(f"[page-cache-warning] Shared page store unavailable, using memory only: {exc}")
+        _shared = None
+    on_data_version_bump(invalidate_pages)
+    register_gauge("page_cache", "Full-page cache entries, bytes, hits, misses and stores.", page_cache_stats)
+
+    @app.before_request
+    def _serve_cached_page():
+        key = _cache_key()
+        if key is None:
+            return None
+        page = lookup_page(*key)
+        if page is None:
+            request.environ[_ENVIRON_KEY] = key
+            return None
+        response = app.response_class(page.body, status=200, content_type=page.content_type)
+        response.headers["X-Page-Cache"] = "HIT"
+        response.headers["Age"] = str(max(0, int(time.time() - page.created)))
+        return response
+
+    @app.after_request
+    def _store_page(response):
+        key = request.environ.pop(_ENVIRON_KEY, None)
+        if key is None:
+            return response
+        response.headers["X-Page-Cache"] = "MISS"
+        if request.method == "GET" and _cacheable(response):
+            store_page(key[0], key[1], response.content_type, response.get_data())
+        return response
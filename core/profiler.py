@@ -0,0 +1,245 @@
+"""On-demand sampling profiler for single requests.
+
+A request is profiled when:
+- an admin sends ``X-Profile: 1`` or ``?_profile=1``, or
+- it is picked by ``PROFILE_SAMPLE_RATE``, which profiles 1 in N requests
+  (0 disables sampling).
+
+A single daemon thread samples the stacks of the profiled request threads
+every ``PROFILE_INTERVAL_MS``. Unprofiled requests pay one counter increment.
+
+Each profile writes two files to ``PROFILE_OUTPUT_FOLDER``:
+- ``<id>.collapsed``: flamegraph-compatible collapsed stacks, rooted at the
+  endpoint
+- ``<id>.json``: timings, split into route, DB (``core.db_stats``) and
+  template render time (``core.templating``)
+
+Admin-triggered responses carry ``X-Profile-Id`` and a Server-Timing
+breakdown.
+"""
+
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+
+from flask import request, session
+
+from core.config import (
+    PROFILE_INTERVAL_MS,
+    PROFILE_KEEP,
+    PROFILE_OUTPUT_FOLDER,
+    PROFILE_SAMPLE_RATE,
+)
+from core.db_stats import current_stats
+from core.templating import request_template_seconds
+
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_QUERY_FLAG = "_profile"
+# Stack frames above Flask's dispatch are server plumbing and are dropped.
+STACK_ROOT_FUNCTIONS = ("full_dispatch_request",)
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_ENVIRON_PROFILE = "tourgen.profile"
+
+_request_counter = itertools.count(1)
+_targets = {}
+_targets_lock = threading.Lock()
+_targets_changed = threading.Condition(_targets_lock)
+_sampler = None
+
+
+class RequestProfile:
+    __slots__ = (
+        "profile_id",
+        "endpoint",
+        "thread_id",
+        "trigger",
+        "started",
+        "samples",
+        "sample_count",
+    )
+
+    def __init__(self, endpoint, trigger):
+        self.profile_id = f"{time.strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        self.endpoint = endpoint
+        self.thread_id = threading.get_ident()
+        self.trigger = trigger
+        self.started = time.perf_counter()
+        self.samples = {}
+        self.sample_count = 0
+
+
+def _frame_label(code):
+    filename = code.co_filename
+    if filename.startswith(_PROJECT_ROOT):
+        filename = os.path.relpath(filename, _PROJECT_ROOT)
+    else:
+        filename = os.path.basename(filename)
+    # ";" separates frames and " " separates the count in collapsed stacks.
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ":").replace(" ", "_")
+
+
+def _collapse(frame):
+    labels = []
+    while frame is not None:
+        code = frame.f_code
+        if code.co_name in STACK_ROOT_FUNCTIONS:
+            break
+        labels.append(_frame_label(code))
+        frame = frame.f_back
+    labels.reverse()
+    return ";".join(labels)
+
+
+def _run_sampler():
+    interval = max(0.0005, PROFILE_INTERVAL_MS / 1000.0)
+    while True:
+        with _targets_changed:
+            while not _targets:
+                _targets_changed.wait()
+            targets = list(_targets.values())
+        frames = sys._current_frames()
+        for profile in targets:
+            frame = frames.get(profile.thread_id)
+            if frame is None:
+                continue
+            stack = _collapse(frame)
+            profile.samples[stack] = profile.samples.get(stack, 0) + 1
+            profile.sample_count += 1
+        del frames
+        time.sleep(interval)
+
+
+def _ensure_sampler():
+    global _sampler
+    if _sampler is not None and _sampler.is_alive():
+        return
+    with _targets_lock:
+        if _sampler is None or not _sampler.is_alive():
+            _sampler = threading.Thread(target=_run_sampler, name="request-profiler", daemon=True)
+            _sampler.start()
+
+
+def _requested_trigger():
+    flag = request.headers.get(PROFILE_HEADER) or request.args.get(PROFILE_QUERY_FLAG)
+    if flag and flag.strip().lower() not in ("0", "false", "no", "off"):
+        if session.get("role") == "admin":
+            return "admin"
+    if PROFILE_SAMPLE_RATE > 0 and next(_request_counter) % PROFILE_SAMPLE_RATE == 0:
+        return "sampled"
+    return None
+
+
+def start_profile(endpoint, trigger):
+    profile = RequestProfile(endpoint, trigger)
+    _ensure_sampler()
+    with _targets_changed:
+        _targets[profile.thread_id] = profile
+        _targets_changed.notify()
+    return profile
+
+
+def stop_profile(profile):
+    with _targets_lock:
+        if _targets.get(profile.thread_id) is profile:
+            del _targets[profile.thread_id]
+    return time.perf_counter() - profile.started
+
+
+def _prune_profiles(folder):
+    try:
+        names = sorted(name for name in os.listdir(folder) if name.endswith(".collapsed"))
+    except OSError:
+        return
+    for name in names[: max(0, len(names) - PROFILE_KEEP)]:
+        stem = name[: -len(".collapsed")]
+        for suffix in (".collapsed", ".json"):
+            try:
+                os.remove(os.path.join(folder, stem + suffix))
+            except OSError:
+                pass
+
+
+def _frame_label_text(value):
+    return str(value or "unmatched").replace(";", ":").replace(" ", "_")
+
+
+def write_profile(profile, timings):
+    os.makedirs(PROFILE_OUTPUT_FOLDER, exist_ok=True)
+    base = os.path.join(PROFILE_OUTPUT_FOLDER, profile.profile_id)
+    root = _frame_label_text(profile.endpoint)
+    with open(base + ".collapsed", "w", encoding="utf-8") as handle:
+        for stack, count in sorted(profile.samples.items()):
+            handle.write(f"{root};{stack} {count}\n" if stack else f"{root} {count}\n")
+    with open(base + ".json", "w", encoding="utf-8") as handle:
+        json.dump(timings, handle, indent=2, default=str)
+    _prune_profiles(PROFILE_OUTPUT_FOLDER)
+
+
+def _timings(profile, total_seconds, response):
+    stats = current_stats()
+    db_seconds = stats.db_seconds if stats is not None else 0.0
+    template_seconds = request_template_seconds()
+    route_seconds = max(0.0, total_seconds - db_seconds - template_seconds)
+    return {
+        "profile_id": profile.profile_id,
+        "trigger": profile.trigger,
+        "method": request.method,
+        "path": request.path,
+        "endpoint": profile.endpoint,
+        "status": response.status_code if response is not None else None,
+        "total_ms": round(total_seconds * 1000, 2),
+        "route_ms": round(route_seconds * 1000, 2),
+        "db_ms": round(db_seconds * 1000, 2),
+        "template_ms": round(template_seconds * 1000, 2),
+        "db_queries": stats.queries if stats is not None else None,
+        "samples": profile.sample_count,
+        "interval_ms": PROFILE_INTERVAL_MS,
+    }
+
+
+def init_profiler(app):
+    """Profile admin-flagged requests and 1 in ``PROFILE_SAMPLE_RATE``."""
+    @app.before_request
+    def _start_request_profile():
+        trigger = _requested_trigger()
+        if trigger is None:
+            return
+        profile = start_profile(request.endpoint, trigger)
+        request.environ[_ENVIRON_PROFILE] = profile
+
+    @app.after_request
+    def _finish_request_profile(response):
+        profile = request.environ.pop(_ENVIRON_PROFILE, None)
+        if profile is None:
+            return response
+        total_seconds = stop_profile(profile)
+        timings = _timings(profile, total_seconds, response)
+        try:
+            write_profile(profile, timings)
+        except OSError as exc:
+            print(f"[profile-warning] Could not write profile {profile.profile_id}: {exc}")
+        if profile.trigger == "admin":
+            response.headers["X-Profile-Id"] = profile.profile_id
+            response.headers.add(
+                "Server-Timing",
+                f"route;dur={timings['route_ms']}, db;dur={timings['db_ms']}, template;dur={timings['template_ms']}",
+            )
+        else:
+            print(
+                f"[profile] {profile.profile_id} {timings['endpoint']} total={timings['total_ms']}ms "
+                f"route={timings['route_ms']}ms db={timings['db_ms']}ms template={timings['template_ms']}ms"
+            )
+        return response
+
+    @app.teardown_request
+    def _abort_request_profile(exc=None):
+        # after_request is skipped when the response could not be built.
+        profile = request.environ.pop(_ENVIRON_PROFILE, None)
+        if profile is not None:
+            stop_profile(profile)
@@ -0,0 +1,169 @@
+"""Per-tour booking/profit rollups for the organizer dashboard."""
+
+from core.db import get_db, query_db
+
+
+ROLLUP_COUNTER_FIELDS = (
+    "internal_booking_count",
+    "internal_pax",
+    "active_pax",
+    "paid_booking_count",
+    "paid_pax",
+    "external_booking_count",
+    "external_pax",
+)
+
+
+def _rollup_upsert_sql(tour_filter_sql):
+    # One INSERT ... SELECT per refresh: every source table is aggregated only
+    # for the tours in scope, so a booking write touches a single tour's rows.
+    return f"""
+        INSERT INTO organizer_tour_rollups(
+            tour_id, organizer_id,
+            internal_booking_count, internal_pax, active_pax,
+            paid_booking_count, paid_pax,
+            external_booking_count, external_pax,
+            organizer_profit, admin_commission
+        )
+        SELECT
+            t.id,
+            t.organizer_id,
+            COALESCE(bk.internal_booking_count, 0),
+            COALESCE(bk.internal_pax, 0),
+            COALESCE(bk.active_pax, 0),
+            COALESCE(bk.paid_booking_count, 0),
+            COALESCE(bk.paid_pax, 0),
+            COALESCE(ext.external_booking_count, 0),
+            COALESCE(ext.external_pax, 0),
+            COALESCE(pay.organizer_profit, 0) + COALESCE(ext.organizer_profit, 0),
+            COALESCE(pay.admin_commission, 0) + COALESCE(ext.admin_commission, 0)
+        FROM tours t
+        LEFT JOIN (
+            SELECT
+                b.tour_id,
+                COUNT(*) AS internal_booking_count,
+                SUM(GREATEST(b.pax_count, 0)) AS internal_pax,
+                SUM(CASE WHEN b.status IN ('pending', 'paid') THEN GREATEST(b.pax_count, 0) ELSE 0 END) AS active_pax,
+                SUM(CASE WHEN b.status='paid' THEN 1 ELSE 0 END) AS paid_booking_count,
+                SUM(CASE WHEN b.status='paid' THEN GREATEST(b.pax_count, 0) ELSE 0 END) AS paid_pax
+            FROM bookings b
+            WHERE {tour_filter_sql.format(col="b.tour_id")}
+            GROUP BY b.tour_id
+        ) bk ON bk.tour_id=t.id
+        LEFT JOIN (
+            SELECT
+                b.tour_id,
+                SUM(p.organizer_earning) AS organizer_profit,
+                SUM(p.admin_commission) AS admin_commission
+            FROM payments p
+            JOIN bookings b ON b.id=p.booking_id
+            WHERE p.paid=1 AND {tour_filter_sql.format(col="b.tour_id")}
+            GROUP BY b.tour_id
+        ) pay ON pay.tour_id=t.id
+        LEFT JOIN (
+            SELECT
+                eb.tour_id,
+                COUNT(*) AS external_booking_count,
+                SUM(GREATEST(eb.pax_count, 0)) AS external_pax,
+                SUM(eb.organizer_earning) AS organizer_profit,
+                SUM(eb.admin_commission) AS admin_commission
+            FROM organizer_external_bookings eb
+            WHERE {tour_filter_sql.format(col="eb.tour_id")}
+            GROUP BY eb.tour_id
+        ) ext ON ext.tour_id=t.id
+        WHERE {tour_filter_sql.format(col="t.id")}
+        ON DUPLICATE KEY UPDATE
+            organizer_id=VALUES(organizer_id),
+            internal_booking_count=VALUES(internal_booking_count),
+            internal_pax=VALUES(internal_pax),
+            active_pax=VALUES(active_pax),
+            paid_booking_count=VALUES(paid_booking_count),
+            paid_pax=VALUES(paid_pax),
+            external_booking_count=VALUES(external_booking_count),
+            external_pax=VALUES(external_pax),
+            organizer_profit=VALUES(organizer_profit),
+            admin_commission=VALUES(admin_commission)
+    """
+
+
+def refresh_tour_rollups(cur, tour_ids):
+    """Recompute rollup rows for ``tour_ids`` on an open cursor (caller commits)."""
+    ids = sorted({int(tid) for tid in tour_ids or [] if tid and int(tid) > 0})
+    if not ids:
+        return 0
+    placeholders = ", ".join(["%s"] * len(ids))
+    sql = _rollup_upsert_sql("{col} IN (" + placeholders + ")")
+    # The same id list is bound once per sub-select plus the outer WHERE.
+    cur.execute(sql, tuple(ids) * 4)
+    return len(ids)
+
+
+def refresh_tour_rollup(tour_id):
+    """Refresh one tour's rollup in its own transaction.
+
+    Called after booking, payment and external-booking writes. A failure here
+    must not undo the write that triggered it; ``rebuild_tour_rollups`` repairs
+    any row that was missed.
+    """
+    db = None
+    cur = None
+    try:
+        db = get_db()
+        cur = db.cursor()
+        refresh_tour_rollups(cur, [tour_id])
+        db.commit()
+        return True
+    except Exception as exc:
+        if db is not None:
+            db.rollback()
+        print(f"[rollup-warning] Could not refresh rollup for tour #{tour_id}: {exc}")
+        return False
+    finally:
+        if cur is not None:
+            cur.close()
+        if db is not None:
+            db.close()
+
+
+def rebuild_tour_rollups(cur, organizer_id=None):
+    """Rebuild rollup rows for every tour (or one organizer's tours)."""
+    if organizer_id:
+        cur.execute("SELECT id FROM tours WHERE organizer_id=%s", (organizer_id,))
+        tour_ids = [row["id"] if isinstance(row, dict) else row[0] for row in cur.fetchall()]
+        cur.execute(
+            """
+            DELETE r FROM organizer_tour_rollups r
+            LEFT JOIN tours t ON t.id=r.tour_id
+            WHERE r.organizer_id=%s AND (t.id IS NULL OR t.organizer_id<>%s)
+            """,
+            (organizer_id, organizer_id),
+        )
+        return refresh_tour_rollups(cur, tour_ids)
+
+    cur.execute(
+        """
+        DELETE r FROM organizer_tour_rollups r
+        LEFT JOIN tours t ON t.id=r.tour_id
+        WHERE t.id IS NULL
+        """
+    )
+    cur.execute(_rollup_upsert_sql("1=1"))
+    return cur.rowcount
+
+
+def load_organizer_rollups(organizer_id):
+    """Return ``{tour_id: rollup_row}`` for one organizer."""
+    rows = query_db(
+        """
+        SELECT
+            tour_id,
+            internal_booking_count, internal_pax, active_pax,
+            paid_booking_count, paid_pax,
+            external_booking_count, external_pax,
+            organizer_profit, admin_commission
+        FROM organizer_tour_rollups
+        WHERE organizer_id=%s
+        """,
+        (organizer_id,),
+    )
+    return {int(row["tour_id"]): row for row in rows}
@@ -0,0 +1,173 @@
+"""Persisted itinerary route metrics (validated points, leg and total km) per tour.
+
+Metrics are written when a tour is created and recomputed by the
+``tour_route_metrics`` job, which admin spot approvals enqueue for the tours
+using the approved spots. Each row stores a signature of the itinerary ids
+and coordinates it was computed from. ``booking()`` reads the stored row
+through ``route_metrics_for`` and only computes the legs inline when the
+signature no longer matches; request handlers never write here. After direct
+coordinate edits, run scripts/rebuild_route_metrics.py.
+"""
+
+import hashlib
+import json
+
+from core.db import get_db, query_db
+from core.geo import route_legs, validate_points
+
+
+ROUTE_METRICS_BATCH_SIZE = 200
+
+_ITINERARY_POINTS_SQL = """
+    SELECT ti.id AS itinerary_id, ti.tour_id, ms.latitude, ms.longitude
+    FROM tour_itinerary ti
+    JOIN master_spots ms ON ms.id=ti.spot_id
+    WHERE ti.tour_id IN ({placeholders})
+    ORDER BY ti.tour_id ASC, ti.day_number ASC, ti.order_sequence ASC, ti.id ASC
+"""
+
+_UPSERT_SQL = """
+    INSERT INTO tour_route_metrics(
+        tour_id, total_distance_km, point_count, valid_point_count, legs_json, signature
+    )
+    VALUES(%s,%s,%s,%s,%s,%s)
+    ON DUPLICATE KEY UPDATE
+        total_distance_km=VALUES(total_distance_km),
+        point_count=VALUES(point_count),
+        valid_point_count=VALUES(valid_point_count),
+        legs_json=VALUES(legs_json),
+        signature=VALUES(signature),
+        computed_at=NOW()
+"""
+
+
+def itinerary_signature(rows):
+    """Hash of the ordered itinerary ids and raw coordinates."""
+    hasher = hashlib.sha1()
+    for row in rows:
+        hasher.update(f"{row.get('itinerary_id')}:{row.get('latitude')}:{row.get('longitude')};".encode())
+    return hasher.hexdigest()
+
+
+def compute_route_metrics(rows):
+    """Compute metrics for one tour's itinerary rows (in route order)."""
+    points = [(row.get("latitude"), row.get("longitude")) for row in rows]
+    valid = validate_points(points)
+    legs, total_km = route_legs(points, valid)
+    return {
+        "signature": itinerary_signature(rows),
+        "total_distance_km": round(total_km, 1),
+        "point_count": len(rows),
+        "valid_point_count": sum(1 for ok in valid if ok),
+        "legs": {
+            str(row.get("itinerary_id")): {
+                "in_india": bool(ok),
+                "leg_km": round(leg_km, 1) if leg_km is not None else None,
+            }
+            for row, ok, leg_km in zip(rows, valid, legs)
+        },
+    }
+
+
+def route_metrics_for(tour_id, rows):
+    """Stored metrics for ``rows`` when still current, else computed inline.
+
+    A missing or stale row is not rewritten here; the job or the rebuild
+    script catches up.
+    """
+    signature = itinerary_signature(rows)
+    try:
+        stored = query_db(
+            """
+            SELECT total_distance_km, point_count, valid_point_count, legs_json, signature
+            FROM tour_route_metrics
+            WHERE tour_id=%s
+            """,
+            (tour_id,),
+            one=True,
+        )
+    except Exception:
+        stored = None
+    if stored and stored.get("signature") == signature:
+        try:
+            legs = json.loads(stored.get("legs_json") or "{}")
+        except ValueError:
+            legs = None
+        if isinstance(legs, dict):
+            return {
+                "signature": signature,
+                "total_distance_km": float(stored.get("total_distance_km") or 0),
+                "point_count": int(stored.get("point_count") or 0),
+                "valid_point_count": int(stored.get("valid_point_count") or 0),
+                "legs": legs,
+            }
+    return compute_route_metrics(rows)
+
+
+def _upsert_args(tour_id, metrics):
+    return (
+        tour_id,
+        metrics["total_distance_km"],
+        metrics["point_count"],
+        metrics["valid_point_count"],
+        json.dumps(metrics["legs"], separators=(",", ":")),
+        metrics["signature"],
+    )
+
+
+def refresh_tour_route_metrics(cur, tour_ids):
+    """Recompute metrics for ``tour_ids`` on an open cursor (caller commits)."""
+    ids = sorted({int(tid) for tid in tour_ids or [] if tid and int(tid) > 0})
+    touched = 0
+    for start in range(0, len(ids), ROUTE_METRICS_BATCH_SIZE):
+        chunk = ids[start : start + ROUTE_METRICS_BATCH_SIZE]
+        cur.execute(_ITINERARY_POINTS_SQL.format(placeholders=", ".join(["%s"] * len(chunk))), tuple(chunk))
+        columns = [col[0] for col in cur.description]
+        rows_by_tour = {tour_id: [] for tour_id in chunk}
+        for row in cur.fetchall():
+            row = row if isinstance(row, dict) else dict(zip(columns, row))
+            rows_by_tour[int(row["tour_id"])].append(row)
+        cur.executemany(
+            _UPSERT_SQL,
+            [_upsert_args(tour_id, compute_route_metrics(rows)) for tour_id, rows in rows_by_tour.items()],
+        )
+        touched += len(chunk)
+    return touched
+
+
+def refresh_tour_route_metric(tour_id):
+    """Refresh one tour's metrics in its own transaction.
+
+    Failures are logged rather than raised; the job or the rebuild script
+    can catch up later.
+    """
+    db = None
+    cur = None
+    try:
+        db = get_db()
+        cur = db.cursor()
+        refresh_tour_route_metrics(cur, [tour_id])
+        db.commit()
+        return True
+    except Exception as exc:
+        if db is not None:
+            db.rollback()
+        print(f"[route-warning] Could not refresh route metrics for tour #{tour_id}: {exc}")
+        return False
+    finally:
+        if cur is not None:
+            cur.close()
+        if db is not None:
+            db.close()
+
+
+def tour_ids_for_spots(spot_ids):
+    ids = sorted({int(sid) for sid in spot_ids or [] if sid and int(sid) > 0})
+    if not ids:
+        return []
+    rows = query_db(
+        f"SELECT DISTINCT tour_id FROM tour_itinerary WHERE spot_id IN ({', '.join(['%s'] * len(ids))})",
+        tuple(ids),
+    )
+    return [int(row["tour_id"]) for row in rows]
+
@@ -0,0 +1,266 @@
+"""Slow query log with asynchronous EXPLAIN capture.
+
+``core.db`` calls :func:`log_slow_query` for statements over
+``SLOW_QUERY_MS``. The request thread only captures the cheap parts: the
+fingerprint, parameter shapes (types and lengths, never values), the
+endpoint and the calling code location. A daemon worker runs
+``EXPLAIN FORMAT=JSON`` on its own un-instrumented connection and writes
+the entry to a rotating JSON-lines file and/or the ``slow_query_log`` table.
+If the queue is full, entries are dropped instead of blocking requests.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+
+import mysql.connector
+
+from core.config import (
+    MYSQL_CONFIG,
+    SLOW_QUERY_EXPLAIN,
+    SLOW_QUERY_EXPLAIN_COOLDOWN_SECONDS,
+    SLOW_QUERY_LOG_BACKUPS,
+    SLOW_QUERY_LOG_FILE,
+    SLOW_QUERY_LOG_MAX_BYTES,
+    SLOW_QUERY_LOG_TARGET,
+)
+from core.db_stats import fingerprint
+
+
+SLOW_QUERY_TARGETS = ("file", "table", "both")
+SLOW_QUERY_QUEUE_SIZE = 200
+STATEMENT_MAX_LENGTH = 4000
+EXPLAINABLE_PREFIXES = ("SELECT", "WITH", "UPDATE", "DELETE", "REPLACE", "INSERT")
+
+# Frames from these files are skipped when looking for the caller.
+_INTERNAL_FILES = tuple(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), name)
+    for name in ("db.py", "db_stats.py", "slow_queries.py")
+)
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_INSERT_SQL = """
+    INSERT INTO slow_query_log(
+        fingerprint_sha, fingerprint, statement_ms, endpoint, caller,
+        param_shapes, explain_json, full_scan_tables
+    )
+    VALUES(%s,%s,%s,%s,%s,%s,%s,%s)
+"""
+
+_queue = queue.Queue(maxsize=SLOW_QUERY_QUEUE_SIZE)
+_worker = None
+_worker_lock = threading.Lock()
+_last_explained = {}
+_dropped = 0
+
+
+def _param_shape(value):
+    if value is None:
+        return "null"
+    if isinstance(value, (str, bytes)):
+        return f"{type(value).__name__}({len(value)})"
+    if isinstance(value, (list, tuple, set)):
+        return f"{type(value).__name__}[{len(value)}]"
+    return type(value).__name__
+
+
+def param_shapes(params, many=False):
+    """Describe bound parameters without their values."""
+    if many:
+        rows = list(params or [])
+        return {"rows": len(rows), "first": param_shapes(rows[0]) if rows else None}
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {key: _param_shape(value) for key, value in params.items()}
+    if isinstance(params, (list, tuple)):
+        return [_param_shape(value) for value in params]
+    return _param_shape(params)
+
+
+def _caller_location():
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if filename not in _INTERNAL_FILES and "mysql" not in filename.split(os.sep):
+            relative = os.path.relpath(filename, _PROJECT_ROOT)
+            return f"{relative}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return None
+
+
+def _current_endpoint():
+    try:
+        from flask import has_request_context, request
+    except ImportError:  # pragma: no cover - scripts without Flask
+        return None
+    if not has_request_context():
+        return None
+    return f"{request.method} {request.endpoint or request.path}"
+
+
+def log_slow_query(statement, params, seconds, many=False):
+    """Queue a slow statement for logging; never raises into the caller."""
+    global _dropped
+    try:
+        if isinstance(statement, bytes):
+            statement = statement.decode("utf-8", "replace")
+        statement = str(statement)
+        entry = {
+            "logged_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "statement_ms": round(seconds * 1000, 2),
+            "fingerprint": fingerprint(statement),
+            "statement": statement[:STATEMENT_MAX_LENGTH],
+            "param_shapes": param_shapes(params, many=many),
+            "endpoint": _current_endpoint(),
+            "caller": _caller_location(),
+        }
+        # The full statement and parameters travel to the worker only for
+        # EXPLAIN; parameter values are never written out.
+        _ensure_worker()
+        _queue.put_nowait((entry, statement, None if many else params))
+    except queue.Full:
+        _dropped += 1
+        if _dropped % 100 == 1:
+            print(f"[slow-query-warning] Queue full; dropped {_dropped} slow query entries so far.")
+    except Exception as exc:
+        print(f"[slow-query-warning] Could not record slow query: {exc}")
+
+
+def slow_query_queue_stats():
+    return {"queued": _queue.qsize(), "dropped": _dropped}
+
+
+def _ensure_worker():
+    global _worker
+    if _worker is not None and _worker.is_alive():
+        return
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_run_worker, name="slow-query-log", daemon=True)
+            _worker.start()
+
+
+def _file_logger():
+    logger = logging.getLogger("tourgen.slow_queries")
+    if not logger.handlers:
+        folder = os.path.dirname(SLOW_QUERY_LOG_FILE)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        handler = RotatingFileHandler(
+            SLOW_QUERY_LOG_FILE,
+            maxBytes=SLOW_QUERY_LOG_MAX_BYTES,
+            backupCount=SLOW_QUERY_LOG_BACKUPS,
+            encoding="utf-8",
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    return logger
+
+
+def _should_explain(entry):
+    if not SLOW_QUERY_EXPLAIN:
+        return False
+    head = entry["statement"].lstrip().split(None, 1)[0].upper() if entry["statement"].strip() else ""
+    if head not in EXPLAINABLE_PREFIXES:
+        return False
+    if head == "INSERT" and " SELECT " not in f" {entry['statement'].upper()} ":
+        # INSERT ... VALUES plans are trivial.
+        return False
+    now = time.monotonic()
+    last = _last_explained.get(entry["fingerprint"])
+    if last is not None and now - last < SLOW_QUERY_EXPLAIN_COOLDOWN_SECONDS:
+        return False
+    _last_explained[entry["fingerprint"]] = now
+    return True
+
+
+def full_scan_tables(plan):
+    """Table names with ``access_type: ALL`` anywhere in an EXPLAIN JSON plan."""
+    found = []
+    stack = [plan]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if node.get("access_type") == "ALL" and node.get("table_name"):
+                found.append(str(node["table_name"]))
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+    return sorted(set(found))
+
+
+def _explain(connection, statement, params):
+    cur = connection.cursor()
+    try:
+        cur.execute(f"EXPLAIN FORMAT=JSON {statement}", params or ())
+        row = cur.fetchone()
+        return json.loads(row[0]) if row and row[0] else None
+    finally:
+        cur.close()
+
+
+def _store_row(connection, entry):
+    cur = connection.cursor()
+    try:
+        cur.execute(
+            _INSERT_SQL,
+            (
+                hashlib.sha1(entry["fingerprint"].encode("utf-8")).hexdigest(),
+                entry["fingerprint"],
+                entry["statement_ms"],
+                (entry["endpoint"] or "")[:120] or None,
+                (entry["caller"] or "")[:255] or None,
+                json.dumps(entry["param_shapes"]),
+                json.dumps(entry["explain"]) if entry.get("explain") is not None else None,
+                ",".join(entry.get("full_scan_tables") or [])[:255] or None,
+            ),
+        )
+        connection.commit()
+    finally:
+        cur.close()
+
+
+def _side_connection(connection):
+    if connection is not None:
+        try:
+            connection.ping(reconnect=True, attempts=1, delay=0)
+            return connection
+        except mysql.connector.Error:
+            pass
+    return mysql.connector.connect(**MYSQL_CONFIG)
+
+
+def _run_worker():
+    target = SLOW_QUERY_LOG_TARGET if SLOW_QUERY_LOG_TARGET in SLOW_QUERY_TARGETS else "file"
+    connection = None
+    while True:
+        entry, statement, params = _queue.get()
+        try:
+            explain = _should_explain(entry)
+            if explain or target in ("table", "both"):
+                connection = _side_connection(connection)
+            if explain:
+                try:
+                    plan = _explain(connection, statement, params)
+                    entry["explain"] = plan
+                    entry["full_scan_tables"] = full_scan_tables(plan)
+                except mysql.connector.Error as exc:
+                    entry["explain_error"] = str(exc)
+            if target in ("file", "both"):
+                _file_logger().info(json.dumps(entry, separators=(",", ":"), default=str))
+            if target in ("table", "both"):
+                _store_row(connection, entry)
+        except Exception as exc:
+            print(f"[slow-query-warning] Could not write slow query entry: {exc}")
+            connection = None
+        finally:
+            _queue.task_done()
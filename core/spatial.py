@@ -0,0 +1,243 @@
+"""Proximity search for spots and hotels.
+
+Each kind ("spots", "hotels") gets an in-memory k-d tree over unit-sphere
+(x, y, z) coordinates, so straight-line chord distance orders points the same
+way as great-circle distance. The tree prunes by chord radius, and every hit
+is refined with exact haversine. Trees expire after
+``SPATIAL_INDEX_TTL_SECONDS`` or on ``invalidate_spatial_index``.
+
+A request never builds a tree itself. While the tree of a kind is missing
+or expired, ``nearby`` answers from ``nearby_from_db`` and rebuilds the
+tree on a background thread. That path prefilters on the indexed
+``geo_cell`` column (0.1 degree grid, a generated column) plus a lat/lng
+bounding box, then refines the same way. A cold start or a write
+therefore costs a few indexed lookups, not a full table scan, on the
+request that happens to arrive first.
+"""
+
+import math
+import threading
+import time
+
+from core.config import SPATIAL_INDEX_TTL_SECONDS
+from core.db import query_db
+from core.geo import EARTH_RADIUS_KM, haversine_km
+
+
+GEO_CELL_DEG = 0.1
+GEO_CELL_COLS = 3600
+GEO_CELL_MAX_IN = 400
+KM_PER_DEG_LAT = 111.32
+
+NEARBY_SOURCES = {
+    "spots": {
+        "select": """
+            SELECT ms.id, ms.spot_name AS name, ms.image_url, ms.photo_source,
+                   ms.latitude, ms.longitude, ms.city_id, c.city_name
+            FROM master_spots ms
+            LEFT JOIN cities c ON c.id=ms.city_id
+        """,
+        "alias": "ms",
+        "where": "ms.latitude IS NOT NULL AND ms.longitude IS NOT NULL",
+    },
+    "hotels": {
+        "select": """
+            SELECT s.id, hp.hotel_name AS name, hp.star_rating,
+                   hp.latitude, hp.longitude, s.city_id, c.city_name
+            FROM services s
+            JOIN hotel_profiles hp ON hp.service_id=s.id
+            LEFT JOIN cities c ON c.id=s.city_id
+        """,
+        "alias": "hp",
+        "where": (
+            "s.service_type='Hotel' AND COALESCE(hp.listing_status, 'active')='active' "
+            "AND hp.latitude IS NOT NULL AND hp.longitude IS NOT NULL"
+        ),
+    },
+}
+
+_indexes = {}
+_index_lock = threading.Lock()
+_rebuilding = set()
+# Bumped by invalidate_spatial_index so a rebuild that started before a
+# write does not store pre-write data.
+_generations = {}
+
+
+def geo_cell(lat, lng):
+    """Grid cell id; matches the ``geo_cell`` generated column."""
+    return _cell_index(lat, 90) * GEO_CELL_COLS + _cell_index(lng, 180)
+
+
+def _cell_index(value, offset):
+    return math.floor((value + offset) * (1 / GEO_CELL_DEG))
+
+
+def bounding_box(lat, lng, radius_km):
+    """``(min_lat, max_lat, min_lng, max_lng)`` enclosing the radius."""
+    dlat = radius_km / KM_PER_DEG_LAT
+    cos_lat = math.cos(math.radians(lat))
+    dlng = 180.0 if cos_lat < 1e-6 else min(180.0, radius_km / (KM_PER_DEG_LAT * cos_lat))
+    return max(-90.0, lat - dlat), min(90.0, lat + dlat), max(-180.0, lng - dlng), min(180.0, lng + dlng)
+
+
+def _unit_vector(lat, lng):
+    phi = math.radians(lat)
+    lam = math.radians(lng)
+    return (math.cos(phi) * math.cos(lam), math.cos(phi) * math.sin(lam), math.sin(phi))
+
+
+def _build_kdtree(items, depth=0):
+    """Nodes are ``(xyz, record_index, axis, left, right)``."""
+    if not items:
+        return None
+    axis = depth % 3
+    items.sort(key=lambda item: item[0][axis])
+    mid = len(items) // 2
+    xyz, record_index = items[mid]
+    return (
+        xyz,
+        record_index,
+        axis,
+        _build_kdtree(items[:mid], depth + 1),
+        _build_kdtree(items[mid + 1 :], depth + 1),
+    )
+
+
+def _kdtree_within(tree, target, max_sq):
+    hits = []
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        if node is None:
+            continue
+        xyz, record_index, axis, left, right = node
+        dist_sq = (xyz[0] - target[0]) ** 2 + (xyz[1] - target[1]) ** 2 + (xyz[2] - target[2]) ** 2
+        if dist_sq <= max_sq:
+            hits.append(record_index)
+        diff = target[axis] - xyz[axis]
+        near, far = (left, right) if diff < 0 else (right, left)
+        stack.append(near)
+        if diff * diff <= max_sq:
+            stack.append(far)
+    return hits
+
+
+def _load_records(kind):
+    source = NEARBY_SOURCES[kind]
+    records = []
+    for row in query_db(f"{source['select']} WHERE {source['where']}"):
+        try:
+            row["latitude"] = float(row["latitude"])
+            row["longitude"] = float(row["longitude"])
+        except (TypeError, ValueError):
+            continue
+        if -90 <= row["latitude"] <= 90 and -180 <= row["longitude"] <= 180:
+            records.append(row)
+    return records
+
+
+def _fresh_index(kind):
+    """``(tree, records)`` when a current index is loaded, else ``None``."""
+    cached = _indexes.get(kind)
+    if cached and time.monotonic() - cached[0] < SPATIAL_INDEX_TTL_SECONDS:
+        return cached[1], cached[2]
+    return None
+
+
+def _rebuild_index(kind):
+    generation = _generations.get(kind, 0)
+    try:
+        records = _load_records(kind)
+        tree = _build_kdtree(
+            [(_unit_vector(row["latitude"], row["longitude"]), index) for index, row in enumerate(records)]
+        )
+        with _index_lock:
+            if _generations.get(kind, 0) == generation:
+                _indexes[kind] = (time.monotonic(), tree, records)
+    except Exception as exc:
+        print(f"[spatial-warning] Could not build the {kind} index: {exc}")
+    finally:
+        with _index_lock:
+            _rebuilding.discard(kind)
+
+
+def _schedule_rebuild(kind):
+    with _index_lock:
+        if kind in _rebuilding:
+            return
+        _rebuilding.add(kind)
+    threading.Thread(target=_rebuild_index, args=(kind,), name=f"spatial-index-{kind}", daemon=True).start()
+
+
+def spatial_index_stats():
+    """Record count per loaded index kind."""
+    return {kind: len(cached[2]) for kind, cached in list(_indexes.items())}
+
+
+def invalidate_spatial_index(kind=None):
+    with _index_lock:
+        for name in [kind] if kind else list(NEARBY_SOURCES):
+            _indexes.pop(name, None)
+            _generations[name] = _generations.get(name, 0) + 1
+
+
+def _refine(candidates, lat, lng, radius_km, limit, exclude_id=None):
+    results = []
+    for row in candidates:
+        if exclude_id is not None and row["id"] == exclude_id:
+            continue
+        distance = haversine_km(lat, lng, row["latitude"], row["longitude"])
+        if distance <= radius_km:
+            results.append(dict(row, distance_km=round(distance, 2)))
+    results.sort(key=lambda row: row["distance_km"])
+    return results[:limit] if limit else results
+
+
+def nearby(kind, lat, lng, radius_km, limit=None, exclude_id=None):
+    """Rows of ``kind`` within ``radius_km`` of the point, nearest first."""
+    loaded = _fresh_index(kind)
+    if loaded is None:
+        _schedule_rebuild(kind)
+        return nearby_from_db(kind, lat, lng, radius_km, limit=limit, exclude_id=exclude_id)
+    tree, records = loaded
+    if tree is None:
+        return []
+    # Chord length for the great-circle radius, with a little slack so the
+    # haversine refinement is the only cut-off.
+    chord = 2 * math.sin(min(math.pi, radius_km / EARTH_RADIUS_KM) / 2) * 1.000001
+    hits = _kdtree_within(tree, _unit_vector(lat, lng), chord * chord)
+    return _refine((records[index] for index in hits), lat, lng, radius_km, limit, exclude_id)
+
+
+def nearby_from_db(kind, lat, lng, radius_km, limit=None, exclude_id=None):
+    """Same as :func:`nearby`, answered with indexed SQL prefilters (cold-index path)."""
+    source = NEARBY_SOURCES[kind]
+    alias = source["alias"]
+    min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, radius_km)
+    clauses = [
+        source["where"],
+        f"{alias}.latitude BETWEEN %s AND %s",
+        f"{alias}.longitude BETWEEN %s AND %s",
+    ]
+    args = [min_lat, max_lat, min_lng, max_lng]
+
+    # One cell of margin absorbs float vs DECIMAL rounding at cell edges.
+    first_row = _cell_index(min_lat, 90) - 1
+    last_row = _cell_index(max_lat, 90) + 1
+    first_col = _cell_index(min_lng, 180) - 1
+    last_col = _cell_index(max_lng, 180) + 1
+    if (last_row - first_row + 1) * (last_col - first_col + 1) <= GEO_CELL_MAX_IN:
+        cells = [
+            row * GEO_CELL_COLS + col
+            for row in range(first_row, last_row + 1)
+            for col in range(first_col, last_col + 1)
+        ]
+        clauses.append(f"{alias}.geo_cell IN ({', '.join(['%s'] * len(cells))})")
+        args.extend(cells)
+
+    rows = query_db(f"{source['select']} WHERE {' AND '.join(clauses)}", tuple(args))
+    for row in rows:
+        row["latitude"] = float(row["latitude"])
+        row["longitude"] = float(row["longitude"])
+    return _refine(rows, lat, lng, radius_km, limit, exclude_id)
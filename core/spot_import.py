@@ -0,0 +1,230 @@
+"""Bulk master-spot import from organizer CSV uploads."""
+
+import csv
+import os
+
+from core.db import get_db
+from core.helpers import normalize_state_name
+from core.templating import bump_data_version
+
+
+SPOT_IMPORT_CHUNK_SIZE = 500
+
+_SPOT_NAME_KEYS = ("spot_name", "spot", "place_name")
+_CITY_NAME_KEYS = ("city_name", "city")
+_STATE_KEYS = ("state_name", "state_id", "state")
+_IMAGE_KEYS = ("image_file", "image_url", "image", "images", "photo", "photo_url", "img")
+_DETAIL_KEYS = ("spot_details", "details", "description", "spot_description", "about")
+
+
+def _list_files(folder):
+    try:
+        with os.scandir(folder) as entries:
+            return {entry.name for entry in entries if entry.is_file()}
+    except OSError:
+        return set()
+
+
+def _normalize_local_spot_image(image_value, spot_files, upload_files):
+    text = (image_value or "").strip()
+    if not text:
+        return ""
+    if text.lower().startswith(("http://", "https://")):
+        return text
+
+    normalized = text.replace("\\", "/").lstrip("/")
+    if normalized.lower().startswith("static/uploads/"):
+        normalized = normalized[len("static/uploads/") :]
+    elif normalized.lower().startswith("uploads/"):
+        normalized = normalized[len("uploads/") :]
+
+    if "/" not in normalized and normalized.lower() != "demo.jpg":
+        if normalized in spot_files:
+            return f"spots/{normalized}"
+        if normalized in upload_files:
+            return normalized
+
+    return normalized
+
+
+def _csv_value(row_data, keys):
+    for key in keys:
+        value = row_data.get(key)
+        if value is None:
+            continue
+        text = str(value).strip()
+        if text:
+            return text
+    return ""
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def _load_location_maps(cur):
+    cur.execute("SELECT id, state_name FROM states")
+    states = cur.fetchall()
+    state_map = {str(s["id"]): s["id"] for s in states}
+    state_map.update({(s["state_name"] or "").strip().lower(): s["id"] for s in states})
+
+    cur.execute("SELECT id, state_id, city_name FROM cities")
+    city_id_map = {}
+    city_key_map = {}
+    for c in cur.fetchall():
+        city_id_map[str(c["id"])] = c["id"]
+        city_key_map[((c["city_name"] or "").strip().lower(), int(c["state_id"] or 0))] = c["id"]
+    return state_map, city_id_map, city_key_map
+
+
+def _create_missing_cities(cur, pending_cities, city_key_map):
+    """Insert every unknown (city, state) pair in one batch and map their ids."""
+    if not pending_cities:
+        return
+    cur.executemany(
+        "INSERT INTO cities(state_id, city_name) VALUES(%s,%s)",
+        [(state_id, city_name) for (_, state_id), city_name in pending_cities.items()],
+    )
+    state_ids = sorted({state_id for _, state_id in pending_cities})
+    placeholders = ", ".join(["%s"] * len(state_ids))
+    cur.execute(
+        f"SELECT id, state_id, city_name FROM cities WHERE state_id IN ({placeholders}) ORDER BY id",
+        tuple(state_ids),
+    )
+    for c in cur.fetchall():
+        key = ((c["city_name"] or "").strip().lower(), int(c["state_id"] or 0))
+        city_key_map.setdefault(key, c["id"])
+
+
+def _prefetch_spot_ids(cur, city_ids):
+    """Return ``{(city_id, lower spot name): id}`` for spots in ``city_ids``."""
+    existing = {}
+    for chunk in _chunks(sorted(city_ids), SPOT_IMPORT_CHUNK_SIZE):
+        placeholders = ", ".join(["%s"] * len(chunk))
+        cur.execute(
+            f"SELECT id, city_id, spot_name FROM master_spots WHERE city_id IN ({placeholders})",
+            tuple(chunk),
+        )
+        for row in cur.fetchall():
+            key = (int(row["city_id"]), (row["spot_name"] or "").strip().lower())
+            existing.setdefault(key, row["id"])
+    return existing
+
+
+def import_spots_csv(text_stream, default_city_id, upload_folder, spot_folder, progress=None):
+    """Upsert master spots from a CSV text stream.
+
+    The file is parsed and validated completely before anything is written, so
+    an unreadable CSV (``csv.Error``/``UnicodeDecodeError``) leaves the
+    database untouched. ``progress(done, total, message)`` is called while
+    parsing and after each upsert chunk. Returns
+    ``{"inserted", "updated", "skipped"}``.
+    """
+    report = progress or (lambda done, total=None, message=None: None)
+    spot_files = _list_files(spot_folder)
+    upload_files = _list_files(upload_folder)
+
+    db = get_db()
+    cur = db.cursor(dictionary=True)
+    try:
+        state_map, city_id_map, city_key_map = _load_location_maps(cur)
+
+        def resolve_state_id(raw_state):
+            if not raw_state:
+                return 0
+            cleaned = normalize_state_name(raw_state)
+            return int(state_map.get(cleaned.strip().lower()) or state_map.get(str(cleaned)) or 0)
+
+        skipped = 0
+        parsed_rows = []
+        pending_cities = {}
+        for row_number, row in enumerate(csv.DictReader(text_stream), start=1):
+            if row_number % SPOT_IMPORT_CHUNK_SIZE == 0:
+                report(row_number, None, f"Parsed {row_number} rows")
+            spot_name = _csv_value(row, _SPOT_NAME_KEYS)
+            if not spot_name:
+                skipped += 1
+                continue
+
+            # City is either a known id now, or a (name, state) key resolved
+            # after the pass once all unknown cities are inserted together.
+            city_ref = None
+            raw_city_id = _csv_value(row, ("city_id",))
+            if raw_city_id.isdigit():
+                city_ref = city_id_map.get(str(int(raw_city_id)))
+            raw_city_name = _csv_value(row, _CITY_NAME_KEYS)
+            if not city_ref and raw_city_name:
+                state_id = resolve_state_id(_csv_value(row, _STATE_KEYS))
+                city_key = (raw_city_name.lower(), state_id)
+                city_ref = city_key_map.get(city_key)
+                if not city_ref and state_id:
+                    pending_cities.setdefault(city_key, raw_city_name)
+                    city_ref = city_key
+            if not city_ref:
+                city_ref = default_city_id or None
+            if not city_ref:
+                skipped += 1
+                continue
+
+            image_url = _normalize_local_spot_image(
+                _csv_value(row, _IMAGE_KEYS) or "demo.jpg",
+                spot_files,
+                upload_files,
+            )
+            photo_source = "external_url" if image_url.lower().startswith(("http://", "https://")) else "local_file"
+            spot_details = _csv_value(row, _DETAIL_KEYS) or None
+            parsed_rows.append((city_ref, spot_name, image_url, photo_source, spot_details))
+
+        _create_missing_cities(cur, pending_cities, city_key_map)
+
+        # Later rows for the same (city, spot) win, as they did row-by-row.
+        merged = {}
+        inserted = 0
+        updated = 0
+        for city_ref, spot_name, image_url, photo_source, spot_details in parsed_rows:
+            city_id = city_key_map[city_ref] if isinstance(city_ref, tuple) else city_ref
+            key = (int(city_id), spot_name.lower())
+            if key in merged:
+                updated += 1
+            merged[key] = (spot_name, image_url, photo_source, int(city_id), spot_details)
+
+        existing_ids = _prefetch_spot_ids(cur, {city_id for city_id, _ in merged})
+        upsert_rows = []
+        for key, values in merged.items():
+            spot_id = existing_ids.get(key)
+            if spot_id:
+                updated += 1
+            else:
+                inserted += 1
+            # Existing rows carry their id so the upsert hits the primary key
+            # even where the (city_id, spot_name) unique key is not in place.
+            upsert_rows.append((spot_id,) + values)
+
+        written = 0
+        report(0, len(upsert_rows), "Writing spots")
+        for chunk in _chunks(upsert_rows, SPOT_IMPORT_CHUNK_SIZE):
+            values_sql = ", ".join(["(%s,%s,%s,%s,%s,%s)"] * len(chunk))
+            cur.execute(
+                f"""
+                INSERT INTO master_spots(id, spot_name, image_url, photo_source, city_id, spot_details)
+                VALUES {values_sql}
+                ON DUPLICATE KEY UPDATE
+                    image_url=VALUES(image_url),
+                    photo_source=VALUES(photo_source),
+                    spot_details=VALUES(spot_details)
+                """,
+                tuple(value for row in chunk for value in row),
+            )
+            written += len(chunk)
+            report(written, len(upsert_rows), f"Wrote {written} of {len(upsert_rows)} spots")
+
+        bump_data_version("geo", "spots", cur=cur)
+        db.commit()
+        return {"inserted": inserted, "updated": updated, "skipped": skipped}
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        cur.close()
+        db.close()
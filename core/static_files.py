@@ -0,0 +1,232 @@
+"""Static file serving with fingerprinted URLs and long-lived caching.
+
+``url_for('static', filename='css/base.css')`` becomes
+``/static/css/base.<hash>.css``. The hash comes from the file contents, so
+that URL can be cached for a year as immutable. Content-addressed uploads
+(``.../cas/aa/bb/<sha256>.jpg``) are immutable already and are not renamed.
+Other requests get strong content ETags, Last-Modified and 304s. Documents
+are never shared-cached.
+
+With ``STATIC_PRECOMPRESSED``, ``scripts/build_static_assets.py`` output is
+used: URLs point at ``name.min.css``/``.js`` while it is at least as new as
+the source, and ``.br``/``.gz`` siblings are sent when ``Accept-Encoding``
+allows.
+
+``STATIC_SENDFILE_MODE`` hands the body to the reverse proxy:
+``x-sendfile`` (Apache/lighttpd) sends the absolute path, and
+``x-accel-redirect`` (nginx) sends ``STATIC_ACCEL_PREFIX + filename``, which
+needs a matching ``internal`` location.
+"""
+
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from urllib.parse import quote
+
+from flask import abort, current_app, request, send_file
+from werkzeug.utils import safe_join
+
+from core.compression import ENCODING_PREFERENCE, negotiate_encoding
+from core.config import (
+    DERIVED_UPLOAD_FOLDER,
+    DOC_UPLOAD_FOLDER,
+    STATIC_ACCEL_PREFIX,
+    STATIC_FILE_INFO_MAX_ENTRIES,
+    STATIC_FINGERPRINT,
+    STATIC_FINGERPRINT_CHECK_SECONDS,
+    STATIC_MAX_AGE_SECONDS,
+    STATIC_PRECOMPRESSED,
+    STATIC_SENDFILE_MODE,
+)
+
+
+FINGERPRINT_LENGTH = 10
+SENDFILE_MODES = ("", "x-sendfile", "x-accel-redirect")
+MINIFIED_EXTENSIONS = (".css", ".js")
+PRECOMPRESSED_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+_FINGERPRINTED_RE = re.compile(r"^(.+)\.([0-9a-f]{%d})(\.[A-Za-z0-9]+)$" % FINGERPRINT_LENGTH)
+_CAS_RE = re.compile(r"(?:^|/)cas/[0-9a-f]{2}/[0-9a-f]{2}/([0-9a-f]{64})\.[A-Za-z0-9]+$")
+
+_file_info = OrderedDict()
+_file_info_lock = threading.Lock()
+
+
+def _static_prefix(folder, static_root):
+    # Upload folders in core.config are relative paths under "static/".
+    base = static_root if os.path.isabs(folder) else "static"
+    return os.path.relpath(folder, base).replace(os.sep, "/").rstrip("/") + "/"
+
+
+def _content_digest(path):
+    hasher = hashlib.sha1()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def static_file_info(static_root, filename):
+    """Return ``(mtime, size, digest)`` for a static file, or ``None``.
+
+    Digests are cached and only re-validated (stat) every
+    ``STATIC_FINGERPRINT_CHECK_SECONDS``, and only re-hashed when the file
+    changed. The cache is an LRU of ``STATIC_FILE_INFO_MAX_ENTRIES``
+    existing files; misses are not cached, so requests for random names
+    cannot grow it.
+    """
+    now = time.monotonic()
+    with _file_info_lock:
+        cached = _file_info.get(filename)
+        if cached:
+            _file_info.move_to_end(filename)
+    if cached and now - cached[0] < STATIC_FINGERPRINT_CHECK_SECONDS:
+        return cached[1]
+
+    path = safe_join(static_root, filename)
+    try:
+        stat = os.stat(path) if path else None
+    except OSError:
+        stat = None
+    if stat is None or not os.path.isfile(path):
+        info = None
+    elif cached and cached[1][:2] == (stat.st_mtime, stat.st_size):
+        info = cached[1]
+    else:
+        cas_match = _CAS_RE.search(filename)
+        digest = cas_match.group(1) if cas_match and not _is_derived(filename) else _content_digest(path)
+        info = (stat.st_mtime, stat.st_size, digest)
+    with _file_info_lock:
+        if info is None:
+            _file_info.pop(filename, None)
+        else:
+            _file_info[filename] = (now, info)
+            _file_info.move_to_end(filename)
+            while len(_file_info) > STATIC_FILE_INFO_MAX_ENTRIES:
+                _file_info.popitem(last=False)
+    return info
+
+
+def static_file_cache_size():
+    return len(_file_info)
+
+
+def _is_derived(filename):
+    return filename.startswith(current_app.config["STATIC_DERIVED_PREFIX"])
+
+
+def _is_private(filename):
+    return filename.startswith(current_app.config["STATIC_PRIVATE_PREFIX"])
+
+
+def _is_content_addressed(filename):
+    return bool(_CAS_RE.search(filename)) and not _is_derived(filename)
+
+
+def fingerprint_filename(filename):
+    """``css/base.css`` -> ``css/base.<hash>.css`` (unchanged when not applicable)."""
+    if _is_content_addressed(filename) or _is_private(filename):
+        return filename
+    stem, ext = os.path.splitext(filename)
+    if not ext or not stem or stem.endswith("/"):
+        return filename
+    info = static_file_info(current_app.static_folder, filename)
+    if info is None:
+        return filename
+    if STATIC_PRECOMPRESSED and ext in MINIFIED_EXTENSIONS and not stem.endswith(".min"):
+        minified = static_file_info(current_app.static_folder, f"{stem}.min{ext}")
+        if minified is not None and minified[0] >= info[0]:
+            stem, info = f"{stem}.min", minified
+    return f"{stem}.{info[2][:FINGERPRINT_LENGTH]}{ext}"
+
+
+def _add_static_fingerprint(endpoint, values):
+    if endpoint != "static" or "filename" not in values:
+        return
+    values["filename"] = fingerprint_filename(values["filename"])
+
+
+def _cache_control(filename, immutable):
+    if _is_private(filename):
+        return "private, no-cache"
+    if immutable:
+        return f"public, max-age={STATIC_MAX_AGE_SECONDS}, immutable"
+    return "public, no-cache"
+
+
+def precompressed_encodings(static_root, filename, mtime):
+    """Encodings with a ``.br``/``.gz`` sibling at least as new as the file."""
+    available = []
+    for encoding in ENCODING_PREFERENCE:
+        info = static_file_info(static_root, filename + PRECOMPRESSED_SUFFIXES[encoding])
+        if info is not None and info[0] >= mtime:
+            available.append(encoding)
+    return tuple(available)
+
+
+def serve_static(filename):
+    static_root = current_app.static_folder
+    info = static_file_info(static_root, filename)
+    immutable = info is not None and _is_content_addressed(filename)
+    if info is None:
+        match = _FINGERPRINTED_RE.match(filename)
+        if not match:
+            abort(404)
+        filename = match.group(1) + match.group(3)
+        info = static_file_info(static_root, filename)
+        if info is None:
+            abort(404)
+        # A stale fingerprint (file changed since the page was rendered)
+        # still serves the current file, just without the long-lived cache.
+        immutable = info[2].startswith(match.group(2))
+
+    mtime, size, digest = info
+    path = safe_join(static_root, filename)
+    if STATIC_SENDFILE_MODE == "x-accel-redirect":
+        response = current_app.response_class()
+        response.headers["X-Accel-Redirect"] = STATIC_ACCEL_PREFIX.rstrip("/") + "/" + quote(filename)
+        response.mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        response.set_etag(digest)
+        response.last_modified = datetime.fromtimestamp(mtime, tz=timezone.utc)
+        response = response.make_conditional(request)
+    else:
+        # With STATIC_SENDFILE_MODE=x-sendfile, app.use_x_sendfile makes
+        # send_file emit the X-Sendfile header instead of the body.
+        encodings = precompressed_encodings(static_root, filename, mtime) if STATIC_PRECOMPRESSED else ()
+        encoding = negotiate_encoding(request.headers.get("Accept-Encoding"), encodings)
+        if encoding:
+            response = send_file(
+                path + PRECOMPRESSED_SUFFIXES[encoding],
+                mimetype=mimetypes.guess_type(filename)[0] or "application/octet-stream",
+                conditional=True,
+                etag=f"{digest}-{encoding}",
+                last_modified=mtime,
+                max_age=0,
+            )
+            response.headers["Content-Encoding"] = encoding
+        else:
+            response = send_file(path, conditional=True, etag=digest, last_modified=mtime, max_age=0)
+        if encodings:
+            response.vary.add("Accept-Encoding")
+    response.headers["Cache-Control"] = _cache_control(filename, immutable)
+    response.headers.pop("Expires", None)
+    return response
+
+
+def init_static_files(app):
+    """Replace Flask's static view and fingerprint ``url_for('static', ...)``."""
+    if not app.has_static_folder:
+        return
+    if STATIC_SENDFILE_MODE not in SENDFILE_MODES:
+        print(f"[static-warning] Unknown STATIC_SENDFILE_MODE {STATIC_SENDFILE_MODE!r}; serving files directly.")
+    app.use_x_sendfile = STATIC_SENDFILE_MODE == "x-sendfile"
+    app.config["STATIC_PRIVATE_PREFIX"] = _static_prefix(DOC_UPLOAD_FOLDER, app.static_folder)
+    app.config["STATIC_DERIVED_PREFIX"] = _static_prefix(DERIVED_UPLOAD_FOLDER, app.static_folder)
+    app.view_functions["static"] = serve_static
+    if STATIC_FINGERPRINT:
+        app.url_defaults(_add_static_fingerprint)
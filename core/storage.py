@@ -0,0 +1,211 @@
+"""Content-addressed upload storage.
+
+Uploads are hashed (SHA-256) while they stream to disk and stored once at
+``<folder>/cas/<aa>/<bb>/<sha256><ext>``. Saving the same bytes again reuses
+the existing file, and because a path never changes content it can be served
+with immutable cache headers. Every stored file is also recorded in
+``stored_files``.
+
+Writes go chunk by chunk to a temp file that is renamed into place. A file is
+rejected as soon as its first chunk fails magic-byte sniffing or it goes over
+its size cap. Request bodies are capped per endpoint before they are parsed
+(``init_upload_limits``).
+"""
+
+import hashlib
+import os
+import tempfile
+
+from flask import flash, redirect, request, url_for
+from werkzeug.exceptions import RequestEntityTooLarge
+
+from core.config import MAX_UPLOAD_REQUEST_BYTES, UPLOAD_ENDPOINT_LIMITS
+from core.db import execute_db
+
+
+CAS_DIRNAME = "cas"
+STREAM_CHUNK_BYTES = 1024 * 1024
+
+# Content families each extension may contain; checked against magic bytes.
+IMAGE_KINDS = ("jpeg", "png", "webp")
+EXTENSION_KINDS = {
+    ".jpg": IMAGE_KINDS,
+    ".jpeg": IMAGE_KINDS,
+    ".png": IMAGE_KINDS,
+    ".webp": IMAGE_KINDS,
+    ".pdf": ("pdf",),
+}
+TEXT_EXTENSIONS = (".csv", ".txt")
+
+# DB columns holding upload paths, and the folder each path is relative to
+# ("uploads" = UPLOAD_FOLDER, "documents" = DOC_UPLOAD_FOLDER).
+UPLOAD_REFERENCE_COLUMNS = (
+    ("master_spots", "image_url", "uploads"),
+    ("spot_change_requests", "image_url", "uploads"),
+    ("tours", "image_path", "uploads"),
+    ("hotel_images", "image_url", "uploads"),
+    ("users", "document_path", "documents"),
+    ("user_profiles", "identity_proof_path", "documents"),
+    ("user_profiles", "business_proof_path", "documents"),
+    ("user_profiles", "property_proof_path", "documents"),
+    ("user_profiles", "vehicle_proof_path", "documents"),
+    ("user_profiles", "driver_verification_path", "documents"),
+    ("user_profiles", "bank_proof_path", "documents"),
+    ("user_profiles", "address_proof_path", "documents"),
+    ("user_profiles", "operational_photo_path", "documents"),
+    ("hotel_profiles", "registration_doc_path", "documents"),
+    ("hotel_bookings", "id_proof_file_path", "documents"),
+    ("bookings", "id_proof_file_path", "documents"),
+)
+
+RECORD_STORED_FILE_SQL = """
+    INSERT INTO stored_files(sha256, storage_path, size_bytes, original_name)
+    VALUES(%s,%s,%s,%s)
+    ON DUPLICATE KEY UPDATE upload_count=upload_count+1, last_uploaded_at=NOW()
+"""
+
+
+def normalize_upload_reference(value, base="uploads"):
+    """Map a DB reference to a path relative to ``static/uploads``.
+
+    Returns ``None`` for empty values and external URLs.
+    """
+    text = (value or "").strip().replace("\\", "/").lstrip("/")
+    if not text or text.lower().startswith(("http://", "https://")):
+        return None
+    for prefix in ("static/uploads/", "uploads/"):
+        if text.lower().startswith(prefix):
+            text = text[len(prefix) :]
+            break
+    if base == "documents" and not text.startswith("documents/"):
+        text = f"documents/{text}"
+    return text
+
+
+def content_path(digest, extension):
+    """Sharded path of a blob, relative to the folder it is stored in."""
+    return f"{CAS_DIRNAME}/{digest[:2]}/{digest[2:4]}/{digest}{extension.lower()}"
+
+
+def hash_file(path):
+    hasher = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(STREAM_CHUNK_BYTES), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+class UploadRejected(ValueError):
+    """An upload failed validation; the message is safe to show to users."""
+
+
+def sniff_kind(head):
+    if head.startswith(b"\xff\xd8\xff"):
+        return "jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    if head.startswith(b"%PDF-"):
+        return "pdf"
+    return None
+
+
+def _check_head(head, extension):
+    extension = extension.lower()
+    allowed_kinds = EXTENSION_KINDS.get(extension)
+    if allowed_kinds and sniff_kind(head) not in allowed_kinds:
+        raise UploadRejected(f"File content is not a valid {extension.lstrip('.').upper()} file.")
+    if extension in TEXT_EXTENSIONS and b"\x00" in head:
+        raise UploadRejected("File content is not plain text.")
+
+
+def _stream_to_temp(stream, folder, extension, max_bytes=None):
+    """Write ``stream`` to a temp file in ``folder``; return ``(tmp_path, sha256, size)``.
+
+    Raises ``UploadRejected`` (after removing the temp file) on an empty
+    upload, a failed magic-byte check or when ``max_bytes`` is exceeded.
+    """
+    os.makedirs(folder, exist_ok=True)
+    hasher = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(prefix=".upload-", dir=folder)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            for chunk in iter(lambda: stream.read(STREAM_CHUNK_BYTES), b""):
+                if size == 0:
+                    _check_head(chunk, extension)
+                size += len(chunk)
+                if max_bytes and size > max_bytes:
+                    raise UploadRejected(f"File is larger than {max_bytes / (1024 * 1024):g} MB.")
+                hasher.update(chunk)
+                out.write(chunk)
+        if size == 0:
+            raise UploadRejected("File is empty.")
+        return tmp_path, hasher.hexdigest(), size
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_stream(stream, path, max_bytes=None):
+    """Stream to ``path`` atomically (no dedup); return the size written."""
+    tmp_path, _, size = _stream_to_temp(stream, os.path.dirname(path) or ".", os.path.splitext(path)[1], max_bytes)
+    os.replace(tmp_path, path)
+    return size
+
+
+def store_stream(stream, folder, extension, max_bytes=None):
+    """Stream ``stream`` into ``folder``'s content store.
+
+    Returns ``(relative_path, sha256, size_bytes, deduplicated)`` where
+    ``relative_path`` is relative to ``folder``.
+    """
+    tmp_path, digest, size = _stream_to_temp(stream, folder, extension, max_bytes)
+    try:
+        relative_path = content_path(digest, extension)
+        final_path = os.path.join(folder, relative_path)
+        if os.path.isfile(final_path):
+            os.remove(tmp_path)
+            return relative_path, digest, size, True
+        os.makedirs(os.path.dirname(final_path), exist_ok=True)
+        os.replace(tmp_path, final_path)
+        return relative_path, digest, size, False
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def record_stored_file(digest, storage_path, size_bytes, original_name):
+    try:
+        execute_db(RECORD_STORED_FILE_SQL, (digest, storage_path, size_bytes, (original_name or "")[:255] or None))
+    except Exception as exc:
+        # The file is safely on disk; the index row is only bookkeeping.
+        print(f"[storage-warning] Could not record stored file {storage_path}: {exc}")
+
+
+def init_upload_limits(app):
+    """Cap request bodies globally and per endpoint (``UPLOAD_ENDPOINT_LIMITS``)."""
+    app.config["MAX_CONTENT_LENGTH"] = MAX_UPLOAD_REQUEST_BYTES
+
+    @app.before_request
+    def _enforce_endpoint_upload_limit():
+        limit = UPLOAD_ENDPOINT_LIMITS.get(request.endpoint)
+        if not limit or request.method not in ("POST", "PUT"):
+            return None
+        try:
+            # Flask >= 3.1 also enforces this while streaming chunked bodies.
+            request.max_content_length = limit
+        except AttributeError:
+            pass
+        if request.content_length and request.content_length > limit:
+            raise RequestEntityTooLarge()
+        return None
+
+    @app.errorhandler(RequestEntityTooLarge)
+    def _upload_too_large(_exc):
+        limit = UPLOAD_ENDPOINT_LIMITS.get(request.endpoint) or MAX_UPLOAD_REQUEST_BYTES
+        flash(f"Upload is too large. Keep the total under {limit / (1024 * 1024):g} MB per submission.")
+        return redirect(request.referrer or url_for("home"))
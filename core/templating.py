@@ -0,0 +1,257 @@
+"""Template render timing and a fragment cache keyed on data versions.
+
+Render timing hooks Flask's template signals:
+- each request's outermost ``render_template`` time is kept in the WSGI
+  environ (see :func:`request_template_seconds`)
+- per-template totals are exported through ``core.metrics``
+- in debug mode the time goes into Server-Timing
+
+Fragments are cached with ``{% call cached_fragment(name, *deps, key=...) %}``.
+The block body is rendered only on a miss. Entries are keyed on the
+fragment name, ``key`` and the current version of every dependency named
+in ``deps`` ("geo" for states/cities, "spots", "hotels", "tours"). Writes
+call :func:`bump_data_version`, which increments the counter in the
+``data_versions`` table, so older entries stop matching and age out of
+the LRU. Other processes pick up new versions within
+``DATA_VERSION_TTL_SECONDS``. Views can pass :class:`LazyRows` so that
+queries only run when a fragment actually renders.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from flask import has_request_context, request
+from flask.signals import before_render_template, template_rendered
+from markupsafe import Markup
+
+from core.config import (
+    DATA_VERSION_TTL_SECONDS,
+    FRAGMENT_CACHE_ENABLED,
+    FRAGMENT_CACHE_MAX_BYTES,
+)
+from core.db import execute_db, query_db
+from core.metrics import register_gauge
+
+
+_BUMP_VERSION_SQL = """
+    INSERT INTO data_versions(name, version) VALUES(%s, 1)
+    ON DUPLICATE KEY UPDATE version=version+1
+"""
+
+_ENVIRON_STARTS = "tourgen.template_starts"
+_ENVIRON_SECONDS = "tourgen.template_seconds"
+_ENVIRON_NAMES = "tourgen.template_names"
+
+_fragments = OrderedDict()
+_fragment_bytes = 0
+_fragment_hits = 0
+_fragment_misses = 0
+_fragment_lock = threading.Lock()
+
+_versions = None
+_versions_loaded_at = 0.0
+_versions_lock = threading.Lock()
+_bump_listeners = []
+
+_render_totals = {}
+_render_lock = threading.Lock()
+
+
+class LazyRows:
+    """List-like rows that run ``loader()`` on first use."""
+
+    __slots__ = ("_loader", "_rows")
+
+    def __init__(self, loader):
+        self._loader = loader
+        self._rows = None
+
+    def _load(self):
+        if self._rows is None:
+            self._rows = list(self._loader())
+        return self._rows
+
+    def __iter__(self):
+        return iter(self._load())
+
+    def __len__(self):
+        return len(self._load())
+
+    def __bool__(self):
+        return bool(self._load())
+
+    def __getitem__(self, index):
+        return self._load()[index]
+
+
+def _load_versions():
+    global _versions, _versions_loaded_at
+    now = time.monotonic()
+    if _versions is not None and now - _versions_loaded_at < DATA_VERSION_TTL_SECONDS:
+        return _versions
+    with _versions_lock:
+        if _versions is not None and now - _versions_loaded_at < DATA_VERSION_TTL_SECONDS:
+            return _versions
+        try:
+            rows = query_db("SELECT name, version FROM data_versions")
+        except Exception as exc:
+            print(f"[fragment-warning] Could not load data versions: {exc}")
+            return None
+        _versions = {row["name"]: int(row["version"]) for row in rows}
+        _versions_loaded_at = time.monotonic()
+        return _versions
+
+
+def data_versions(*names):
+    """Current version of each name, or ``None`` when versions are unavailable."""
+    versions = _load_versions()
+    if versions is None:
+        return None
+    return tuple(versions.get(name, 0) for name in names)
+
+
+def on_data_version_bump(callback):
+    """Call ``callback(names)`` after every :func:`bump_data_version` in this process."""
+    _bump_listeners.append(callback)
+
+
+def bump_data_version(*names, cur=None):
+    """Invalidate fragments and cached pages depending on ``names``.
+
+    Pass ``cur`` to bump inside the caller's transaction; otherwise each bump
+    commits on its own. Failures are logged, not raised.
+    """
+    global _versions
+    for name in names:
+        try:
+            if cur is not None:
+                cur.execute(_BUMP_VERSION_SQL, (name,))
+            else:
+                execute_db(_BUMP_VERSION_SQL, (name,))
+        except Exception as exc:
+            print(f"[fragment-warning] Could not bump data version {name}: {exc}")
+    with _versions_lock:
+        # Reload on next read so this process sees its own writes at once.
+        _versions = None
+    for callback in _bump_listeners:
+        try:
+            callback(frozenset(names))
+        except Exception as exc:
+            print(f"[fragment-warning] Data version listener failed: {exc}")
+
+
+def _evict_fragments():
+    global _fragment_bytes
+    while _fragments and _fragment_bytes > FRAGMENT_CACHE_MAX_BYTES:
+        _, html = _fragments.popitem(last=False)
+        _fragment_bytes -= len(html)
+
+
+def cached_fragment(name, *deps, key=None, caller=None):
+    """Jinja ``{% call %}`` target: render the block once per name/key/versions."""
+    global _fragment_bytes, _fragment_hits, _fragment_misses
+    versions = data_versions(*deps) if FRAGMENT_CACHE_ENABLED else None
+    if versions is None:
+        return Markup(caller())
+    cache_key = (name, versions, key if not isinstance(key, list) else tuple(key))
+    with _fragment_lock:
+        html = _fragments.get(cache_key)
+        if html is not None:
+            _fragments.move_to_end(cache_key)
+            _fragment_hits += 1
+            return html
+        _fragment_misses += 1
+    html = Markup(caller())
+    if len(html) <= FRAGMENT_CACHE_MAX_BYTES // 4:
+        with _fragment_lock:
+            previous = _fragments.pop(cache_key, None)
+            if previous is not None:
+                _fragment_bytes -= len(previous)
+            _fragments[cache_key] = html
+            _fragment_bytes += len(html)
+            _evict_fragments()
+    return html
+
+
+def fragment_cache_stats():
+    return {
+        "entries": len(_fragments),
+        "bytes": _fragment_bytes,
+        "hits": _fragment_hits,
+        "misses": _fragment_misses,
+    }
+
+
+def clear_fragment_cache():
+    global _fragment_bytes
+    with _fragment_lock:
+        _fragments.clear()
+        _fragment_bytes = 0
+
+
+def request_template_seconds():
+    """Outermost ``render_template`` time spent in the current request."""
+    if not has_request_context():
+        return 0.0
+    return request.environ.get(_ENVIRON_SECONDS, 0.0)
+
+
+def template_render_totals():
+    """``{template: (renders, seconds)}`` since start."""
+    with _render_lock:
+        return dict(_render_totals)
+
+
+def _template_started(sender, template=None, context=None, **extra):
+    if has_request_context():
+        request.environ.setdefault(_ENVIRON_STARTS, []).append(time.perf_counter())
+
+
+def _template_finished(sender, template=None, context=None, **extra):
+    if not has_request_context():
+        return
+    starts = request.environ.get(_ENVIRON_STARTS)
+    if not starts:
+        return
+    seconds = time.perf_counter() - starts.pop()
+    name = getattr(template, "name", None) or "<string>"
+    if not starts:
+        # Only the outermost render counts toward request time.
+        environ = request.environ
+        environ[_ENVIRON_SECONDS] = environ.get(_ENVIRON_SECONDS, 0.0) + seconds
+        environ.setdefault(_ENVIRON_NAMES, []).append(name)
+    with _render_lock:
+        renders, total = _render_totals.get(name, (0, 0.0))
+        _render_totals[name] = (renders + 1, total + seconds)
+
+
+def init_template_timing(app):
+    """Time ``render_template`` calls and expose fragment cache helpers to Jinja."""
+    before_render_template.connect(_template_started, app)
+    template_rendered.connect(_template_finished, app)
+    app.jinja_env.globals.update(cached_fragment=cached_fragment)
+
+    register_gauge(
+        "template_render_seconds_total",
+        "Time spent rendering each template.",
+        lambda: {name: seconds for name, (_, seconds) in template_render_totals().items()},
+        metric_type="counter",
+    )
+    register_gauge(
+        "template_renders_total",
+        "render_template calls per template.",
+        lambda: {name: renders for name, (renders, _) in template_render_totals().items()},
+        metric_type="counter",
+    )
+    register_gauge("fragment_cache", "Fragment cache entries, bytes, hits and misses.", fragment_cache_stats)
+
+    @app.after_request
+    def _report_template_time(response):
+        if app.debug and _ENVIRON_SECONDS in request.environ:
+            names = ", ".join(request.environ.get(_ENVIRON_NAMES, []))
+            response.headers.add(
+                "Server-Timing",
+                f'tpl;dur={round(request.environ[_ENVIRON_SECONDS] * 1000, 2)};desc="{names}"',
+            )
+        return response
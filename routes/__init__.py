@@ -2,6 +2,9 @@
 
 from routes.admin_routes import register_routes as register_admin_routes
 from routes.booking_routes import register_routes as register_booking_routes
+from routes.job_routes import register_routes as register_job_routes
+from routes.metrics_routes import register_routes as register_metrics_routes
+from routes.nearby_routes import register_routes as register_nearby_routes
 from routes.organizer_routes import register_routes as register_organizer_routes
 from routes.provider_routes import register_routes as register_provider_routes
 from routes.public_routes import register_routes as register_public_routes
@@ -13,3 +16,6 @@ def register_all_routes(app):
     register_organizer_routes(app)
     register_provider_routes(app)
     register_booking_routes(app)
+    register_job_routes(app)
+    register_nearby_routes(app)
+    register_metrics_routes(app)
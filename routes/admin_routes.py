@@ -1,8 +1,20 @@
-from flask import flash, redirect, render_template, request, session, url_for
+from flask import flash, jsonify, redirect, render_template, request, session, url_for
 
+from core.admin_console import (
+    ADMIN_TABLES,
+    fetch_admin_page,
+    get_admin_summary,
+    invalidate_admin_summary,
+    page_link_args,
+    table_args,
+)
 from core.auth import login_required, role_required
-from core.db import execute_db, get_db, query_db
+from core.db import execute_db, get_db
 from core.helpers import get_onboarding_document_requirements, to_int
+from core.jobs import enqueue_job
+from core.route_metrics import tour_ids_for_spots
+from core.spatial import invalidate_spatial_index
+from core.templating import bump_data_version
 
 
 def _resolve_requested_photo(image_url, photo_source):
@@ -15,92 +27,365 @@ def _resolve_requested_photo(image_url, photo_source):
     return final_image, source
 
 
-def _approve_spot_request(spot_request_id, admin_id, note):
-    db = get_db()
-    cur = db.cursor(dictionary=True)
-    try:
-        cur.execute("SELECT * FROM spot_change_requests WHERE id=%s FOR UPDATE", (spot_request_id,))
-        request_row = cur.fetchone()
-        if not request_row:
-            db.rollback()
-            return False, "Spot request not found."
-        if (request_row.get("status") or "").strip().lower() != "pending":
-            db.rollback()
-            return False, f"Spot request #{spot_request_id} is already {request_row.get('status') or 'processed'}."
-
-        request_type = (request_row.get("request_type") or "").strip()
+BULK_REVIEW_MAX_IDS = 500
+
+_SPOT_REVIEW_VERBS = {
+    "approve_spot_request": "approve",
+    "reject_spot_request": "reject",
+    "set_spot_request_pending": "reset",
+}
+
+_USER_REVIEW_ACTIONS = {
+    "approve": ("approved", "verification_badge=1, kyc_stage='verified', admin_note=%s, reviewed_at=NOW()"),
+    "reject": ("rejected", "verification_badge=0, kyc_stage='rejected', admin_note=%s, reviewed_at=NOW()"),
+    "set_pending": ("pending", "verification_badge=0, kyc_stage='submitted_for_admin_approval', admin_note=%s"),
+}
+
+
+def _unique_ids(raw_ids):
+    ids = []
+    for raw in raw_ids or []:
+        value = to_int(raw, 0)
+        if value > 0 and value not in ids:
+            ids.append(value)
+    return ids[:BULK_REVIEW_MAX_IDS]
+
+
+def _placeholders(values):
+    return ", ".join(["%s"] * len(values))
+
+
+def _values_table(columns, rows):
+    """Inline derived table for set-based ``UPDATE ... JOIN`` from Python rows."""
+    first = "SELECT " + ", ".join(f"%s AS {col}" for col in columns)
+    rest = " UNION ALL SELECT " + ", ".join(["%s"] * len(columns))
+    return first + rest * (len(rows) - 1), tuple(value for row in rows for value in row)
+
+
+def _existing_ids(cur, table_name, ids):
+    if not ids:
+        return set()
+    ids = sorted(ids)
+    cur.execute(f"SELECT id FROM {table_name} WHERE id IN ({_placeholders(ids)})", tuple(ids))
+    return {int(row["id"]) for row in cur.fetchall()}
+
+
+def _spot_keys(cur, city_ids):
+    if not city_ids:
+        return {}
+    city_ids = sorted(city_ids)
+    cur.execute(
+        f"SELECT id, city_id, spot_name FROM master_spots WHERE city_id IN ({_placeholders(city_ids)})",
+        tuple(city_ids),
+    )
+    return {
+        (int(row["city_id"]), (row["spot_name"] or "").strip().lower()): int(row["id"])
+        for row in cur.fetchall()
+    }
+
+
+def _apply_spot_approvals(cur, pending_rows, admin_id, note, results):
+    """Apply approved add-spot and image-change requests; returns the touched spot ids."""
+    adds = []
+    image_updates = []
+    for row in pending_rows:
+        request_id = int(row["id"])
+        request_type = (row.get("request_type") or "").strip()
         requested_image, requested_photo_source = _resolve_requested_photo(
-            request_row.get("image_url"),
-            request_row.get("photo_source"),
+            row.get("image_url"),
+            row.get("photo_source"),
         )
-
-        applied_spot_id = None
         if request_type == "add_spot":
-            city_id = to_int(request_row.get("city_id"), 0)
-            spot_name = (request_row.get("spot_name") or "").strip()
+            city_id = to_int(row.get("city_id"), 0)
+            spot_name = (row.get("spot_name") or "").strip()
             if city_id <= 0 or not spot_name:
-                db.rollback()
-                return False, "Invalid add-spot request: city and spot name are required."
+                results[request_id] = (False, "Invalid add-spot request: city and spot name are required.")
+                continue
+            adds.append((request_id, city_id, spot_name, requested_image, requested_photo_source, row))
+        elif request_type == "update_spot_image":
+            spot_id = to_int(row.get("spot_id"), 0)
+            if spot_id <= 0:
+                results[request_id] = (False, "Invalid image-change request: target spot is missing.")
+                continue
+            image_updates.append((request_id, spot_id, requested_image, requested_photo_source))
+        else:
+            results[request_id] = (False, "Unknown spot request type.")
 
-            cur.execute("SELECT id FROM cities WHERE id=%s", (city_id,))
-            if not cur.fetchone():
-                db.rollback()
-                return False, "City from spot request no longer exists."
+    known_cities = _existing_ids(cur, "cities", {add[1] for add in adds})
+    existing_keys = _spot_keys(cur, known_cities)
+    applied = {}
 
-            cur.execute(
-                """
-                INSERT INTO master_spots(spot_name,image_url,photo_source,city_id,latitude,longitude,spot_details)
-                VALUES(%s,%s,%s,%s,%s,%s,%s)
-                """,
+    insert_rows = []
+    batch_keys = set()
+    for request_id, city_id, spot_name, image, source, row in adds:
+        if city_id not in known_cities:
+            results[request_id] = (False, "City from spot request no longer exists.")
+            continue
+        key = (city_id, spot_name.lower())
+        if key in existing_keys or key in batch_keys:
+            results[request_id] = (False, f"Spot '{spot_name}' already exists in this city.")
+            continue
+        batch_keys.add(key)
+        insert_rows.append(
+            (
+                request_id,
+                key,
                 (
                     spot_name,
-                    requested_image,
-                    requested_photo_source,
+                    image,
+                    source,
                     city_id,
-                    request_row.get("latitude"),
-                    request_row.get("longitude"),
-                    request_row.get("spot_details") or None,
+                    row.get("latitude"),
+                    row.get("longitude"),
+                    row.get("spot_details") or None,
                 ),
             )
-            applied_spot_id = int(cur.lastrowid)
-        elif request_type == "update_spot_image":
-            spot_id = to_int(request_row.get("spot_id"), 0)
-            if spot_id <= 0:
-                db.rollback()
-                return False, "Invalid image-change request: target spot is missing."
-
-            cur.execute("SELECT id FROM master_spots WHERE id=%s", (spot_id,))
-            if not cur.fetchone():
-                db.rollback()
-                return False, "Target spot no longer exists."
+        )
+    if insert_rows:
+        cur.execute(
+            f"""
+            INSERT INTO master_spots(spot_name,image_url,photo_source,city_id,latitude,longitude,spot_details)
+            VALUES {", ".join(["(%s,%s,%s,%s,%s,%s,%s)"] * len(insert_rows))}
+            """,
+            tuple(value for _, _, values in insert_rows for value in values),
+        )
+        # Map new ids back by (city, name) rather than assuming consecutive
+        # auto-increment values for the multi-row insert.
+        new_keys = _spot_keys(cur, {key[0] for _, key, _ in insert_rows})
+        for request_id, key, _ in insert_rows:
+            applied[request_id] = new_keys[key]
 
-            cur.execute(
-                "UPDATE master_spots SET image_url=%s, photo_source=%s WHERE id=%s",
-                (requested_image, requested_photo_source, spot_id),
-            )
-            applied_spot_id = spot_id
-        else:
-            db.rollback()
-            return False, "Unknown spot request type."
+    known_spots = _existing_ids(cur, "master_spots", {update[1] for update in image_updates})
+    latest_images = {}
+    for request_id, spot_id, image, source in sorted(image_updates):
+        if spot_id not in known_spots:
+            results[request_id] = (False, "Target spot no longer exists.")
+            continue
+        # Several requests for one spot: the newest request's image wins.
+        latest_images[spot_id] = (image, source)
+        applied[request_id] = spot_id
+    if latest_images:
+        values_sql, values_args = _values_table(
+            ("spot_id", "image_url", "photo_source"),
+            [(spot_id, image, source) for spot_id, (image, source) in latest_images.items()],
+        )
+        cur.execute(
+            f"""
+            UPDATE master_spots ms
+            JOIN ({values_sql}) v ON v.spot_id=ms.id
+            SET ms.image_url=v.image_url, ms.photo_source=v.photo_source
+            """,
+            values_args,
+        )
 
+    if applied:
+        values_sql, values_args = _values_table(("request_id", "applied_spot_id"), list(applied.items()))
         cur.execute(
-            """
-            UPDATE spot_change_requests
-            SET status='approved', admin_note=%s, reviewed_by=%s, reviewed_at=NOW(),
-                applied_spot_id=%s, updated_at=NOW()
-            WHERE id=%s
+            f"""
+            UPDATE spot_change_requests r
+            JOIN ({values_sql}) v ON v.request_id=r.id
+            SET r.status='approved', r.admin_note=%s, r.reviewed_by=%s, r.reviewed_at=NOW(),
+                r.applied_spot_id=v.applied_spot_id, r.updated_at=NOW()
             """,
-            (note or None, admin_id, applied_spot_id, spot_request_id),
+            values_args + (note or None, admin_id),
         )
+        for request_id in applied:
+            results[request_id] = (True, f"Spot request #{request_id} approved.")
+    return set(applied.values())
+
+
+def _queue_route_metrics(spot_ids, admin_id):
+    """Enqueue a route-metrics recompute for the tours that use ``spot_ids``.
+
+    The approval is already committed, so a failure here is only logged;
+    ``booking()`` falls back to inline legs while the stored row is stale.
+    """
+    try:
+        tour_ids = tour_ids_for_spots(spot_ids)
+        if tour_ids:
+            enqueue_job("tour_route_metrics", {"tour_ids": tour_ids}, created_by=admin_id)
+    except Exception as exc:
+        print(f"[route-warning] Could not queue route metrics for spots {sorted(spot_ids)}: {exc}")
+
+
+def _review_spot_requests(spot_request_ids, action, admin_id, note):
+    """Approve, reject or reset many spot requests in one transaction.
+
+    Invalid or already-processed requests are reported and skipped; the rest
+    are applied with set-based statements. Returns ``[{"id", "ok", "message"}]``
+    in request order.
+    """
+    ids = _unique_ids(spot_request_ids)
+    if not ids or action not in _SPOT_REVIEW_VERBS:
+        return []
+
+    results = {}
+    approved_spot_ids = set()
+    db = get_db()
+    cur = db.cursor(dictionary=True)
+    try:
+        cur.execute(f"SELECT * FROM spot_change_requests WHERE id IN ({_placeholders(ids)}) FOR UPDATE", tuple(ids))
+        rows = {int(row["id"]): row for row in cur.fetchall()}
+        for request_id in ids:
+            if request_id not in rows:
+                results[request_id] = (False, "Spot request not found.")
+
+        if action == "set_spot_request_pending":
+            targets = [request_id for request_id in ids if request_id in rows]
+            if targets:
+                cur.execute(
+                    f"""
+                    UPDATE spot_change_requests
+                    SET status='pending', admin_note=%s, reviewed_by=NULL, reviewed_at=NULL, updated_at=NOW()
+                    WHERE id IN ({_placeholders(targets)})
+                    """,
+                    (note or None,) + tuple(targets),
+                )
+            for request_id in targets:
+                results[request_id] = (True, f"Spot request #{request_id} set back to pending.")
+        else:
+            pending_rows = []
+            for request_id in ids:
+                row = rows.get(request_id)
+                if row is None:
+                    continue
+                if (row.get("status") or "").strip().lower() != "pending":
+                    results[request_id] = (
+                        False,
+                        f"Spot request #{request_id} is already {row.get('status') or 'processed'}.",
+                    )
+                    continue
+                pending_rows.append(row)
+
+            if action == "reject_spot_request":
+                targets = [int(row["id"]) for row in pending_rows]
+                if targets:
+                    cur.execute(
+                        f"""
+                        UPDATE spot_change_requests
+                        SET status='rejected', admin_note=%s, reviewed_by=%s, reviewed_at=NOW(), updated_at=NOW()
+                        WHERE id IN ({_placeholders(targets)})
+                        """,
+                        (note or None, admin_id) + tuple(targets),
+                    )
+                for request_id in targets:
+                    results[request_id] = (True, f"Spot request #{request_id} rejected.")
+            elif pending_rows:
+                approved_spot_ids = _apply_spot_approvals(cur, pending_rows, admin_id, note, results)
+
+        db.commit()
+        if action == "approve_spot_request":
+            invalidate_spatial_index("spots")
+            bump_data_version("spots")
+    except Exception as exc:
+        db.rollback()
+        verb = _SPOT_REVIEW_VERBS[action]
+        return [
+            {"id": request_id, "ok": False, "message": f"Failed to {verb} spot request #{request_id}: {exc}"}
+            for request_id in ids
+        ]
+    finally:
+        cur.close()
+        db.close()
+
+    if approved_spot_ids:
+        _queue_route_metrics(approved_spot_ids, admin_id)
+    return [{"id": request_id, "ok": results[request_id][0], "message": results[request_id][1]} for request_id in ids]
+
+
+def _review_users(user_ids, action, admin_id, note):
+    """Approve, reject or reset KYC for many users in one transaction.
+
+    Returns ``[{"id", "ok", "message"}]`` in request order.
+    """
+    ids = _unique_ids(user_ids)
+    if not ids or action not in _USER_REVIEW_ACTIONS:
+        return []
+    new_status, profile_set_sql = _USER_REVIEW_ACTIONS[action]
+
+    results = {}
+    db = get_db()
+    cur = db.cursor(dictionary=True)
+    try:
+        cur.execute(f"SELECT id FROM users WHERE id IN ({_placeholders(ids)}) FOR UPDATE", tuple(ids))
+        found = {int(row["id"]) for row in cur.fetchall()}
+        targets = []
+        for user_id in ids:
+            if user_id == admin_id:
+                results[user_id] = (False, "You cannot change your own account status.")
+            elif user_id not in found:
+                results[user_id] = (False, f"User #{user_id} not found.")
+            else:
+                targets.append(user_id)
+
+        if targets:
+            target_args = tuple(targets)
+            cur.execute(
+                f"UPDATE users SET status=%s WHERE id IN ({_placeholders(targets)})",
+                (new_status,) + target_args,
+            )
+            cur.execute(
+                f"UPDATE user_profiles SET {profile_set_sql} WHERE user_id IN ({_placeholders(targets)})",
+                (note or None,) + target_args,
+            )
+            cur.execute(
+                f"""
+                INSERT INTO user_approval_logs(user_id, admin_id, action_taken, note)
+                VALUES {", ".join(["(%s,%s,%s,%s)"] * len(targets))}
+                """,
+                tuple(value for user_id in targets for value in (user_id, admin_id, action, note or None)),
+            )
+            for user_id in targets:
+                results[user_id] = (True, f"User #{user_id} status updated to {new_status}.")
+
         db.commit()
-        return True, f"Spot request #{spot_request_id} approved."
     except Exception as exc:
         db.rollback()
-        return False, f"Failed to approve spot request #{spot_request_id}: {exc}"
+        return [
+            {"id": user_id, "ok": False, "message": f"Failed to update user #{user_id}: {exc}"}
+            for user_id in ids
+        ]
     finally:
         cur.close()
         db.close()
 
+    return [{"id": user_id, "ok": results[user_id][0], "message": results[user_id][1]} for user_id in ids]
+
+
+def _bulk_summary_message(results, noun):
+    succeeded = sum(1 for item in results if item["ok"])
+    message = f"{succeeded} of {len(results)} {noun} updated."
+    failures = [item["message"] for item in results if not item["ok"]]
+    if failures:
+        message += " " + " ".join(failures[:3])
+        if len(failures) > 3:
+            message += f" (+{len(failures) - 3} more)"
+    return message
+
+
+def _attach_required_documents(users):
+    for u in users:
+        required_docs = get_onboarding_document_requirements(u.get("role"), u.get("provider_category"))
+        uploaded_count = 0
+        docs = []
+        for doc in required_docs:
+            path = u.get(doc["field"])
+            is_uploaded = bool(path)
+            if is_uploaded:
+                uploaded_count += 1
+            docs.append(
+                {
+                    "field": doc["field"],
+                    "label": doc["label"],
+                    "path": path,
+                    "is_uploaded": is_uploaded,
+                }
+            )
+        u["required_documents"] = docs
+        u["required_doc_total"] = len(docs)
+        u["required_doc_uploaded"] = uploaded_count
+        u["required_docs_complete"] = uploaded_count == len(docs)
+
 
 def register_routes(app):
     @app.route("/admin", methods=["GET", "POST"])
@@ -135,329 +420,102 @@ def register_routes(app):
                 flash(f"Issue #{issue_id} marked as {next_status}.")
                 return redirect(url_for("admin"))
 
-            if spot_request_id and action in {"approve_spot_request", "reject_spot_request", "set_spot_request_pending"}:
-                request_row = query_db(
-                    "SELECT id, status FROM spot_change_requests WHERE id=%s",
-                    (spot_request_id,),
-                    one=True,
-                )
-                if not request_row:
-                    flash("Spot request not found.")
-                    return redirect(url_for("admin"))
-
-                if action == "approve_spot_request":
-                    ok, message = _approve_spot_request(spot_request_id, int(session["user_id"]), note)
-                    flash(message)
-                    return redirect(url_for("admin"))
-
-                if action == "reject_spot_request":
-                    execute_db(
-                        """
-                        UPDATE spot_change_requests
-                        SET status='rejected', admin_note=%s, reviewed_by=%s, reviewed_at=NOW(), updated_at=NOW()
-                        WHERE id=%s
-                        """,
-                        (note or None, int(session["user_id"]), spot_request_id),
-                    )
-                    flash(f"Spot request #{spot_request_id} rejected.")
-                    return redirect(url_for("admin"))
-
-                execute_db(
-                    """
-                    UPDATE spot_change_requests
-                    SET status='pending', admin_note=%s, reviewed_by=NULL, reviewed_at=NULL, updated_at=NOW()
-                    WHERE id=%s
-                    """,
-                    (note or None, spot_request_id),
-                )
-                flash(f"Spot request #{spot_request_id} set back to pending.")
+            if spot_request_id and action in _SPOT_REVIEW_VERBS:
+                results = _review_spot_requests([spot_request_id], action, int(session["user_id"]), note)
+                invalidate_admin_summary()
+                flash(results[0]["message"])
                 return redirect(url_for("admin"))
 
-            if user_id and action in {"approve", "reject", "set_pending"} and user_id != int(session["user_id"]):
-                new_status_map = {
-                    "approve": "approved",
-                    "reject": "rejected",
-                    "set_pending": "pending",
-                }
-                new_status = new_status_map[action]
-                execute_db("UPDATE users SET status=%s WHERE id=%s", (new_status, user_id))
-                if action == "approve":
-                    execute_db(
-                        """
-                        UPDATE user_profiles
-                        SET verification_badge=1, kyc_stage='verified', admin_note=%s, reviewed_at=NOW()
-                        WHERE user_id=%s
-                        """,
-                        (note or None, user_id),
-                    )
-                elif action == "reject":
-                    execute_db(
-                        """
-                        UPDATE user_profiles
-                        SET verification_badge=0, kyc_stage='rejected', admin_note=%s, reviewed_at=NOW()
-                        WHERE user_id=%s
-                        """,
-                        (note or None, user_id),
-                    )
-                else:
-                    execute_db(
-                        """
-                        UPDATE user_profiles
-                        SET verification_badge=0, kyc_stage='submitted_for_admin_approval', admin_note=%s
-                        WHERE user_id=%s
-                        """,
-                        (note or None, user_id),
-                    )
-                execute_db(
-                    """
-                    INSERT INTO user_approval_logs(user_id, admin_id, action_taken, note)
-                    VALUES(%s,%s,%s,%s)
-                    """,
-                    (user_id, int(session["user_id"]), action, note or None),
-                )
-                flash(f"User status updated to {new_status}.")
+            if user_id and action in _USER_REVIEW_ACTIONS:
+                results = _review_users([user_id], action, int(session["user_id"]), note)
+                invalidate_admin_summary()
+                flash(results[0]["message"])
                 return redirect(url_for("admin"))
 
             flash("Invalid admin action.")
             return redirect(url_for("admin"))
 
-        pending_users = query_db(
-            """
-            SELECT
-                u.id, u.full_name, u.email, u.phone, u.role, u.status, u.document_path,
-                up.requested_role, up.business_name, up.provider_category,
-                up.kyc_completed, up.kyc_stage, up.verification_badge, up.admin_note,
-                up.identity_proof_path, up.business_proof_path, up.property_proof_path,
-                up.vehicle_proof_path, up.driver_verification_path, up.bank_proof_path,
-                up.address_proof_path, up.operational_photo_path
-            FROM users u
-            LEFT JOIN user_profiles up ON up.user_id = u.id
-            WHERE u.status='pending'
-            ORDER BY u.id DESC
-            """
-        )
-        for u in pending_users:
-            required_docs = get_onboarding_document_requirements(u.get("role"), u.get("provider_category"))
-            uploaded_count = 0
-            docs = []
-            for doc in required_docs:
-                path = u.get(doc["field"])
-                is_uploaded = bool(path)
-                if is_uploaded:
-                    uploaded_count += 1
-                docs.append(
-                    {
-                        "field": doc["field"],
-                        "label": doc["label"],
-                        "path": path,
-                        "is_uploaded": is_uploaded,
-                    }
-                )
-            u["required_documents"] = docs
-            u["required_doc_total"] = len(docs)
-            u["required_doc_uploaded"] = uploaded_count
-            u["required_docs_complete"] = uploaded_count == len(docs)
-
-        pending_spot_requests = query_db(
-            """
-            SELECT
-                r.id,
-                r.organizer_id,
-                r.request_type,
-                r.status,
-                r.spot_id,
-                r.city_id,
-                r.spot_name,
-                r.image_url,
-                r.photo_source,
-                r.latitude,
-                r.longitude,
-                r.spot_details,
-                r.admin_note,
-                r.created_at,
-                u.full_name AS organizer_name,
-                u.email AS organizer_email,
-                c.city_name,
-                s.state_name,
-                ms.spot_name AS current_spot_name,
-                ms.image_url AS current_image_url,
-                ms.photo_source AS current_photo_source
-            FROM spot_change_requests r
-            JOIN users u ON u.id=r.organizer_id
-            LEFT JOIN cities c ON c.id=r.city_id
-            LEFT JOIN states s ON s.id=c.state_id
-            LEFT JOIN master_spots ms ON ms.id=r.spot_id
-            WHERE r.status='pending'
-            ORDER BY r.id DESC
-            LIMIT 200
-            """
-        )
+        pages = {}
+        for table_key in ADMIN_TABLES:
+            page = fetch_admin_page(table_key, table_args(request.args, table_key))
+            page["first_args"] = page_link_args(page)
+            page["next_args"] = page_link_args(page, page["next_cursor"])
+            pages[table_key] = page
+        _attach_required_documents(pages["pending_users"]["rows"])
 
-        approval_logs = query_db(
-            """
-            SELECT
-                l.created_at, l.action_taken, l.note,
-                u.full_name AS target_user_name,
-                a.full_name AS admin_name
-            FROM user_approval_logs l
-            JOIN users u ON u.id=l.user_id
-            JOIN users a ON a.id=l.admin_id
-            ORDER BY l.id DESC
-            LIMIT 30
-            """
+        return render_template(
+            "admin_approvals.html",
+            summary=get_admin_summary(),
+            pages=pages,
         )
 
-        stats_row = query_db(
-            """
-            SELECT
-                COUNT(*) AS total_users,
-                SUM(CASE WHEN role='customer' THEN 1 ELSE 0 END) AS total_travelers,
-                SUM(CASE WHEN role='organizer' THEN 1 ELSE 0 END) AS total_organizers,
-                SUM(CASE WHEN role='hotel_provider' THEN 1 ELSE 0 END) AS total_providers,
-                SUM(CASE WHEN role='admin' THEN 1 ELSE 0 END) AS total_admins,
-                SUM(CASE WHEN status='pending' THEN 1 ELSE 0 END) AS pending_approvals
-            FROM users
-            """,
-            one=True,
-        )
-        tour_stats = query_db(
-            """
-            SELECT
-                COUNT(*) AS total_tours,
-                SUM(CASE WHEN start_date > CURDATE() THEN 1 ELSE 0 END) AS upcoming_tours,
-                SUM(CASE WHEN start_date <= CURDATE() AND end_date >= CURDATE() THEN 1 ELSE 0 END) AS current_tours,
-                SUM(CASE WHEN end_date < CURDATE() THEN 1 ELSE 0 END) AS completed_tours,
-                COALESCE(MIN(start_date), NULL) AS nearest_tour_date
-            FROM tours
-            """,
-            one=True,
-        )
-        booking_stats = query_db(
-            """
-            SELECT
-                COUNT(*) AS total_bookings,
-                SUM(CASE WHEN status='paid' THEN 1 ELSE 0 END) AS paid_bookings,
-                SUM(CASE WHEN status='pending' THEN 1 ELSE 0 END) AS pending_bookings
-            FROM bookings
-            """,
-            one=True,
-        )
-        service_stats = query_db(
-            """
-            SELECT COUNT(*) AS total_services
-            FROM services
-            """,
-            one=True,
-        )
-        payment_stats = query_db(
-            """
-            SELECT
-                COALESCE(SUM(amount), 0) AS total_revenue,
-                COALESCE(SUM(admin_commission), 0) AS total_admin_commission,
-                COUNT(*) AS total_payments
-            FROM payments
-            WHERE paid=1
-            """,
-            one=True,
-        )
+    @app.route("/admin/bulk/<kind>", methods=["POST"])
+    @login_required
+    @role_required("admin")
+    def admin_bulk_review(kind):
+        payload = request.get_json(silent=True) if request.is_json else None
+        if payload is not None and not isinstance(payload, dict):
+            return jsonify({"error": "Expected a JSON object with ids and action."}), 400
+        if payload is not None:
+            raw_ids = payload.get("ids") or []
+            action = (payload.get("action") or "").strip()
+            note = (payload.get("note") or "").strip()
+        else:
+            raw_ids = request.form.getlist("ids")
+            action = (request.form.get("action") or "").strip()
+            note = (request.form.get("note") or "").strip()
 
-        all_users = query_db(
-            """
-            SELECT
-                u.id, u.full_name, u.email, u.phone, u.role, u.status,
-                up.provider_category, up.business_name, up.kyc_stage, up.verification_badge
-            FROM users u
-            LEFT JOIN user_profiles up ON up.user_id=u.id
-            ORDER BY u.id DESC
-            """
-        )
-        all_tours = query_db(
-            """
-            SELECT
-                id, title, start_point, end_point, start_date, end_date, price,
-                CASE
-                    WHEN start_date > CURDATE() THEN 'upcoming'
-                    WHEN start_date <= CURDATE() AND end_date >= CURDATE() THEN 'current'
-                    WHEN end_date < CURDATE() THEN 'completed'
-                    ELSE 'unknown'
-                END AS lifecycle_status
-            FROM tours
-            ORDER BY id DESC
-            """
-        )
-        all_services = query_db(
-            """
-            SELECT
-                s.id, s.service_name, s.service_type, s.price,
-                u.full_name AS provider_name, c.city_name
-            FROM services s
-            LEFT JOIN users u ON u.id=s.provider_id
-            LEFT JOIN cities c ON c.id=s.city_id
-            ORDER BY s.id DESC
-            """
-        )
-        recent_bookings = query_db(
-            """
-            SELECT
-                b.id, b.date, b.status, u.full_name, t.title
-            FROM bookings b
-            JOIN users u ON u.id=b.user_id
-            JOIN tours t ON t.id=b.tour_id
-            ORDER BY b.id DESC
-            LIMIT 20
-            """
-        )
-        all_reviews = query_db(
-            """
-            SELECT
-                r.id,
-                r.target_type,
-                r.target_id,
-                r.rating,
-                r.review_text,
-                r.created_at,
-                u.full_name AS user_name,
-                u.role AS user_role
-            FROM platform_reviews r
-            JOIN users u ON u.id=r.user_id
-            ORDER BY r.id DESC
-            LIMIT 100
-            """
-        )
-        all_issues = query_db(
-            """
-            SELECT
-                s.id,
-                s.user_id,
-                s.user_role,
-                s.subject,
-                s.issue_text,
-                s.status,
-                s.admin_note,
-                s.created_at,
-                s.updated_at,
-                u.full_name AS user_name
-            FROM support_issues s
-            JOIN users u ON u.id=s.user_id
-            ORDER BY s.id DESC
-            LIMIT 100
-            """
-        )
+        error = None
+        if len(note) > 255:
+            error = "Admin note must be 255 characters or less."
+        elif not isinstance(raw_ids, list) or not _unique_ids(raw_ids):
+            error = "Select at least one item."
+        elif len(raw_ids) > BULK_REVIEW_MAX_IDS:
+            error = f"Select at most {BULK_REVIEW_MAX_IDS} items per bulk action."
 
-        return render_template(
-            "admin_approvals.html",
-            pending_users=pending_users,
-            stats=stats_row,
-            tour_stats=tour_stats,
-            booking_stats=booking_stats,
-            service_stats=service_stats,
-            payment_stats=payment_stats,
-            all_users=all_users,
-            all_tours=all_tours,
-            all_services=all_services,
-            recent_bookings=recent_bookings,
-            approval_logs=approval_logs,
-            pending_spot_requests=pending_spot_requests,
-            all_reviews=all_reviews,
-            all_issues=all_issues,
-        )
+        results = []
+        if error is None:
+            if kind == "spot-requests" and action in _SPOT_REVIEW_VERBS:
+                results = _review_spot_requests(raw_ids, action, int(session["user_id"]), note)
+                noun = "spot requests"
+            elif kind == "users" and action in _USER_REVIEW_ACTIONS:
+                results = _review_users(raw_ids, action, int(session["user_id"]), note)
+                noun = "users"
+            else:
+                error = "Invalid bulk action."
+
+        if error is not None:
+            if payload is not None:
+                return jsonify({"error": error}), 400
+            flash(error)
+            return redirect(url_for("admin", section="approvals"))
+
+        invalidate_admin_summary()
+        if payload is not None:
+            return jsonify(
+                {
+                    "action": action,
+                    "succeeded": sum(1 for item in results if item["ok"]),
+                    "failed": sum(1 for item in results if not item["ok"]),
+                    "results": results,
+                }
+            )
+        flash(_bulk_summary_message(results, noun))
+        return redirect(url_for("admin", section="approvals"))
+
+    @app.route("/admin/api/tables/<table_key>")
+    @login_required
+    @role_required("admin")
+    def admin_table_api(table_key):
+        if table_key not in ADMIN_TABLES:
+            return jsonify({"error": "Unknown admin table."}), 404
+        page = fetch_admin_page(table_key, request.args.to_dict())
+        if table_key == "pending_users":
+            _attach_required_documents(page["rows"])
+        return jsonify(page)
+
+    @app.route("/admin/api/summary")
+    @login_required
+    @role_required("admin")
+    def admin_summary_api():
+        return jsonify(get_admin_summary())
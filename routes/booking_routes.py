@@ -4,7 +4,6 @@ import base64
 import hashlib
 import hmac
 import json
-import math
 import os
 from urllib import request as urlrequest
 from urllib.error import URLError, HTTPError
@@ -14,18 +13,11 @@ from flask import abort, flash, redirect, render_template, request, session, url
 from core.auth import login_required
 from core.config import RAZORPAY_KEY_ID, RAZORPAY_KEY_SECRET
 from core.db import execute_db, get_db, query_db
-from core.helpers import is_within_india_bounds, parse_date, save_upload, to_int
-
-
-def _haversine_km(lat1, lon1, lat2, lon2):
-    radius_km = 6371.0
-    phi1 = math.radians(float(lat1))
-    phi2 = math.radians(float(lat2))
-    dphi = math.radians(float(lat2) - float(lat1))
-    dlambda = math.radians(float(lon2) - float(lon1))
-    a = (math.sin(dphi / 2) ** 2) + math.cos(phi1) * math.cos(phi2) * (math.sin(dlambda / 2) ** 2)
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-    return radius_km * c
+from core.geo import validate_points
+from core.helpers import parse_date, save_upload, to_int
+from core.rollups import refresh_tour_rollup
+from core.route_metrics import route_metrics_for
+from core.templating import bump_data_version
 
 
 ID_PROOF_TYPES = [
@@ -79,7 +71,9 @@ def register_routes(app):
 
         itinerary = query_db(
             """
-            SELECT ti.day_number, ms.spot_name, ms.image_url, ms.photo_source, ms.latitude, ms.longitude
+            SELECT
+                ti.id AS itinerary_id, ti.day_number,
+                ms.spot_name, ms.image_url, ms.photo_source, ms.latitude, ms.longitude
             FROM tour_itinerary ti
             JOIN master_spots ms ON ms.id=ti.spot_id
             WHERE ti.tour_id=%s
@@ -108,29 +102,14 @@ def register_routes(app):
             )
         except Exception:
             city_schedules = []
-        total_distance_km = 0.0
-        prev_lat = None
-        prev_lng = None
+        route_metrics = route_metrics_for(tour_id, itinerary)
         for item in itinerary:
-            lat = item.get("latitude")
-            lng = item.get("longitude")
-            if not is_within_india_bounds(lat, lng):
-                lat = None
-                lng = None
+            leg = route_metrics["legs"].get(str(item.get("itinerary_id"))) or {}
+            if not leg.get("in_india"):
                 item["latitude"] = None
                 item["longitude"] = None
-            leg_km = None
-            if lat is not None and lng is not None and prev_lat is not None and prev_lng is not None:
-                try:
-                    leg_km = _haversine_km(prev_lat, prev_lng, lat, lng)
-                    total_distance_km += leg_km
-                except (TypeError, ValueError):
-                    leg_km = None
-            item["leg_distance_km"] = round(leg_km, 1) if leg_km is not None else None
-            if lat is not None and lng is not None:
-                prev_lat = lat
-                prev_lng = lng
-        total_distance_km = round(total_distance_km, 1)
+            item["leg_distance_km"] = leg.get("leg_km")
+        total_distance_km = route_metrics["total_distance_km"]
         current_user_id = session.get("user_id")
         existing = None
         if current_user_id:
@@ -261,11 +240,12 @@ def register_routes(app):
 
         linked_hotels = []
         hotel_map = {}
-        for hotel in linked_hotel_rows:
+        hotel_valid = validate_points((hotel.get("latitude"), hotel.get("longitude")) for hotel in linked_hotel_rows)
+        for hotel, in_india in zip(linked_hotel_rows, hotel_valid):
             sid = to_int(hotel.get("service_id"), 0)
             if sid <= 0:
                 continue
-            if not is_within_india_bounds(hotel.get("latitude"), hotel.get("longitude")):
+            if not in_india:
                 hotel["latitude"] = None
                 hotel["longitude"] = None
             if sid not in stays_by_hotel and tour_start and fallback_check_out and fallback_check_out > tour_start:
@@ -692,6 +672,7 @@ def register_routes(app):
                         room_note_to_store,
                     ),
                 )
+            refresh_tour_rollup(tour_id)
 
             try:
                 execute_db("DELETE FROM booking_travelers WHERE booking_id=%s", (booking_id,))
@@ -719,6 +700,7 @@ def register_routes(app):
             if max_group_size:
                 next_status = "full" if projected_booked >= max_group_size else "open"
                 execute_db("UPDATE tours SET tour_status=%s WHERE id=%s", (next_status, tour_id))
+                bump_data_version("tours")
             return redirect(url_for("payment", booking_id=booking_id))
 
         max_group_size = to_int(tour.get("max_group_size"), 0)
@@ -934,6 +916,7 @@ def register_routes(app):
                     (booking_id, amount_to_pay, admin_commission, organizer_earning, payment_provider),
                 )
             execute_db("UPDATE bookings SET status='paid' WHERE id=%s", (booking_id,))
+            refresh_tour_rollup(booking.get("tour_id"))
             flash("Payment successful. Your booking is confirmed.")
             return redirect(url_for("invoice", booking_id=booking_id))
 
@@ -0,0 +1,44 @@
+from flask import jsonify, session
+
+from core.auth import login_required
+from core.jobs import JOB_FINAL_STATUSES, get_job, list_user_jobs
+
+
+def _job_payload(job):
+    total = job.get("progress_total")
+    done = job.get("progress_done") or 0
+    percent = None
+    if total:
+        percent = min(100, int(done * 100 / total))
+    elif job.get("status") == "succeeded":
+        percent = 100
+    return {
+        "id": job["id"],
+        "job_type": job["job_type"],
+        "status": job["status"],
+        "done": job.get("status") in JOB_FINAL_STATUSES,
+        "progress_done": done,
+        "progress_total": total,
+        "progress_percent": percent,
+        "progress_message": job.get("progress_message"),
+        "error_message": job.get("error_message"),
+        "result": job.get("result"),
+        "created_at": job.get("created_at"),
+        "finished_at": job.get("finished_at"),
+    }
+
+
+def register_routes(app):
+    @app.route("/jobs")
+    @login_required
+    def my_jobs():
+        jobs = list_user_jobs(session["user_id"])
+        return jsonify({"jobs": [_job_payload(job) for job in jobs]})
+
+    @app.route("/jobs/<int:job_id>")
+    @login_required
+    def job_status(job_id):
+        job = get_job(job_id)
+        if not job or (job.get("created_by") != session["user_id"] and session.get("role") != "admin"):
+            return jsonify({"error": "Job not found."}), 404
+        return jsonify(_job_payload(job))
@@ -0,0 +1,28 @@
+import hmac
+
+from flask import Response, abort, request
+
+from core.config import METRICS_TOKEN
+from core.metrics import render_metrics
+
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _metrics_token():
+    header = request.headers.get("Authorization") or ""
+    if header.lower().startswith("bearer "):
+        return header[7:].strip()
+    return request.args.get("token") or ""
+
+
+def register_routes(app):
+    @app.route("/metrics")
+    def metrics():
+        if not METRICS_TOKEN:
+            abort(404)
+        if not hmac.compare_digest(_metrics_token().encode(), METRICS_TOKEN.encode()):
+            return Response("Forbidden\n", status=403, mimetype="text/plain")
+        response = Response(render_metrics(), content_type=PROMETHEUS_CONTENT_TYPE)
+        response.headers["Cache-Control"] = "no-store"
+        return response
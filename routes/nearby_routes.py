@@ -0,0 +1,63 @@
+from flask import jsonify, request
+
+from core.config import NEARBY_MAX_RADIUS_KM, NEARBY_MAX_RESULTS
+from core.db import query_db
+from core.helpers import to_int
+from core.spatial import nearby
+
+
+NEARBY_KINDS = ("spots", "hotels")
+DEFAULT_NEARBY_RADIUS_KM = 25.0
+
+
+def _float_arg(name):
+    try:
+        return float(request.args.get(name))
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_nearby_args():
+    """Return ``(lat, lng, radius_km, limit, spot_id, error)`` from the query string.
+
+    ``spot_id`` may replace ``lat``/``lng`` to search around a spot.
+    """
+    spot_id = to_int(request.args.get("spot_id"), 0)
+    lat = _float_arg("lat")
+    lng = _float_arg("lng")
+    if spot_id > 0 and (lat is None or lng is None):
+        spot = query_db("SELECT latitude, longitude FROM master_spots WHERE id=%s", (spot_id,), one=True)
+        if not spot:
+            return None, None, None, None, spot_id, "Spot not found."
+        if spot.get("latitude") is None or spot.get("longitude") is None:
+            return None, None, None, None, spot_id, "Spot has no coordinates."
+        lat = float(spot["latitude"])
+        lng = float(spot["longitude"])
+    if lat is None or lng is None or not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        return None, None, None, None, spot_id, "Valid lat and lng (or spot_id) are required."
+
+    radius_km = _float_arg("radius_km")
+    if radius_km is None:
+        radius_km = DEFAULT_NEARBY_RADIUS_KM
+    if not 0 < radius_km <= NEARBY_MAX_RADIUS_KM:
+        return None, None, None, None, spot_id, f"radius_km must be between 0 and {NEARBY_MAX_RADIUS_KM:g}."
+    limit = min(max(to_int(request.args.get("limit"), NEARBY_MAX_RESULTS), 1), NEARBY_MAX_RESULTS)
+    return lat, lng, radius_km, limit, spot_id, None
+
+
+def register_routes(app):
+    @app.route("/api/nearby")
+    def nearby_api():
+        lat, lng, radius_km, limit, spot_id, error = parse_nearby_args()
+        if error:
+            return jsonify({"error": error}), 400
+        kind = (request.args.get("kind") or "all").strip().lower()
+        if kind != "all" and kind not in NEARBY_KINDS:
+            return jsonify({"error": "kind must be spots, hotels or all."}), 400
+
+        payload = {"lat": lat, "lng": lng, "radius_km": radius_km}
+        for source in NEARBY_KINDS:
+            if kind in ("all", source):
+                exclude_id = spot_id if source == "spots" and spot_id > 0 else None
+                payload[source] = nearby(source, lat, lng, radius_km, limit=limit, exclude_id=exclude_id)
+        return jsonify(payload)
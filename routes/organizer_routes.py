@@ -1,5 +1,3 @@
-import csv
-import io
 import os
 from datetime import datetime
 from decimal import Decimal, InvalidOperation
@@ -7,6 +5,7 @@ from decimal import Decimal, InvalidOperation
 from flask import flash, jsonify, redirect, render_template, request, session, url_for
 
 from core.auth import login_required, role_required
+from core.config import ITINERARY_OPTIMIZE_MAX_STOPS
 from core.db import execute_db, get_db, query_db
 from core.helpers import (
     is_allowed_image_filename,
@@ -15,6 +14,13 @@ from core.helpers import (
     save_upload,
     to_int,
 )
+from core.itinerary_optimizer import optimise_itinerary
+from core.jobs import enqueue_job, list_user_jobs
+from core.rollups import ROLLUP_COUNTER_FIELDS, load_organizer_rollups, refresh_tour_rollup
+from core.route_metrics import refresh_tour_route_metric
+from core.spatial import nearby
+from core.templating import bump_data_version
+from routes.nearby_routes import parse_nearby_args
 
 
 def _parse_datetime_local(value):
@@ -29,30 +35,6 @@ def _parse_datetime_local(value):
     return None
 
 
-def _normalize_local_spot_image(image_value, upload_folder, spot_folder):
-    text = (image_value or "").strip()
-    if not text:
-        return ""
-    if text.lower().startswith(("http://", "https://")):
-        return text
-
-    normalized = text.replace("\\", "/").lstrip("/")
-    if normalized.lower().startswith("static/uploads/"):
-        normalized = normalized[len("static/uploads/") :]
-    elif normalized.lower().startswith("uploads/"):
-        normalized = normalized[len("uploads/") :]
-
-    if "/" not in normalized and normalized.lower() != "demo.jpg":
-        spot_path = os.path.join(spot_folder, normalized)
-        upload_path = os.path.join(upload_folder, normalized)
-        if os.path.isfile(spot_path):
-            return f"spots/{normalized}"
-        if os.path.isfile(upload_path):
-            return normalized
-
-    return normalized
-
-
 def register_routes(app):
     @app.route("/organizer", methods=["GET", "POST"])
     @login_required
@@ -73,6 +55,7 @@ def register_routes(app):
                         "INSERT INTO cities(state_id, city_name) VALUES(%s,%s)",
                         (state_id, city_name),
                     )
+                    bump_data_version("geo")
                     flash("City added.")
                 else:
                     flash("Invalid city details.")
@@ -112,7 +95,7 @@ def register_routes(app):
                 if city_id and spot_name:
                     image_name = None
                     if image_file and image_file.filename:
-                        image_name = save_upload(image_file, app.config["SPOT_UPLOAD_FOLDER"])
+                        image_name = save_upload(image_file, app.config["SPOT_UPLOAD_FOLDER"], make_derivatives=True)
                         if not image_name:
                             flash("Unable to upload spot image.")
                             return redirect(url_for("organizer_dashboard"))
@@ -153,140 +136,23 @@ def register_routes(app):
                         flash("Invalid default city selected.")
                         return redirect(url_for("organizer_dashboard"))
 
-                try:
-                    text_stream = io.TextIOWrapper(csv_file.stream, encoding="utf-8-sig")
-                    reader = csv.DictReader(text_stream)
-                except Exception:
+                # Parsing and upserting run in a background worker; the request
+                # only stores the file and returns the job id.
+                csv_name = save_upload(csv_file, app.config["JOB_UPLOAD_FOLDER"], content_addressed=False)
+                if not csv_name:
                     flash("Unable to read CSV file.")
                     return redirect(url_for("organizer_dashboard"))
-
-                db = get_db()
-                cur = db.cursor(dictionary=True)
-                inserted = 0
-                updated = 0
-                skipped = 0
-
-                states = query_db("SELECT id, state_name FROM states")
-                state_map = {str(s["id"]): s["id"] for s in states}
-                state_map.update({(s["state_name"] or "").strip().lower(): s["id"] for s in states})
-
-                cities = query_db("SELECT id, state_id, city_name FROM cities")
-                city_key_map = {}
-                city_id_map = {}
-                for c in cities:
-                    city_id_map[str(c["id"])] = c["id"]
-                    city_key = ((c["city_name"] or "").strip().lower(), int(c["state_id"] or 0))
-                    city_key_map[city_key] = c["id"]
-
-                def resolve_state_id(raw_state):
-                    from core.helpers import normalize_state_name
-                    if not raw_state:
-                        return 0
-                    cleaned = normalize_state_name(raw_state)
-                    return int(state_map.get(cleaned.strip().lower()) or state_map.get(str(cleaned)) or 0)
-
-                def resolve_city_id(raw_city_id, raw_city_name, raw_state):
-                    if raw_city_id and str(raw_city_id).isdigit():
-                        cid = city_id_map.get(str(int(raw_city_id)))
-                        if cid:
-                            return cid
-                    if raw_city_name:
-                        state_resolved = resolve_state_id(raw_state)
-                        key = ((raw_city_name or "").strip().lower(), state_resolved)
-                        cid = city_key_map.get(key)
-                        if cid:
-                            return cid
-                        if state_resolved:
-                            cur.execute(
-                                "INSERT INTO cities(state_id, city_name) VALUES(%s,%s)",
-                                (state_resolved, raw_city_name.strip()),
-                            )
-                            cid = cur.lastrowid
-                            city_id_map[str(cid)] = cid
-                            city_key_map[((raw_city_name or "").strip().lower(), state_resolved)] = cid
-                            return cid
-                    return default_city_id if default_city_id else 0
-
-                def csv_value(row_data, *keys):
-                    for key in keys:
-                        value = row_data.get(key)
-                        if value is None:
-                            continue
-                        text = str(value).strip()
-                        if text:
-                            return text
-                    return ""
-
-                for row in reader:
-                    spot_name = csv_value(row, "spot_name", "spot", "place_name")
-                    if not spot_name:
-                        skipped += 1
-                        continue
-
-                    raw_city_id = csv_value(row, "city_id")
-                    raw_city_name = csv_value(row, "city_name", "city")
-                    raw_state = csv_value(row, "state_name", "state_id", "state")
-                    city_id = resolve_city_id(
-                        raw_city_id,
-                        raw_city_name,
-                        raw_state,
-                    )
-                    if not city_id:
-                        skipped += 1
-                        continue
-
-                    image_url = (
-                        csv_value(
-                            row,
-                            "image_file",
-                            "image_url",
-                            "image",
-                            "images",
-                            "photo",
-                            "photo_url",
-                            "img",
-                        )
-                        or "demo.jpg"
-                    )
-                    image_url = _normalize_local_spot_image(
-                        image_url,
-                        app.config["UPLOAD_FOLDER"],
-                        app.config["SPOT_UPLOAD_FOLDER"],
-                    )
-                    photo_source = "external_url" if image_url.lower().startswith(("http://", "https://")) else "local_file"
-                    spot_details = (
-                        csv_value(row, "spot_details", "details", "description", "spot_description", "about") or None
-                    )
-
-                    cur.execute(
-                        "SELECT id FROM master_spots WHERE city_id=%s AND spot_name=%s LIMIT 1",
-                        (city_id, spot_name),
-                    )
-                    existing = cur.fetchone()
-                    if existing:
-                        cur.execute(
-                            """
-                            UPDATE master_spots
-                            SET image_url=%s, photo_source=%s, spot_details=%s
-                            WHERE id=%s
-                            """,
-                            (image_url, photo_source, spot_details, existing["id"]),
-                        )
-                        updated += 1
-                    else:
-                        cur.execute(
-                            """
-                            INSERT INTO master_spots(spot_name,image_url,photo_source,city_id,spot_details)
-                            VALUES(%s,%s,%s,%s,%s)
-                            """,
-                            (spot_name, image_url, photo_source, city_id, spot_details),
-                        )
-                        inserted += 1
-
-                db.commit()
-                cur.close()
-                db.close()
-                flash(f"CSV import completed. Inserted: {inserted}, Updated: {updated}, Skipped: {skipped}")
+                job_id = enqueue_job(
+                    "spot_csv_import",
+                    {
+                        "csv_path": os.path.abspath(os.path.join(app.config["JOB_UPLOAD_FOLDER"], csv_name)),
+                        "default_city_id": default_city_id,
+                        "upload_folder": os.path.abspath(app.config["UPLOAD_FOLDER"]),
+                        "spot_folder": os.path.abspath(app.config["SPOT_UPLOAD_FOLDER"]),
+                    },
+                    created_by=session["user_id"],
+                )
+                flash(f"CSV import queued as job #{job_id}. Progress is shown in the Bulk Import section.")
 
             elif action == "update_spot_image":
                 spot_id = to_int(request.form.get("spot_id"), 0)
@@ -312,7 +178,7 @@ def register_routes(app):
                     if not is_allowed_image_filename(image_file.filename):
                         flash("Spot image must be a JPG, JPEG, PNG, or WEBP file.")
                         return redirect(url_for("organizer_dashboard"))
-                    image_name = save_upload(image_file, app.config["SPOT_UPLOAD_FOLDER"])
+                    image_name = save_upload(image_file, app.config["SPOT_UPLOAD_FOLDER"], make_derivatives=True)
                     if not image_name:
                         flash("Unable to upload spot image file.")
                         return redirect(url_for("organizer_dashboard"))
@@ -401,6 +267,7 @@ def register_routes(app):
                         notes or None,
                     ),
                 )
+                refresh_tour_rollup(tour_id)
 
                 total_booked_row = query_db(
                     """
@@ -432,6 +299,7 @@ def register_routes(app):
                         "UPDATE tours SET tour_status=%s WHERE id=%s AND organizer_id=%s",
                         (next_status, tour_id, session["user_id"]),
                     )
+                    bump_data_version("tours")
 
                 flash("Manual booking saved and analytics updated.")
 
@@ -454,7 +322,7 @@ def register_routes(app):
                 if image_file and image_file.filename and not is_allowed_image_filename(image_file.filename):
                     flash("Tour image must be a JPG, JPEG, PNG, or WEBP file.")
                     return redirect(url_for("organizer_dashboard"))
-                image_name = save_upload(image_file, app.config["UPLOAD_FOLDER"])
+                image_name = save_upload(image_file, app.config["UPLOAD_FOLDER"], make_derivatives=True)
                 if not image_name:
                     flash("Please upload a valid image file to update the tour.")
                     return redirect(url_for("organizer_dashboard"))
@@ -463,6 +331,7 @@ def register_routes(app):
                     "UPDATE tours SET image_path=%s WHERE id=%s AND organizer_id=%s",
                     (image_name, tour_id, session["user_id"]),
                 )
+                bump_data_version("tours")
                 flash("Tour image updated successfully.")
 
             elif action == "add_tour":
@@ -498,7 +367,7 @@ def register_routes(app):
                 if not is_allowed_image_filename(tour_image_file.filename):
                     flash("Tour image must be a JPG, JPEG, PNG, or WEBP file.")
                     return redirect(url_for("organizer_dashboard"))
-                image_name = save_upload(tour_image_file, app.config["UPLOAD_FOLDER"])
+                image_name = save_upload(tour_image_file, app.config["UPLOAD_FOLDER"], make_derivatives=True)
                 if not image_name:
                     flash("Unable to save main tour image. Please upload a valid file.")
                     return redirect(url_for("organizer_dashboard"))
@@ -797,9 +666,11 @@ def register_routes(app):
                         (tour_id, sid),
                     )
 
+                bump_data_version("tours", cur=cur)
                 db.commit()
                 cur.close()
                 db.close()
+                refresh_tour_route_metric(tour_id)
                 flash("Tour published with day-wise itinerary.")
 
             elif action == "update_tour_status":
@@ -812,6 +683,7 @@ def register_routes(app):
                     "UPDATE tours SET tour_status=%s WHERE id=%s AND organizer_id=%s",
                     (new_status, tour_id, session["user_id"]),
                 )
+                bump_data_version("tours")
                 flash("Tour status updated.")
 
             return redirect(url_for("organizer_dashboard"))
@@ -823,16 +695,7 @@ def register_routes(app):
                 pc.city_name AS pickup_city_name,
                 ps.state_name AS pickup_state_name,
                 dc.city_name AS drop_city_name,
-                ds.state_name AS drop_state_name,
-                (
-                    SELECT COALESCE(SUM(b.pax_count), 0)
-                    FROM bookings b
-                    WHERE b.tour_id=t.id AND b.status IN ('pending', 'paid')
-                ) + (
-                    SELECT COALESCE(SUM(eb.pax_count), 0)
-                    FROM organizer_external_bookings eb
-                    WHERE eb.tour_id=t.id
-                ) AS booked_pax
+                ds.state_name AS drop_state_name
             FROM tours t
             LEFT JOIN cities pc ON pc.id=t.pickup_city_id
             LEFT JOIN states ps ON ps.id=t.pickup_state_id
@@ -843,17 +706,6 @@ def register_routes(app):
             """,
             (session["user_id"],),
         )
-        bookings = query_db(
-            """
-            SELECT b.*, u.full_name, t.title
-            FROM bookings b
-            JOIN users u ON u.id=b.user_id
-            JOIN tours t ON t.id=b.tour_id
-            WHERE t.organizer_id=%s
-            ORDER BY b.id DESC
-            """,
-            (session["user_id"],),
-        )
         joined_travelers = query_db(
             """
             SELECT
@@ -1005,116 +857,30 @@ def register_routes(app):
             ORDER BY s.state_name, c.city_name, svc.service_name
             """
         )
-        payment_profit_rows = query_db(
-            """
-            SELECT
-                t.id AS tour_id,
-                COALESCE(SUM(p.organizer_earning), 0) AS organizer_profit,
-                COALESCE(SUM(p.admin_commission), 0) AS admin_commission
-            FROM payments p
-            JOIN bookings b ON b.id=p.booking_id
-            JOIN tours t ON t.id=b.tour_id
-            WHERE p.paid=1 AND t.organizer_id=%s
-            GROUP BY t.id
-            """,
-            (session["user_id"],),
-        )
-        external_profit_rows = query_db(
-            """
-            SELECT
-                eb.tour_id,
-                COALESCE(SUM(eb.organizer_earning), 0) AS organizer_profit,
-                COALESCE(SUM(eb.admin_commission), 0) AS admin_commission
-            FROM organizer_external_bookings eb
-            WHERE eb.organizer_id=%s
-            GROUP BY eb.tour_id
-            """,
-            (session["user_id"],),
-        )
-        profit_by_tour = {}
-        for row in payment_profit_rows:
-            tid = to_int(row.get("tour_id"), 0)
-            if tid <= 0:
-                continue
-            profit_by_tour[tid] = {
-                "organizer_profit": Decimal(str(row.get("organizer_profit") or 0)),
-                "admin_commission": Decimal(str(row.get("admin_commission") or 0)),
-            }
-        for row in external_profit_rows:
-            tid = to_int(row.get("tour_id"), 0)
-            if tid <= 0:
-                continue
-            current = profit_by_tour.setdefault(
-                tid,
-                {"organizer_profit": Decimal("0.00"), "admin_commission": Decimal("0.00")},
-            )
-            current["organizer_profit"] += Decimal(str(row.get("organizer_profit") or 0))
-            current["admin_commission"] += Decimal(str(row.get("admin_commission") or 0))
+        rollups_by_tour = load_organizer_rollups(session["user_id"])
 
         total_profit = Decimal("0.00")
         total_admin_commission = Decimal("0.00")
-        booking_stats_by_tour = {}
-        for t in tours:
-            tid = to_int(t.get("id"), 0)
-            if tid <= 0:
-                continue
-            booking_stats_by_tour[tid] = {
-                "internal_booking_count": 0,
-                "internal_pax": 0,
-                "paid_booking_count": 0,
-                "paid_pax": 0,
-                "external_booking_count": 0,
-                "external_pax": 0,
-            }
-
-        for b in bookings:
-            tid = to_int(b.get("tour_id"), 0)
-            if tid not in booking_stats_by_tour:
-                continue
-            pax = max(0, to_int(b.get("pax_count"), 0))
-            status = (b.get("status") or "").strip().lower()
-            stats = booking_stats_by_tour[tid]
-            stats["internal_booking_count"] += 1
-            stats["internal_pax"] += pax
-            if status == "paid":
-                stats["paid_booking_count"] += 1
-                stats["paid_pax"] += pax
-
-        for eb in external_bookings:
-            tid = to_int(eb.get("tour_id"), 0)
-            if tid not in booking_stats_by_tour:
-                continue
-            pax = max(0, to_int(eb.get("pax_count"), 0))
-            stats = booking_stats_by_tour[tid]
-            stats["external_booking_count"] += 1
-            stats["external_pax"] += pax
-
+        total_booking_count = 0
+        total_paid_bookings = 0
+        total_external_bookings = 0
         tour_booking_summaries = []
         for t in tours:
             tid = to_int(t.get("id"), 0)
-            booking_stats = booking_stats_by_tour.get(
-                tid,
-                {
-                    "internal_booking_count": 0,
-                    "internal_pax": 0,
-                    "paid_booking_count": 0,
-                    "paid_pax": 0,
-                    "external_booking_count": 0,
-                    "external_pax": 0,
-                },
-            )
+            rollup = rollups_by_tour.get(tid) or {}
+            booking_stats = {field: to_int(rollup.get(field), 0) for field in ROLLUP_COUNTER_FIELDS}
             t.update(booking_stats)
+            t["booked_pax"] = booking_stats["active_pax"] + booking_stats["external_pax"]
             t["total_booking_count"] = booking_stats["internal_booking_count"] + booking_stats["external_booking_count"]
             t["total_pax_count"] = booking_stats["internal_pax"] + booking_stats["external_pax"]
 
-            tour_profit = profit_by_tour.get(
-                tid,
-                {"organizer_profit": Decimal("0.00"), "admin_commission": Decimal("0.00")},
-            )
-            t["organizer_profit"] = tour_profit["organizer_profit"]
-            t["admin_commission"] = tour_profit["admin_commission"]
-            total_profit += tour_profit["organizer_profit"]
-            total_admin_commission += tour_profit["admin_commission"]
+            t["organizer_profit"] = Decimal(str(rollup.get("organizer_profit") or 0))
+            t["admin_commission"] = Decimal(str(rollup.get("admin_commission") or 0))
+            total_profit += t["organizer_profit"]
+            total_admin_commission += t["admin_commission"]
+            total_booking_count += t["total_booking_count"]
+            total_paid_bookings += booking_stats["paid_booking_count"]
+            total_external_bookings += booking_stats["external_booking_count"]
             tour_booking_summaries.append(
                 {
                     "tour_id": tid,
@@ -1138,8 +904,8 @@ def register_routes(app):
 
         analytics = {
             "total_tours": len(tours),
-            "total_bookings": len(bookings) + len(external_bookings),
-            "paid_bookings": sum(1 for b in bookings if (b.get("status") or "").lower() == "paid"),
+            "total_bookings": total_booking_count,
+            "paid_bookings": total_paid_bookings,
             "full_tours": sum(
                 1
                 for t in tours
@@ -1151,7 +917,7 @@ def register_routes(app):
             ),
             "total_spots": len(spots),
             "partner_hotels": len(hotel_options),
-            "external_bookings": len(external_bookings),
+            "external_bookings": total_external_bookings,
             "spot_requests": request_stats["total"],
             "pending_spot_requests": request_stats["pending"],
             "total_profit": f"{total_profit:.2f}",
@@ -1161,7 +927,6 @@ def register_routes(app):
         return render_template(
             "admin.html",
             tours=tours,
-            bookings=bookings,
             states=states,
             cities=cities,
             spots=spots,
@@ -1173,6 +938,7 @@ def register_routes(app):
             request_stats=request_stats,
             tour_booking_summaries=tour_booking_summaries,
             analytics=analytics,
+            import_jobs=list_user_jobs(session["user_id"], limit=5),
             panel_title="Organizer Panel",
         )
 
@@ -1192,6 +958,39 @@ def register_routes(app):
             if not owned_tour:
                 return jsonify({"error": "Tour not found for this organizer."}), 403
 
+        if request.args.get("radius_km"):
+            # Proximity mode: spots/hotels around lat/lng or a spot_id.
+            lat, lng, radius_km, limit, spot_id, error = parse_nearby_args()
+            if error:
+                return jsonify({"error": error}), 400
+            spots = nearby("spots", lat, lng, radius_km, limit=limit, exclude_id=spot_id or None)
+            hotels = nearby("hotels", lat, lng, radius_km, limit=limit)
+            return jsonify(
+                {
+                    "spots": [
+                        {
+                            "id": row["id"],
+                            "spot_name": row["name"],
+                            "image_url": row.get("image_url"),
+                            "photo_source": row.get("photo_source"),
+                            "city_name": row.get("city_name"),
+                            "distance_km": row["distance_km"],
+                        }
+                        for row in spots
+                    ],
+                    "hotels": [
+                        {
+                            "id": row["id"],
+                            "hotel_name": row["name"],
+                            "star_rating": row.get("star_rating"),
+                            "city_name": row.get("city_name"),
+                            "distance_km": row["distance_km"],
+                        }
+                        for row in hotels
+                    ],
+                }
+            )
+
         clause = ""
         params = []
         if city_id:
@@ -1222,3 +1021,79 @@ def register_routes(app):
             tuple(params),
         )
         return jsonify({"spots": spots, "hotels": hotels})
+
+    @app.route("/organizer/api/optimize-itinerary", methods=["POST"])
+    @login_required
+    @role_required("organizer")
+    def organizer_optimize_itinerary_api():
+        """Suggest a shorter order within each day for a draft or an owned tour.
+
+        Accepts the add-tour fields (``spots[]``/``day_numbers[]``), the same
+        lists as JSON (``spots``/``day_numbers``), or ``tour_id``.
+        """
+        payload = request.get_json(silent=True) or {}
+        tour_id = to_int(payload.get("tour_id") or request.form.get("tour_id"), 0)
+
+        if tour_id:
+            owned_tour = query_db(
+                "SELECT id FROM tours WHERE id=%s AND organizer_id=%s",
+                (tour_id, session["user_id"]),
+                one=True,
+            )
+            if not owned_tour:
+                return jsonify({"error": "Tour not found for this organizer."}), 403
+            draft = [
+                (int(row["spot_id"]), int(row["day_number"]))
+                for row in query_db(
+                    """
+                    SELECT spot_id, day_number
+                    FROM tour_itinerary
+                    WHERE tour_id=%s
+                    ORDER BY day_number ASC, order_sequence ASC, id ASC
+                    """,
+                    (tour_id,),
+                )
+            ]
+        else:
+            if payload:
+                spots = payload.get("spots") or []
+                day_numbers = payload.get("day_numbers") or []
+            else:
+                spots = request.form.getlist("spots[]")
+                day_numbers = request.form.getlist("day_numbers[]")
+            if not isinstance(spots, list) or not isinstance(day_numbers, list):
+                return jsonify({"error": "spots and day_numbers must be lists."}), 400
+            draft = []
+            for idx, spot_id_raw in enumerate(spots):
+                spot_id = to_int(spot_id_raw, 0)
+                if spot_id > 0:
+                    draft.append((spot_id, max(1, to_int(day_numbers[idx] if idx < len(day_numbers) else 1, 1))))
+
+        if not draft:
+            return jsonify({"error": "Add at least one valid itinerary spot."}), 400
+        if len(draft) > ITINERARY_OPTIMIZE_MAX_STOPS:
+            return jsonify({"error": f"At most {ITINERARY_OPTIMIZE_MAX_STOPS} itinerary spots can be optimised."}), 400
+
+        spot_ids = sorted({spot_id for spot_id, _ in draft})
+        spot_rows = query_db(
+            f"SELECT id, latitude, longitude FROM master_spots WHERE id IN ({', '.join(['%s'] * len(spot_ids))})",
+            tuple(spot_ids),
+        )
+        spot_map = {int(row["id"]): row for row in spot_rows}
+        if len(spot_map) != len(spot_ids):
+            return jsonify({"error": "One or more selected spots are invalid."}), 400
+
+        result = optimise_itinerary(
+            [
+                {
+                    "spot_id": spot_id,
+                    "day_number": day_number,
+                    "latitude": spot_map[spot_id]["latitude"],
+                    "longitude": spot_map[spot_id]["longitude"],
+                }
+                for spot_id, day_number in draft
+            ]
+        )
+        if tour_id:
+            result["tour_id"] = tour_id
+        return jsonify(result)
@@ -13,6 +13,7 @@ from core.helpers import (
     to_int,
     update_room_inventory_for_provider,
 )
+from core.templating import bump_data_version
 
 
 def register_routes(app):
@@ -49,7 +50,7 @@ def register_routes(app):
                 return None, f"You can upload maximum {MAX_HOTEL_PHOTOS} hotel photos."
             if not is_allowed_image_filename(file_obj.filename):
                 return None, "Hotel photos must be PNG, JPG, JPEG, or WEBP."
-            saved_name = save_upload(file_obj, app.config["UPLOAD_FOLDER"])
+            saved_name = save_upload(file_obj, app.config["UPLOAD_FOLDER"], make_derivatives=True)
             if not saved_name:
                 return None, "Unable to upload hotel photo."
             uploaded_photo_paths.append(saved_name)
@@ -414,6 +415,7 @@ def register_routes(app):
             cur.close()
             db.close()
 
+        bump_data_version("hotels")
         flash("Hotel listing created successfully.")
         return redirect(url_for("provider_hotels_management"))
 
@@ -522,6 +524,7 @@ def register_routes(app):
                         cancellation_policy or None, room_description or None,
                     ),
                 )
+                bump_data_version("hotels")
                 flash("Room type added.")
 
             elif action == "update_inventory":
@@ -830,6 +833,7 @@ def register_routes(app):
                     cur.close()
                     db.close()
 
+                bump_data_version("hotels")
                 flash(f"{uploaded_count} hotel photo(s) uploaded.")
                 return redirect(url_for("provider_hotel_manage_detail", service_id=service_id))
 
@@ -862,6 +866,7 @@ def register_routes(app):
                     cur.close()
                     db.close()
 
+                bump_data_version("hotels")
                 flash("Cover photo updated.")
                 return redirect(url_for("provider_hotel_manage_detail", service_id=service_id))
 
@@ -902,6 +907,7 @@ def register_routes(app):
                     cur.close()
                     db.close()
 
+                bump_data_version("hotels")
                 flash("Photo deleted.")
                 return redirect(url_for("provider_hotel_manage_detail", service_id=service_id))
 
@@ -1104,6 +1110,7 @@ def register_routes(app):
             db.commit()
             cur.close()
             db.close()
+            bump_data_version("hotels")
             flash("Hotel details updated successfully.")
             return redirect(url_for("provider_hotel_manage_detail", service_id=service_id))
 
@@ -19,6 +19,7 @@ from core.helpers import (
     save_upload,
     to_int,
 )
+from core.templating import LazyRows
 
 
 SIGNUP_DOCUMENT_INPUTS = {
@@ -109,6 +110,21 @@ def _spot_logo_meta(spot_name, spot_details=""):
     return {"logo_icon_class": "bi-geo-alt-fill", "logo_label": "Tourist Spot"}
 
 
+def _load_states():
+    return query_db("SELECT id, state_name FROM states ORDER BY state_name")
+
+
+def _load_cities():
+    return query_db(
+        """
+        SELECT c.id, c.city_name, c.state_id, s.state_name
+        FROM cities c
+        JOIN states s ON s.id=c.state_id
+        ORDER BY s.state_name, c.city_name
+        """
+    )
+
+
 def register_routes(app):
     @app.route("/")
     def home():
@@ -160,46 +176,40 @@ def register_routes(app):
 
         where_clause = f"WHERE {' AND '.join(where)}" if where else ""
 
-        spots_rows = query_db(
-            f"""
-            SELECT
-                ms.id AS spot_id,
-                ms.spot_name,
-                ms.image_url,
-                ms.photo_source,
-                ms.spot_details,
-                ms.latitude,
-                ms.longitude,
-                c.id AS city_id,
-                c.city_name,
-                s.id AS state_id,
-                s.state_name
-            FROM master_spots ms
-            JOIN cities c ON c.id=ms.city_id
-            JOIN states s ON s.id=c.state_id
-            {where_clause}
-            ORDER BY s.state_name, c.city_name, ms.spot_name
-            LIMIT 1000
-            """,
-            tuple(params),
-        )
-        for row in spots_rows:
-            row.update(_spot_logo_meta(row.get("spot_name", ""), row.get("spot_details", "")))
+        def load_spots():
+            rows = query_db(
+                f"""
+                SELECT
+                    ms.id AS spot_id,
+                    ms.spot_name,
+                    ms.image_url,
+                    ms.photo_source,
+                    ms.spot_details,
+                    ms.latitude,
+                    ms.longitude,
+                    c.id AS city_id,
+                    c.city_name,
+                    s.id AS state_id,
+                    s.state_name
+                FROM master_spots ms
+                JOIN cities c ON c.id=ms.city_id
+                JOIN states s ON s.id=c.state_id
+                {where_clause}
+                ORDER BY s.state_name, c.city_name, ms.spot_name
+                LIMIT 1000
+                """,
+                tuple(params),
+            )
+            for row in rows:
+                row.update(_spot_logo_meta(row.get("spot_name", ""), row.get("spot_details", "")))
+            return rows
 
-        states = query_db("SELECT id, state_name FROM states ORDER BY state_name")
-        cities = query_db(
-            """
-            SELECT c.id, c.city_name, c.state_id, s.state_name
-            FROM cities c
-            JOIN states s ON s.id=c.state_id
-            ORDER BY s.state_name, c.city_name
-            """
-        )
+        # Queries run only when their cached fragment has to be rendered.
         return render_template(
             "spots.html",
-            spots=spots_rows,
-            states=states,
-            cities=cities,
+            spots=LazyRows(load_spots),
+            states=LazyRows(_load_states),
+            cities=LazyRows(_load_cities),
             search=search,
             state_id=state_id,
             city_id=city_id,
@@ -434,49 +444,42 @@ def register_routes(app):
         }
         order_clause = sort_map.get(sort_by, sort_map["rating_high"])
 
-        hotel_rows = query_db(
-            f"""
-            SELECT
-                svc.id AS service_id,
-                hp.hotel_name,
-                hp.star_rating,
-                hp.locality,
-                hp.address_line1,
-                c.city_name,
-                s.state_name,
-                COALESCE(hi.image_url, 'demo.jpg') AS cover_image,
-                COALESCE(MIN(rt.base_price), svc.price, 0) AS starting_price,
-                COALESCE(SUM(rt.available_rooms), 0) AS total_available_rooms
-            FROM services svc
-            JOIN hotel_profiles hp ON hp.service_id=svc.id
-            LEFT JOIN cities c ON c.id=svc.city_id
-            LEFT JOIN states s ON s.id=c.state_id
-            LEFT JOIN hotel_images hi ON hi.service_id=svc.id AND hi.is_cover=1
-            LEFT JOIN hotel_room_types rt ON rt.service_id=svc.id
-            {where_clause}
-            GROUP BY
-                svc.id, hp.hotel_name, hp.star_rating, hp.locality, hp.address_line1,
-                c.city_name, s.state_name, hi.image_url, svc.price
-            {having_clause}
-            ORDER BY {order_clause}
-            """,
-            tuple(where_params + having_params),
-        )
-        states = query_db("SELECT id, state_name FROM states ORDER BY state_name")
-        cities = query_db(
-            """
-            SELECT c.id, c.city_name, c.state_id, s.state_name
-            FROM cities c
-            JOIN states s ON s.id=c.state_id
-            ORDER BY s.state_name, c.city_name
-            """
-        )
+        def load_hotels():
+            return query_db(
+                f"""
+                SELECT
+                    svc.id AS service_id,
+                    hp.hotel_name,
+                    hp.star_rating,
+                    hp.locality,
+                    hp.address_line1,
+                    c.city_name,
+                    s.state_name,
+                    COALESCE(hi.image_url, 'demo.jpg') AS cover_image,
+                    COALESCE(MIN(rt.base_price), svc.price, 0) AS starting_price,
+                    COALESCE(SUM(rt.available_rooms), 0) AS total_available_rooms
+                FROM services svc
+                JOIN hotel_profiles hp ON hp.service_id=svc.id
+                LEFT JOIN cities c ON c.id=svc.city_id
+                LEFT JOIN states s ON s.id=c.state_id
+                LEFT JOIN hotel_images hi ON hi.service_id=svc.id AND hi.is_cover=1
+                LEFT JOIN hotel_room_types rt ON rt.service_id=svc.id
+                {where_clause}
+                GROUP BY
+                    svc.id, hp.hotel_name, hp.star_rating, hp.locality, hp.address_line1,
+                    c.city_name, s.state_name, hi.image_url, svc.price
+                {having_clause}
+                ORDER BY {order_clause}
+                """,
+                tuple(where_params + having_params),
+            )
+
         return render_template(
             "hotels.html",
-            hotels=hotel_rows,
+            hotels=LazyRows(load_hotels),
             search=search,
-            states=states,
-            cities=cities,
+            states=LazyRows(_load_states),
+            cities=LazyRows(_load_cities),
             state_id=state_id,
             city_id=city_id,
             star_rating=star_rating,
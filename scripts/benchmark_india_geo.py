@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Benchmark the prepared point-in-India test against the plain ray cast.
+
+Random points are drawn over (and slightly beyond) India's bounding box. The
+script checks that every engine agrees with the reference and prints
+throughput for each one:
+
+    python scripts/benchmark_india_geo.py --points 200000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from core import india_geo
+from core.india_geo import is_point_in_india, is_point_in_india_reference, points_in_india
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark point-in-India engines.")
+    parser.add_argument("--points", type=int, default=100000, help="Number of random points.")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per engine (best is reported).")
+    return parser.parse_args()
+
+
+def best_time(fn, repeat: int) -> tuple[float, list[bool]]:
+    best = None
+    result = []
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main() -> None:
+    args = parse_args()
+    rng = random.Random(args.seed)
+    lats = [rng.uniform(5.0, 38.5) for _ in range(args.points)]
+    lngs = [rng.uniform(67.0, 98.5) for _ in range(args.points)]
+
+    started = time.perf_counter()
+    prepared = india_geo._prepared_india()
+    build_seconds = time.perf_counter() - started
+    if prepared is not None:
+        boundary_cells = sum(1 for status in prepared.raster if status == india_geo._CELL_BOUNDARY)
+        print(
+            f"Prepared geometry in {build_seconds * 1000:.1f} ms: {prepared.rows}x{prepared.cols} raster, "
+            f"{boundary_cells / len(prepared.raster):.1%} boundary cells, {india_geo.LATITUDE_BANDS} latitude bands."
+        )
+
+    engines = [
+        ("reference (per point)", lambda: [is_point_in_india_reference(a, b) for a, b in zip(lats, lngs)]),
+        ("prepared (per point)", lambda: [is_point_in_india(a, b) for a, b in zip(lats, lngs)]),
+        (
+            "points_in_india (batch, NumPy)" if india_geo.np is not None else "points_in_india (batch, no NumPy)",
+            lambda: points_in_india(lats, lngs),
+        ),
+    ]
+
+    baseline_seconds = None
+    expected = None
+    print(f"{'engine':<34}{'total ms':>10}{'points/s':>14}{'speedup':>9}{'mismatches':>12}")
+    for name, fn in engines:
+        seconds, result = best_time(fn, args.repeat)
+        if expected is None:
+            expected = result
+            baseline_seconds = seconds
+        mismatches = sum(1 for got, want in zip(result, expected) if got != want)
+        print(
+            f"{name:<34}{seconds * 1000:>10.1f}{args.points / max(seconds, 1e-9):>14,.0f}"
+            f"{baseline_seconds / max(seconds, 1e-9):>8.1f}x{mismatches:>12}"
+        )
+    print(f"{sum(expected)} of {args.points} points inside India.")
+
+
+if __name__ == "__main__":
+    main()
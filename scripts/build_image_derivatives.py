@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Generate thumb/card/hero WebP + JPEG derivatives for existing uploads.
+
+New uploads get derivatives when saved; run this once to backfill older
+files (e.g. static/uploads/spots) and again after replacing originals.
+Requires Pillow.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from core.config import UPLOAD_FOLDER
+from core.images import Image, derivative_relpath, generate_derivatives, iter_local_images
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Backfill resized image derivatives for uploads.")
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        help="Upload-relative image paths (e.g. spots/Aru_Valley.jpg). Default: every image under uploads.",
+    )
+    parser.add_argument("--force", action="store_true", help="Regenerate even if derivatives are up to date.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Parallel worker processes.")
+    return parser.parse_args()
+
+
+def _build(args: tuple[str, str, bool]) -> tuple[str, int]:
+    image_value, upload_root, force = args
+    return image_value, len(generate_derivatives(image_value, upload_root, force=force))
+
+
+def main() -> None:
+    args = parse_args()
+    if Image is None:
+        raise SystemExit("Pillow is required: pip install Pillow")
+
+    upload_root = str(ROOT_DIR / UPLOAD_FOLDER)
+    images = args.paths or sorted(iter_local_images(upload_root))
+    jobs = [(image_value, upload_root, args.force) for image_value in images]
+
+    processed = 0
+    written = 0
+    with ProcessPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        for image_value, count in pool.map(_build, jobs, chunksize=8):
+            processed += 1
+            written += count
+            if count:
+                print(f"[image] {image_value}: {count} derivative(s)")
+
+    original_bytes = 0
+    card_bytes = 0
+    for image_value in images:
+        original_path = os.path.join(upload_root, image_value)
+        card_path = os.path.join(upload_root, derivative_relpath(image_value, "card", "webp"))
+        if os.path.isfile(original_path) and os.path.isfile(card_path):
+            original_bytes += os.path.getsize(original_path)
+            card_bytes += os.path.getsize(card_path)
+    print(f"Images scanned: {processed}, derivatives written: {written}")
+    if card_bytes:
+        print(
+            f"Originals: {original_bytes / 1048576:.1f} MB -> card WebP: {card_bytes / 1048576:.1f} MB "
+            f"({original_bytes / card_bytes:.1f}x smaller)"
+        )
+
+
+if __name__ == "__main__":
+    main()
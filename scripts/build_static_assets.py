@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""Bundle, minify and precompress static CSS and JS.
+
+Each bundle in ``core.assets.ASSET_BUNDLES`` is concatenated into
+``static/bundles`` (run scripts/vendor_assets.py first; a missing vendor
+file fails the build), minified per source and precompressed. For every ``static/css/**/*.css`` and
+``static/js/**/*.js`` this also writes:
+- ``name.min.css`` / ``name.min.js``
+- ``.gz`` siblings, plus ``.br`` siblings when the ``brotli`` package is
+  installed, for both the source and the minified file
+
+With STATIC_PRECOMPRESSED on, ``core.static_files`` links the ``.min`` file
+while it is at least as new as its source. It serves the compressed
+siblings per ``Accept-Encoding``. Re-run after editing assets. Stale outputs
+are ignored until then.
+
+The minifiers are conservative:
+- CSS loses comments and redundant whitespace
+- JS loses comments and indentation but keeps line breaks, so automatic
+  semicolon insertion is unaffected
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import os
+import re
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from core.assets import ASSET_BUNDLES, BUNDLE_FOLDER, render_bundle
+from core.compression import brotli
+
+ASSET_DIRS = {"css": ".css", "js": ".js"}
+GENERATED_SUFFIXES = (".gz", ".br")
+
+_CSS_TOKEN_RE = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')|(/\*[\s\S]*?\*/)')
+_CSS_SPACE_RE = re.compile(r"\s+")
+_CSS_PUNCT_RE = re.compile(r"\s*([{};,>])\s*")
+# Characters after which "/" starts a regex literal rather than a division.
+_JS_REGEX_PRECEDERS = set("(,=:[!&|?{};+-*%<>~^\n")
+_JS_REGEX_KEYWORDS = ("return", "typeof", "case", "do", "else", "in", "of", "void", "yield")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Bundle, minify and precompress static CSS/JS.")
+    parser.add_argument("--static-dir", default=str(ROOT_DIR / "static"), help="Static folder to process.")
+    parser.add_argument("--force", action="store_true", help="Rebuild outputs even if they are up to date.")
+    parser.add_argument("--clean", action="store_true", help="Delete generated files instead of building.")
+    return parser.parse_args()
+
+
+def minify_css(text: str) -> str:
+    out = []
+    last = 0
+    for match in _CSS_TOKEN_RE.finditer(text):
+        out.append(_minify_css_segment(text[last : match.start()]))
+        if match.group(1):
+            out.append(match.group(1))
+        elif match.group(2).startswith("/*!"):
+            out.append(match.group(2))
+        last = match.end()
+    out.append(_minify_css_segment(text[last:]))
+    return "".join(out).replace(";}", "}").strip() + "\n"
+
+
+def _minify_css_segment(segment: str) -> str:
+    segment = _CSS_SPACE_RE.sub(" ", segment)
+    segment = _CSS_PUNCT_RE.sub(r"\1", segment)
+    # Only after ":" — a space before it can be a descendant selector.
+    return segment.replace(": ", ":")
+
+
+def _js_regex_allowed(out: list[str]) -> bool:
+    previous = "".join(out[-3:]).rstrip(" \t")
+    if not previous:
+        return True
+    if previous[-1] in _JS_REGEX_PRECEDERS:
+        return True
+    word = re.search(r"[A-Za-z_$][\w$]*$", previous)
+    return bool(word) and word.group(0) in _JS_REGEX_KEYWORDS
+
+
+def _skip_quoted(text: str, start: int, quote: str) -> int:
+    index = start + 1
+    while index < len(text):
+        char = text[index]
+        if char == "\\":
+            index += 2
+            continue
+        if char == quote:
+            return index + 1
+        if char == "\n" and quote != "`":
+            break
+        index += 1
+    return index
+
+
+def _skip_regex(text: str, start: int) -> int:
+    index = start + 1
+    in_class = False
+    while index < len(text) and text[index] != "\n":
+        char = text[index]
+        if char == "\\":
+            index += 2
+            continue
+        if char == "[":
+            in_class = True
+        elif char == "]":
+            in_class = False
+        elif char == "/" and not in_class:
+            index += 1
+            while index < len(text) and (text[index].isalnum() or text[index] == "_"):
+                index += 1
+            return index
+        index += 1
+    return index
+
+
+def minify_js(text: str) -> str:
+    out: list[str] = []
+    index = 0
+    while index < len(text):
+        char = text[index]
+        pair = text[index : index + 2]
+        if char in "\"'`":
+            end = _skip_quoted(text, index, char)
+            out.append(text[index:end])
+            index = end
+        elif pair == "//":
+            end = text.find("\n", index)
+            index = len(text) if end < 0 else end
+        elif pair == "/*":
+            end = text.find("*/", index + 2)
+            comment_end = len(text) if end < 0 else end + 2
+            if text.startswith("/*!", index):
+                out.append(text[index:comment_end])
+            elif "\n" in text[index:comment_end]:
+                out.append("\n")
+            else:
+                out.append(" ")
+            index = comment_end
+        elif char == "/" and _js_regex_allowed(out):
+            end = _skip_regex(text, index)
+            out.append(text[index:end])
+            index = end
+        else:
+            out.append(char)
+            index += 1
+    lines = []
+    for line in "".join(out).splitlines():
+        line = re.sub(r"[ \t]+", " ", line).strip()
+        if line:
+            lines.append(line)
+    return "\n".join(lines) + "\n"
+
+
+MINIFIERS = {".css": minify_css, ".js": minify_js}
+
+
+def _minify(text: str, ext: str) -> str:
+    return MINIFIERS[ext](text)
+
+
+def build_bundles(static_dir: Path, force: bool) -> int:
+    written = 0
+    bundle_dir = static_dir / BUNDLE_FOLDER
+    bundle_dir.mkdir(parents=True, exist_ok=True)
+    for name in ASSET_BUNDLES:
+        text, missing = render_bundle(str(static_dir), name, minify=_minify)
+        if text is None:
+            raise SystemExit(
+                f"[assets] Cannot build bundle {name}; missing {', '.join(missing)} (run scripts/vendor_assets.py)"
+            )
+        output = bundle_dir / name
+        _write_if_changed(output, text.encode("utf-8"))
+        written += 1 + precompress(output, force)
+        print(f"[assets] {BUNDLE_FOLDER}/{name}: {output.stat().st_size} bytes")
+    return written
+
+
+def iter_sources(static_dir: Path):
+    for folder, ext in ASSET_DIRS.items():
+        root = static_dir / folder
+        if not root.is_dir():
+            continue
+        for path in sorted(root.rglob(f"*{ext}")):
+            if not path.name.endswith(f".min{ext}"):
+                yield path
+
+
+def _up_to_date(output: Path, source: Path) -> bool:
+    return output.exists() and output.stat().st_mtime >= source.stat().st_mtime
+
+
+def _write_if_changed(path: Path, data: bytes) -> None:
+    if path.exists() and path.read_bytes() == data:
+        # Bump the mtime so the output counts as fresh for its source.
+        os.utime(path)
+        return
+    temp_path = path.with_name(path.name + ".tmp")
+    temp_path.write_bytes(data)
+    os.replace(temp_path, path)
+
+
+def precompress(path: Path, force: bool) -> int:
+    data = path.read_bytes()
+    written = 0
+    outputs = [(path.with_name(path.name + ".gz"), lambda: gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        outputs.append((path.with_name(path.name + ".br"), lambda: brotli.compress(data, quality=11)))
+    for output, build in outputs:
+        if force or not _up_to_date(output, path):
+            _write_if_changed(output, build())
+            written += 1
+    return written
+
+
+def build(static_dir: Path, force: bool) -> None:
+    sources = 0
+    written = build_bundles(static_dir, force)
+    original_bytes = 0
+    minified_bytes = 0
+    gzip_bytes = 0
+    for source in iter_sources(static_dir):
+        sources += 1
+        minified = source.with_name(f"{source.stem}.min{source.suffix}")
+        if force or not _up_to_date(minified, source):
+            text = source.read_text(encoding="utf-8")
+            _write_if_changed(minified, MINIFIERS[source.suffix](text).encode("utf-8"))
+            written += 1
+        for path in (source, minified):
+            written += precompress(path, force)
+        original_bytes += source.stat().st_size
+        minified_bytes += minified.stat().st_size
+        gzip_bytes += minified.with_name(minified.name + ".gz").stat().st_size
+        relative = source.relative_to(static_dir)
+        print(f"[assets] {relative}: {source.stat().st_size} -> {minified.stat().st_size} bytes minified")
+
+    print(
+        f"[assets] {sources} source file(s), {written} output(s) written; "
+        f"{original_bytes} bytes -> {minified_bytes} minified -> {gzip_bytes} gzip"
+        + ("" if brotli is not None else " (install brotli for .br variants)")
+    )
+
+
+def clean(static_dir: Path) -> None:
+    removed = 0
+    for source in iter_sources(static_dir):
+        minified = source.with_name(f"{source.stem}.min{source.suffix}")
+        candidates = [minified]
+        for path in (source, minified):
+            candidates += [path.with_name(path.name + suffix) for suffix in GENERATED_SUFFIXES]
+        for path in candidates:
+            if path.exists():
+                path.unlink()
+                removed += 1
+    for name in ASSET_BUNDLES:
+        output = static_dir / BUNDLE_FOLDER / name
+        for path in [output] + [output.with_name(output.name + suffix) for suffix in GENERATED_SUFFIXES]:
+            if path.exists():
+                path.unlink()
+                removed += 1
+    print(f"[assets] Removed {removed} generated file(s).")
+
+
+def main() -> None:
+    args = parse_args()
+    static_dir = Path(args.static_dir).resolve()
+    if args.clean:
+        clean(static_dir)
+    else:
+        build(static_dir, args.force)
+
+
+if __name__ == "__main__":
+    main()
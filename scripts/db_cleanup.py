@@ -19,6 +19,7 @@ if str(ROOT_DIR) not in sys.path:
     sys.path.insert(0, str(ROOT_DIR))
 
 from core.config import MYSQL_CONFIG
+from core.rollups import rebuild_tour_rollups
 
 
 LEGACY_TABLES = [
@@ -58,6 +59,9 @@ TRANSACTION_TABLES = [
     "tour_service_links",
     "tour_itinerary",
 ]
+# Derived from bookings/payments; rebuilt after a truncate so organizer
+# dashboards do not keep showing wiped revenue.
+ROLLUP_TABLE = "organizer_tour_rollups"
 
 
 def parse_args() -> argparse.Namespace:
@@ -159,6 +163,11 @@ def maybe_truncate_app_data(cur, apply: bool) -> int:
             changed += 1
     if apply:
         cur.execute("SET FOREIGN_KEY_CHECKS=1")
+    if table_exists(cur, ROLLUP_TABLE):
+        log_step("EXECUTE:" if apply else "DRY-RUN:", f"rebuild `{ROLLUP_TABLE}`")
+        if apply:
+            rebuild_tour_rollups(cur)
+            changed += 1
     return changed
 
 
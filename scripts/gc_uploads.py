@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""Remove uploaded files that no database row references.
+
+The upload tree (spots/, documents/, hotels/, cas/ ...) is scanned once and
+compared against every upload column (core.storage.UPLOAD_REFERENCE_COLUMNS),
+each read with a single streaming query. Unreferenced files older than the
+grace period are moved to the quarantine folder, or deleted with --delete.
+Resized derivatives whose original is gone are removed too.
+
+Default behavior is dry-run. Use --apply to execute.
+"""
+
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import os
+import sys
+import time
+from pathlib import Path
+
+import mysql.connector
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from core.config import (
+    DERIVED_UPLOAD_FOLDER,
+    MYSQL_CONFIG,
+    UPLOAD_FOLDER,
+    UPLOAD_GC_GRACE_HOURS,
+    UPLOAD_QUARANTINE_FOLDER,
+)
+from core.images import IMAGE_FORMATS, IMAGE_VARIANTS
+from core.storage import UPLOAD_REFERENCE_COLUMNS, normalize_upload_reference
+
+
+# Files templates use directly rather than through a DB row.
+ALWAYS_KEEP = ("demo.jpg",)
+FETCH_BATCH_SIZE = 5000
+DELETE_CHUNK_SIZE = 500
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Garbage-collect unreferenced uploads.")
+    parser.add_argument(
+        "--apply",
+        action="store_true",
+        help="Quarantine/delete orphans. Without this flag, dry-run mode is used.",
+    )
+    parser.add_argument(
+        "--delete",
+        action="store_true",
+        help=f"Delete orphans instead of moving them to {UPLOAD_QUARANTINE_FOLDER}.",
+    )
+    parser.add_argument(
+        "--grace-hours",
+        type=float,
+        default=UPLOAD_GC_GRACE_HOURS,
+        help="Keep unreferenced files modified within this many hours.",
+    )
+    parser.add_argument(
+        "--keep",
+        action="append",
+        default=[],
+        metavar="PATTERN",
+        help="Glob (relative to static/uploads) of files to always keep; repeatable.",
+    )
+    parser.add_argument("--verbose", action="store_true", help="List every orphan.")
+    return parser.parse_args()
+
+
+def scan_uploads(upload_root: str, derived_prefix: str) -> tuple[dict, dict]:
+    """Return ``(originals, derived)``: {relpath: (size, mtime)} for each tree."""
+    originals: dict[str, tuple[int, float]] = {}
+    derived: dict[str, tuple[int, float]] = {}
+    stack = [""]
+    while stack:
+        rel_dir = stack.pop()
+        with os.scandir(os.path.join(upload_root, rel_dir)) as entries:
+            for entry in entries:
+                relpath = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(relpath)
+                elif entry.is_file(follow_symlinks=False):
+                    stat = entry.stat(follow_symlinks=False)
+                    target = derived if relpath.startswith(derived_prefix) else originals
+                    target[relpath] = (stat.st_size, stat.st_mtime)
+    return originals, derived
+
+
+def column_exists(cur, table_name: str, column_name: str) -> bool:
+    cur.execute(
+        """
+        SELECT 1
+        FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE()
+          AND TABLE_NAME = %s
+          AND COLUMN_NAME = %s
+        LIMIT 1
+        """,
+        (table_name, column_name),
+    )
+    return cur.fetchone() is not None
+
+
+def referenced_paths(cur) -> set[str]:
+    referenced: set[str] = set()
+    for table_name, column_name, base in UPLOAD_REFERENCE_COLUMNS:
+        if not column_exists(cur, table_name, column_name):
+            continue
+        cur.execute(
+            f"SELECT DISTINCT `{column_name}` FROM `{table_name}` "
+            f"WHERE `{column_name}` IS NOT NULL AND `{column_name}` <> ''"
+        )
+        while True:
+            rows = cur.fetchmany(FETCH_BATCH_SIZE)
+            if not rows:
+                break
+            for (value,) in rows:
+                path = normalize_upload_reference(value, base)
+                if path:
+                    referenced.add(path)
+    return referenced
+
+
+def derived_source(relpath: str, derived_prefix: str) -> str | None:
+    """``derived/card/spots/x.jpg.webp`` -> ``spots/x.jpg``."""
+    parts = relpath[len(derived_prefix) :].split("/", 1)
+    if len(parts) != 2 or parts[0] not in IMAGE_VARIANTS:
+        return None
+    source, _, fmt = parts[1].rpartition(".")
+    if fmt not in IMAGE_FORMATS:
+        return None
+    return source
+
+
+def remove_file(relpath: str, upload_root: str, quarantine_root: str | None) -> None:
+    source = os.path.join(upload_root, relpath)
+    if quarantine_root:
+        # renames() also prunes directories left empty.
+        os.renames(source, os.path.join(quarantine_root, relpath))
+    else:
+        os.remove(source)
+
+
+def main() -> None:
+    args = parse_args()
+    apply = bool(args.apply)
+    upload_root = UPLOAD_FOLDER
+    derived_prefix = os.path.relpath(DERIVED_UPLOAD_FOLDER, UPLOAD_FOLDER).replace(os.sep, "/") + "/"
+    keep_patterns = [*ALWAYS_KEEP, *args.keep]
+    cutoff = time.time() - args.grace_hours * 3600
+
+    started = time.monotonic()
+    originals, derived = scan_uploads(upload_root, derived_prefix)
+    scan_seconds = time.monotonic() - started
+
+    started = time.monotonic()
+    conn = mysql.connector.connect(**MYSQL_CONFIG)
+    cur = conn.cursor()
+    try:
+        referenced = referenced_paths(cur)
+        query_seconds = time.monotonic() - started
+
+        orphans = [
+            relpath
+            for relpath, (_, mtime) in originals.items()
+            if relpath not in referenced
+            and mtime < cutoff
+            and not any(fnmatch.fnmatch(relpath, pattern) for pattern in keep_patterns)
+        ]
+        surviving = set(originals) - set(orphans)
+        orphan_derivatives = [
+            relpath
+            for relpath, (_, mtime) in derived.items()
+            if mtime < cutoff and derived_source(relpath, derived_prefix) not in surviving
+        ]
+
+        candidates = orphans + orphan_derivatives
+        sizes = {**originals, **derived}
+        orphan_bytes = sum(sizes[relpath][0] for relpath in candidates)
+        total_bytes = sum(size for size, _ in sizes.values())
+        if args.verbose:
+            for relpath in sorted(candidates):
+                print(f"{'EXECUTE:' if apply else 'DRY-RUN:'} {relpath}")
+
+        started = time.monotonic()
+        removed = 0
+        if apply and candidates:
+            quarantine_root = None
+            if not args.delete:
+                quarantine_root = os.path.join(UPLOAD_QUARANTINE_FOLDER, time.strftime("%Y%m%d%H%M%S"))
+            for relpath in candidates:
+                try:
+                    remove_file(relpath, upload_root, quarantine_root)
+                    removed += 1
+                except OSError as exc:
+                    print(f"[gc-warning] Could not remove {relpath}: {exc}")
+            for start in range(0, len(orphans), DELETE_CHUNK_SIZE):
+                chunk = orphans[start : start + DELETE_CHUNK_SIZE]
+                cur.execute(
+                    f"DELETE FROM stored_files WHERE storage_path IN ({','.join(['%s'] * len(chunk))})",
+                    tuple(chunk),
+                )
+            conn.commit()
+        action_seconds = time.monotonic() - started
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+        conn.close()
+
+    scanned = len(originals) + len(derived)
+    print(
+        f"Scanned {scanned} file(s) ({total_bytes / 1048576:.1f} MiB) in {scan_seconds:.2f}s "
+        f"({scanned / max(scan_seconds, 1e-6):.0f} files/s)."
+    )
+    print(f"Loaded {len(referenced)} referenced path(s) in {query_seconds:.2f}s.")
+    print(
+        f"Orphans older than {args.grace_hours:g}h: {len(orphans)} upload(s) + "
+        f"{len(orphan_derivatives)} derivative(s), {orphan_bytes / 1048576:.1f} MiB."
+    )
+    if apply:
+        verb = "Deleted" if args.delete else f"Quarantined to {UPLOAD_QUARANTINE_FOLDER}"
+        print(
+            f"{verb}: {removed} file(s) in {action_seconds:.2f}s "
+            f"({removed / max(action_seconds, 1e-6):.0f} files/s)."
+        )
+    else:
+        print("Dry-run complete. Re-run with --apply to execute.")
+
+
+if __name__ == "__main__":
+    main()
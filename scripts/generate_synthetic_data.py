@@ -0,0 +1,587 @@
+#!/usr/bin/env python3
+"""Generate a deterministic, production-scale dataset for load testing.
+
+Row counts are set per entity: users, organizers, hotel providers, cities,
+spots, tours with itineraries, hotels with room types, tour bookings with
+travelers and payments, and hotel bookings. Each table draws from its own
+random stream, so changing one count does not reshuffle the others. Output
+is identical for the same ``--seed``, counts and ``--anchor-date`` only
+when the starting database is the same too. Ids continue from the current
+``MAX(id)``, and the existing ``states`` and ``cities`` rows feed the
+generated data.
+
+Spots and hotels get coordinates inside India (``core.india_geo``),
+clustered around a per-city anchor point. Tour and hotel popularity is
+skewed, so a few listings collect most of the bookings, as in production.
+
+Methods:
+- ``insert``: multi-row INSERTs of ``--batch-size`` rows
+- ``load-data``: writes CSVs and runs ``LOAD DATA LOCAL INFILE``; the
+  server needs ``local_infile=ON``
+- ``csv``: only writes the CSVs to ``--csv-dir``
+
+Ids are allocated explicitly after the current ``MAX(id)`` of each table,
+and foreign-key checks are off for the session, so existing rows are left
+alone. Run it against a dedicated benchmark database (``MYSQL_DATABASE``):
+
+    python scripts/generate_synthetic_data.py --users 1000000 --tours 100000 \\
+        --hotels 50000 --bookings 10000000 --hotel-bookings 10000000 --method load-data
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import random
+import sys
+import tempfile
+import time
+from array import array
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+import mysql.connector
+from werkzeug.security import generate_password_hash
+
+from core.config import MYSQL_CONFIG
+from core.db import ensure_runtime_schema
+from core.india_geo import is_point_in_india
+from core.rollups import rebuild_tour_rollups
+from core.templating import bump_data_version
+
+SYNTHETIC_EMAIL_DOMAIN = "synthetic.tourgen.local"
+SYNTHETIC_PASSWORD = "Synthetic@2026"
+ID_PROOF_TYPE = "Aadhaar Card"
+ID_PROOF_FILE = "seed_id_proof.pdf"
+# India's bounding box; candidates are then tested against the polygon.
+INDIA_LAT_RANGE = (6.5, 35.5)
+INDIA_LNG_RANGE = (68.0, 97.5)
+SPOT_SPREAD_DEG = 0.15
+MAX_POINT_ATTEMPTS = 20
+CSV_NULL = r"\N"
+
+SPOT_KINDS = ("Fort", "Lake", "Temple", "Falls", "Valley", "Beach", "Palace", "Garden", "Caves", "Viewpoint")
+TOUR_THEMES = ("Heritage", "Hill Station", "Coastal", "Wildlife", "Pilgrimage", "Adventure", "Weekend", "Food Trail")
+TRAVEL_MODES = ("Bus", "Private Cab", "Train", "Flight", "Mixed")
+FOOD_PLANS = ("All Meals", "Breakfast + Dinner", "Breakfast Only", "No Meals")
+DIFFICULTY_LEVELS = ("easy", "moderate", "challenging")
+HOTEL_BRANDS = ("Residency", "Grand", "Inn", "Retreat", "Suites", "Palace", "Homestay", "Resort")
+ROOM_TYPES = (("Standard Room", "Double"), ("Deluxe Room", "Queen"), ("Suite", "King"), ("Family Room", "Twin"))
+HOTEL_BOOKING_STATUSES = ("confirmed", "checked_in", "completed", "cancelled")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate deterministic synthetic data for load tests.")
+    parser.add_argument("--seed", type=int, default=20260220, help="Random seed.")
+    parser.add_argument("--anchor-date", default="2026-01-01", help="Dates are spread around this day.")
+    parser.add_argument("--users", type=int, default=10000, help="Customer accounts.")
+    parser.add_argument("--organizers", type=int, default=0, help="Organizer accounts (default: users/500).")
+    parser.add_argument("--providers", type=int, default=0, help="Hotel provider accounts (default: hotels/5).")
+    parser.add_argument("--cities", type=int, default=0, help="Extra synthetic cities spread over existing states.")
+    parser.add_argument("--spots", type=int, default=5000, help="Spots (master_spots).")
+    parser.add_argument("--tours", type=int, default=1000, help="Tours.")
+    parser.add_argument("--stops-per-tour", type=int, default=6, help="Average itinerary stops per tour.")
+    parser.add_argument("--hotels", type=int, default=500, help="Hotels (services + hotel_profiles).")
+    parser.add_argument("--room-types-per-hotel", type=int, default=3, help="Room types per hotel.")
+    parser.add_argument("--bookings", type=int, default=20000, help="Tour bookings.")
+    parser.add_argument("--hotel-bookings", type=int, default=20000, help="Hotel bookings.")
+    parser.add_argument("--no-travelers", action="store_true", help="Skip booking_travelers rows.")
+    parser.add_argument("--method", choices=("insert", "load-data", "csv"), default="insert")
+    parser.add_argument("--batch-size", type=int, default=2000, help="Rows per multi-row INSERT.")
+    parser.add_argument("--csv-dir", default="", help="CSV output folder (default: a temporary folder).")
+    parser.add_argument("--skip-rollups", action="store_true", help="Do not rebuild organizer_tour_rollups.")
+    return parser.parse_args()
+
+
+def stream(seed: int, name: str) -> random.Random:
+    return random.Random(f"{seed}:{name}")
+
+
+def skewed_index(rng: random.Random, size: int) -> int:
+    """Index in ``range(size)`` favouring low values (roughly power-law)."""
+    return min(size - 1, int(size * rng.random() ** 3))
+
+
+class InsertWriter:
+    def __init__(self, connection, batch_size: int):
+        self.connection = connection
+        self.cur = connection.cursor()
+        self.batch_size = max(1, batch_size)
+        self.pending: dict[str, tuple[tuple[str, ...], list[tuple]]] = {}
+        self.counts: dict[str, int] = {}
+
+    def append(self, table: str, columns: tuple[str, ...], rows) -> None:
+        _, buffer = self.pending.setdefault(table, (columns, []))
+        for row in rows:
+            buffer.append(row)
+            if len(buffer) >= self.batch_size:
+                self._flush(table)
+
+    def _flush(self, table: str) -> None:
+        columns, buffer = self.pending[table]
+        if not buffer:
+            return
+        row_sql = "(" + ",".join(["%s"] * len(columns)) + ")"
+        self.cur.execute(
+            f"INSERT INTO `{table}`({','.join(columns)}) VALUES {','.join([row_sql] * len(buffer))}",
+            tuple(value for row in buffer for value in row),
+        )
+        self.connection.commit()
+        self.counts[table] = self.counts.get(table, 0) + len(buffer)
+        buffer.clear()
+
+    def finish(self) -> None:
+        for table in list(self.pending):
+            self._flush(table)
+
+
+class CsvWriter:
+    def __init__(self, folder: Path):
+        self.folder = folder
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self.files: dict[str, tuple[tuple[str, ...], object, object]] = {}
+        self.counts: dict[str, int] = {}
+
+    def path(self, table: str) -> Path:
+        return self.folder / f"{table}.csv"
+
+    def append(self, table: str, columns: tuple[str, ...], rows) -> None:
+        if table not in self.files:
+            handle = self.path(table).open("w", encoding="utf-8", newline="")
+            self.files[table] = (columns, handle, csv.writer(handle, lineterminator="\n"))
+        _, _, writer = self.files[table]
+        count = 0
+        for row in rows:
+            writer.writerow([CSV_NULL if value is None else value for value in row])
+            count += 1
+        self.counts[table] = self.counts.get(table, 0) + count
+
+    def finish(self) -> None:
+        for _, handle, _ in self.files.values():
+            handle.close()
+
+
+class LoadDataWriter(CsvWriter):
+    def __init__(self, connection, folder: Path):
+        super().__init__(folder)
+        self.connection = connection
+
+    def finish(self) -> None:
+        super().finish()
+        cur = self.connection.cursor()
+        for table, (columns, _, _) in self.files.items():
+            started = time.perf_counter()
+            cur.execute(
+                f"""
+                LOAD DATA LOCAL INFILE %s INTO TABLE `{table}`
+                CHARACTER SET utf8mb4
+                FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"'
+                LINES TERMINATED BY '\\n'
+                ({','.join(columns)})
+                """,
+                (str(self.path(table)),),
+            )
+            self.connection.commit()
+            print(f"[synthetic] loaded {table}: {self.counts[table]:,} rows in {time.perf_counter() - started:.1f}s")
+
+
+class Dataset:
+    """Generated ids and the per-entity facts later tables refer to."""
+
+    def __init__(self, args: argparse.Namespace, next_ids: dict[str, int], states, cities):
+        self.args = args
+        self.anchor = date.fromisoformat(args.anchor_date)
+        self.next_ids = next_ids
+        self.states = {int(row["id"]): row["state_name"] for row in states}
+        self.cities = [(int(row["id"]), int(row["state_id"]), row["city_name"]) for row in cities]
+        self.city_anchor: dict[int, tuple[float, float]] = {}
+        self.customer_ids = range(0)
+        self.organizer_ids = range(0)
+        self.provider_ids = range(0)
+        self.spots_by_city: dict[int, array] = {}
+        self.tour_ids = range(0)
+        self.tour_price = array("d")
+        self.tour_child_percent = array("d")
+        self.room_type_ids = range(0)
+        self.room_service = array("l")
+        self.room_price = array("d")
+        self.room_guests = array("b")
+
+    def allocate(self, table: str, count: int) -> range:
+        start = self.next_ids[table]
+        self.next_ids[table] = start + count
+        return range(start, start + count)
+
+
+def _point_in_india(rng: random.Random, center=None, spread=0.0) -> tuple[float, float]:
+    for _ in range(MAX_POINT_ATTEMPTS):
+        if center is None:
+            lat, lng = rng.uniform(*INDIA_LAT_RANGE), rng.uniform(*INDIA_LNG_RANGE)
+        else:
+            lat, lng = rng.gauss(center[0], spread), rng.gauss(center[1], spread)
+        if is_point_in_india(lat, lng):
+            return round(lat, 7), round(lng, 7)
+    return center if center is not None else (22.9734, 78.6569)
+
+
+def gen_cities(ds: Dataset, writer) -> None:
+    rng = stream(ds.args.seed, "cities")
+    state_ids = sorted(ds.states)
+    rows = []
+    for city_id in ds.allocate("cities", ds.args.cities):
+        state_id = rng.choice(state_ids)
+        name = f"Synthetic Town {city_id}"
+        rows.append((city_id, state_id, name))
+        ds.cities.append((city_id, state_id, name))
+    writer.append("cities", ("id", "state_id", "city_name"), rows)
+    anchor_rng = stream(ds.args.seed, "city-anchors")
+    for city_id, _, _ in ds.cities:
+        ds.city_anchor[city_id] = _point_in_india(anchor_rng)
+
+
+def gen_users(ds: Dataset, writer, password_hash: str) -> None:
+    rng = stream(ds.args.seed, "users")
+    organizers = ds.args.organizers or max(1, ds.args.users // 500)
+    providers = ds.args.providers or max(1, ds.args.hotels // 5)
+    ds.customer_ids = ds.allocate("users", ds.args.users)
+    ds.organizer_ids = ds.allocate("users", organizers)
+    ds.provider_ids = ds.allocate("users", providers)
+    user_columns = ("id", "full_name", "email", "phone", "password", "role", "status", "document_path")
+    profile_columns = (
+        "user_id", "requested_role", "city_id", "city", "district", "pincode",
+        "kyc_completed", "kyc_stage", "verification_badge",
+    )
+    for ids, role, requested_role in (
+        (ds.customer_ids, "customer", "traveler"),
+        (ds.organizer_ids, "organizer", "organizer"),
+        (ds.provider_ids, "hotel_provider", "hotel_provider"),
+    ):
+        users = []
+        profiles = []
+        for user_id in ids:
+            city_id, state_id, city_name = ds.cities[rng.randrange(len(ds.cities))]
+            users.append(
+                (
+                    user_id,
+                    f"{city_name} {role.replace('_', ' ').title()} {user_id}",
+                    f"{role}.{user_id}@{SYNTHETIC_EMAIL_DOMAIN}",
+                    str(6000000000 + user_id),
+                    password_hash,
+                    role,
+                    "approved",
+                    None,
+                )
+            )
+            profiles.append(
+                (user_id, requested_role, city_id, city_name, ds.states.get(state_id), str(100000 + rng.randrange(800000)),
+                 1, "verified", 1)
+            )
+            if len(users) >= 10000:
+                writer.append("users", user_columns, users)
+                writer.append("user_profiles", profile_columns, profiles)
+                users, profiles = [], []
+        writer.append("users", user_columns, users)
+        writer.append("user_profiles", profile_columns, profiles)
+
+
+def gen_spots(ds: Dataset, writer) -> None:
+    rng = stream(ds.args.seed, "spots")
+    columns = ("id", "spot_name", "image_url", "photo_source", "city_id", "latitude", "longitude", "spot_details")
+    by_city: dict[int, array] = {}
+
+    def rows():
+        for spot_id in ds.allocate("master_spots", ds.args.spots):
+            city_id, _, city_name = ds.cities[skewed_index(rng, len(ds.cities))]
+            lat, lng = _point_in_india(rng, ds.city_anchor[city_id], SPOT_SPREAD_DEG)
+            by_city.setdefault(city_id, array("l")).append(spot_id)
+            kind = rng.choice(SPOT_KINDS)
+            yield (
+                spot_id,
+                f"{city_name} {kind} {spot_id}",
+                "demo.jpg",
+                "local_file",
+                city_id,
+                lat,
+                lng,
+                f"A popular {kind.lower()} near {city_name}.",
+            )
+
+    writer.append("master_spots", columns, rows())
+    ds.spots_by_city = by_city
+
+
+def gen_tours(ds: Dataset, writer) -> None:
+    rng = stream(ds.args.seed, "tours")
+    ds.tour_ids = ds.allocate("tours", ds.args.tours)
+    tour_columns = (
+        "id", "organizer_id", "tour_status", "title", "description", "price", "start_date", "end_date",
+        "start_point", "end_point", "image_path", "travel_mode", "food_plan",
+        "pickup_state_id", "pickup_city_id", "drop_state_id", "drop_city_id",
+        "max_group_size", "min_group_size", "child_price_percent",
+        "departure_datetime", "return_datetime", "difficulty_level",
+    )
+    itinerary_columns = ("tour_id", "spot_id", "order_sequence", "day_number")
+    spot_cities = sorted(ds.spots_by_city)
+    city_lookup = {city_id: (state_id, name) for city_id, state_id, name in ds.cities}
+    tours = []
+    stops = []
+    for tour_id in ds.tour_ids:
+        pickup_city, pickup_state, pickup_name = ds.cities[rng.randrange(len(ds.cities))]
+        drop_city = spot_cities[skewed_index(rng, len(spot_cities))] if spot_cities else pickup_city
+        drop_state, drop_name = city_lookup[drop_city]
+        days = rng.randint(2, 9)
+        start = ds.anchor + timedelta(days=rng.randint(-180, 240))
+        end = start + timedelta(days=days - 1)
+        price = round(rng.lognormvariate(9.6, 0.5), -1)
+        child_percent = rng.choice((50.0, 60.0, 75.0, 100.0))
+        ds.tour_price.append(price)
+        ds.tour_child_percent.append(child_percent)
+        status = "closed" if end < ds.anchor else rng.choices(("open", "full"), (9, 1))[0]
+        departure = datetime.combine(start, datetime.min.time()) + timedelta(hours=rng.randint(5, 21))
+        tours.append(
+            (
+                tour_id,
+                ds.organizer_ids[rng.randrange(len(ds.organizer_ids))],
+                status,
+                f"{drop_name} {rng.choice(TOUR_THEMES)} Tour {tour_id}",
+                f"{days}-day trip from {pickup_name} to {drop_name}.",
+                price,
+                start,
+                end,
+                pickup_name,
+                drop_name,
+                "demo.jpg",
+                rng.choice(TRAVEL_MODES),
+                rng.choice(FOOD_PLANS),
+                pickup_state,
+                pickup_city,
+                drop_state,
+                drop_city,
+                rng.choice((12, 20, 30, 45)),
+                rng.choice((2, 4, 6)),
+                child_percent,
+                departure,
+                departure + timedelta(days=days - 1, hours=rng.randint(2, 10)),
+                rng.choice(DIFFICULTY_LEVELS),
+            )
+        )
+        city_spots = ds.spots_by_city.get(drop_city)
+        if city_spots:
+            count = min(len(city_spots), max(1, int(rng.gauss(ds.args.stops_per_tour, 2))))
+            for sequence, spot_id in enumerate(rng.sample(list(city_spots), count), start=1):
+                stops.append((tour_id, spot_id, sequence, min(days, 1 + (sequence - 1) * days // count)))
+        if len(tours) >= 5000:
+            writer.append("tours", tour_columns, tours)
+            writer.append("tour_itinerary", itinerary_columns, stops)
+            tours, stops = [], []
+    writer.append("tours", tour_columns, tours)
+    writer.append("tour_itinerary", itinerary_columns, stops)
+
+
+def gen_hotels(ds: Dataset, writer) -> None:
+    rng = stream(ds.args.seed, "hotels")
+    service_ids = ds.allocate("services", ds.args.hotels)
+    per_hotel = max(1, ds.args.room_types_per_hotel)
+    ds.room_type_ids = ds.allocate("hotel_room_types", ds.args.hotels * per_hotel)
+    service_columns = ("id", "provider_id", "service_type", "service_name", "price", "description", "city_id")
+    profile_columns = (
+        "service_id", "hotel_name", "brand_name", "star_rating", "address_line1", "locality", "pincode",
+        "check_in_time", "check_out_time", "hotel_description", "listing_status", "latitude", "longitude",
+    )
+    room_columns = (
+        "id", "service_id", "room_type_name", "bed_type", "room_size_sqft", "max_guests", "total_rooms",
+        "available_rooms", "base_price", "strike_price", "tax_percent", "breakfast_included", "ac_available",
+        "wifi_available", "refundable", "cancellation_policy", "room_description",
+    )
+    services, profiles, rooms = [], [], []
+    room_ids = iter(ds.room_type_ids)
+    for service_id in service_ids:
+        city_id, _, city_name = ds.cities[skewed_index(rng, len(ds.cities))]
+        lat, lng = _point_in_india(rng, ds.city_anchor[city_id], SPOT_SPREAD_DEG)
+        stars = rng.choices((1, 2, 3, 4, 5), (1, 3, 5, 3, 1))[0]
+        base = round(rng.lognormvariate(7.4 + stars * 0.3, 0.35), -1)
+        name = f"{city_name} {rng.choice(HOTEL_BRANDS)} {service_id}"
+        services.append(
+            (service_id, ds.provider_ids[rng.randrange(len(ds.provider_ids))], "Hotel", name, base,
+             f"{stars}-star stay in {city_name}.", city_id)
+        )
+        profiles.append(
+            (service_id, name, None, stars, f"{rng.randint(1, 400)} Main Road", city_name,
+             str(100000 + rng.randrange(800000)), "12:00", "11:00", f"{stars}-star stay in {city_name}.",
+             rng.choices(("active", "inactive"), (19, 1))[0], lat, lng)
+        )
+        for index in range(per_hotel):
+            room_id = next(room_ids)
+            room_name, bed = ROOM_TYPES[index % len(ROOM_TYPES)]
+            price = round(base * (1 + index * 0.35), -1)
+            guests = 2 + (index % 3)
+            total = rng.randint(4, 40)
+            ds.room_service.append(service_id)
+            ds.room_price.append(price)
+            ds.room_guests.append(guests)
+            rooms.append(
+                (room_id, service_id, room_name, bed, rng.randint(120, 450), guests, total, total, price,
+                 round(price * 1.2, -1), 12.0, index % 2, 1, 1, rng.randint(0, 1), "Free cancellation up to 48 hours.",
+                 f"{room_name} with {bed.lower()} bed.")
+            )
+        if len(services) >= 5000:
+            writer.append("services", service_columns, services)
+            writer.append("hotel_profiles", profile_columns, profiles)
+            writer.append("hotel_room_types", room_columns, rooms)
+            services, profiles, rooms = [], [], []
+    writer.append("services", service_columns, services)
+    writer.append("hotel_profiles", profile_columns, profiles)
+    writer.append("hotel_room_types", room_columns, rooms)
+
+
+def gen_bookings(ds: Dataset, writer) -> None:
+    rng = stream(ds.args.seed, "bookings")
+    booking_columns = (
+        "id", "user_id", "tour_id", "pax_count", "date", "status", "id_proof_type", "id_proof_number",
+        "id_proof_file_path", "guide_individual_requested", "room_rooms_requested",
+    )
+    traveler_columns = ("booking_id", "full_name", "age", "id_proof_type", "id_proof_number", "contact_number", "is_child")
+    payment_columns = ("booking_id", "amount", "admin_commission", "organizer_earning", "payment_provider", "paid")
+    if not ds.tour_ids:
+        return
+    bookings, travelers, payments = [], [], []
+    anchor = datetime.combine(ds.anchor, datetime.min.time())
+    for booking_id in ds.allocate("bookings", ds.args.bookings):
+        tour_index = skewed_index(rng, len(ds.tour_ids))
+        user_id = ds.customer_ids[rng.randrange(len(ds.customer_ids))]
+        pax = rng.choices((1, 2, 3, 4), (3, 5, 2, 2))[0]
+        status = rng.choices(("paid", "pending", "cancelled"), (6, 3, 1))[0]
+        booked_at = anchor - timedelta(seconds=rng.randrange(365 * 86400))
+        bookings.append(
+            (booking_id, user_id, ds.tour_ids[tour_index], pax, booked_at, status, ID_PROOF_TYPE,
+             str(rng.randrange(10**11, 10**12)), ID_PROOF_FILE, 0, 1)
+        )
+        children = 1 if pax > 1 and rng.random() < 0.25 else 0
+        if not ds.args.no_travelers:
+            contact = str(6000000000 + user_id)
+            for index in range(pax):
+                is_child = 1 if index >= pax - children else 0
+                travelers.append(
+                    (booking_id, f"Traveler {booking_id}-{index + 1}", rng.randint(6, 11) if is_child else rng.randint(19, 64),
+                     ID_PROOF_TYPE, str(rng.randrange(10**11, 10**12)), contact, is_child)
+                )
+        if status == "paid":
+            price = ds.tour_price[tour_index]
+            amount = round(price * (pax - children) + price * ds.tour_child_percent[tour_index] / 100 * children, 2)
+            commission = round(amount * 0.01, 2)
+            payments.append((booking_id, amount, commission, round(amount - commission, 2), "synthetic", 1))
+        if len(bookings) >= 10000:
+            writer.append("bookings", booking_columns, bookings)
+            writer.append("booking_travelers", traveler_columns, travelers)
+            writer.append("payments", payment_columns, payments)
+            bookings, travelers, payments = [], [], []
+    writer.append("bookings", booking_columns, bookings)
+    writer.append("booking_travelers", traveler_columns, travelers)
+    writer.append("payments", payment_columns, payments)
+
+
+def gen_hotel_bookings(ds: Dataset, writer) -> None:
+    rng = stream(ds.args.seed, "hotel_bookings")
+    columns = (
+        "user_id", "service_id", "room_type_id", "id_proof_type", "id_proof_number", "id_proof_file_path",
+        "check_in_date", "check_out_date", "rooms_booked", "guests_count", "nights", "total_amount", "status",
+    )
+    if not ds.room_type_ids:
+        return
+    rows = []
+    for _ in range(ds.args.hotel_bookings):
+        room_index = skewed_index(rng, len(ds.room_type_ids))
+        nights = rng.choices((1, 2, 3, 4, 7), (4, 4, 3, 2, 1))[0]
+        rooms = 1 if rng.random() < 0.85 else 2
+        check_in = ds.anchor + timedelta(days=rng.randint(-300, 120))
+        rows.append(
+            (ds.customer_ids[rng.randrange(len(ds.customer_ids))], ds.room_service[room_index],
+             ds.room_type_ids[room_index], ID_PROOF_TYPE, str(rng.randrange(10**11, 10**12)), ID_PROOF_FILE,
+             check_in, check_in + timedelta(days=nights), rooms, rng.randint(1, ds.room_guests[room_index] * rooms),
+             nights, round(ds.room_price[room_index] * nights * rooms, 2), rng.choice(HOTEL_BOOKING_STATUSES))
+        )
+        if len(rows) >= 10000:
+            writer.append("hotel_bookings", columns, rows)
+            rows = []
+    writer.append("hotel_bookings", columns, rows)
+
+
+def next_ids(cur, tables) -> dict[str, int]:
+    ids = {}
+    for table in tables:
+        cur.execute(f"SELECT COALESCE(MAX(id), 0) + 1 FROM `{table}`")
+        ids[table] = int(cur.fetchone()[0])
+    return ids
+
+
+def main() -> None:
+    args = parse_args()
+    ensure_runtime_schema()
+    connection = mysql.connector.connect(**MYSQL_CONFIG, allow_local_infile=args.method == "load-data")
+    cur = connection.cursor(dictionary=True)
+    cur.execute("SELECT id, state_name FROM states ORDER BY id")
+    states = cur.fetchall()
+    cur.execute("SELECT id, state_id, city_name FROM cities ORDER BY id")
+    cities = cur.fetchall()
+    if not states or (not cities and args.cities <= 0):
+        raise SystemExit("Load states and cities first, or pass --cities to create synthetic ones.")
+    cur.close()
+
+    cur = connection.cursor()
+    ids = next_ids(cur, ("cities", "users", "master_spots", "tours", "services", "hotel_room_types", "bookings"))
+    cur.execute("SET SESSION foreign_key_checks=0, unique_checks=0")
+
+    if args.method == "insert":
+        writer = InsertWriter(connection, args.batch_size)
+    else:
+        folder = Path(args.csv_dir) if args.csv_dir else Path(tempfile.mkdtemp(prefix="tourgen_synthetic_"))
+        writer = CsvWriter(folder) if args.method == "csv" else LoadDataWriter(connection, folder)
+
+    ds = Dataset(args, ids, states, cities)
+    password_hash = generate_password_hash(SYNTHETIC_PASSWORD)
+    started = time.perf_counter()
+    steps = (
+        ("cities", lambda: gen_cities(ds, writer)),
+        ("users", lambda: gen_users(ds, writer, password_hash)),
+        ("spots", lambda: gen_spots(ds, writer)),
+        ("tours", lambda: gen_tours(ds, writer)),
+        ("hotels", lambda: gen_hotels(ds, writer)),
+        ("bookings", lambda: gen_bookings(ds, writer)),
+        ("hotel bookings", lambda: gen_hotel_bookings(ds, writer)),
+    )
+    try:
+        for label, step in steps:
+            step_started = time.perf_counter()
+            step()
+            print(f"[synthetic] generated {label} in {time.perf_counter() - step_started:.1f}s")
+        writer.finish()
+        if args.method != "csv":
+            if not args.skip_rollups:
+                rebuild_tour_rollups(cur)
+            bump_data_version("geo", "spots", "hotels", "tours", cur=cur)
+            connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cur.execute("SET SESSION foreign_key_checks=1, unique_checks=1")
+        cur.close()
+        connection.close()
+
+    elapsed = time.perf_counter() - started
+    total = sum(writer.counts.values())
+    for table, count in sorted(writer.counts.items()):
+        print(f"[synthetic] {table:<20} {count:>12,}")
+    print(f"[synthetic] {total:,} rows in {elapsed:.1f}s ({total / max(elapsed, 1e-9):,.0f} rows/s), seed {args.seed}")
+    if isinstance(writer, CsvWriter):
+        print(f"[synthetic] CSV files in {writer.folder}")
+    print(f"[synthetic] Password for every synthetic account: {SYNTHETIC_PASSWORD}")
+    print("[synthetic] Run scripts/rebuild_route_metrics.py to compute itinerary route metrics.")
+
+
+if __name__ == "__main__":
+    main()
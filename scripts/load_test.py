@@ -0,0 +1,714 @@
+#!/usr/bin/env python3
+"""Load-test the hot routes and record latency and DB work per route.
+
+Virtual users loop over weighted scenarios until ``--duration`` runs out:
+- ``browse``: anonymous ``/``, ``/tour`` and ``/hotels`` with random
+  filters, ``/spots``, and hotel and tour detail pages
+- ``booking``: a customer logs in, books a tour with travelers and an ID
+  proof, pays (manual provider) and opens the invoice and ``/mybookings``
+- ``organizer``: an organizer opens the dashboard and the resources API
+- ``admin``: an admin opens the console, the summary and table APIs
+  (needs ``--admin-login``; skipped otherwise)
+
+``--mode wsgi`` drives the app in-process through Flask's test client.
+``--mode http`` sends real requests to ``--base-url``, or to a threaded
+server started in-process on a free port when no URL is given.
+
+Per route, the report gives RPS, p50/p95/p99 latency, the status mix and
+the page-cache hit ratio. DB queries per request come from the ``db``
+entry of the ``Server-Timing`` header (``core.db_stats``). In wsgi mode
+the header is switched on automatically; an external server must run
+with ``DB_STATS_SERVER_TIMING=1``.
+
+Test data comes from the MySQL database in ``MYSQL_CONFIG``, normally one
+filled by scripts/generate_synthetic_data.py. Its accounts share one
+password (``--password``). The booking scenario writes bookings and
+payments, so use a benchmark database. Razorpay keys must be unset, so
+that manual payments are accepted.
+
+Results are written as JSON. ``--compare`` prints the change against an
+earlier result:
+
+    python scripts/load_test.py --mode wsgi --duration 60 --concurrency 8
+    python scripts/load_test.py --mode http --base-url http://127.0.0.1:5001 \\
+        --compare benchmarks/results/<earlier>.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import http.client
+import io
+import json
+import math
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import urlencode, urlsplit
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+# Must be set before core.config is imported (in-process app only).
+os.environ.setdefault("DB_STATS_SERVER_TIMING", "1")
+if "--no-page-cache" in sys.argv[1:]:
+    os.environ["PAGE_CACHE_ENABLED"] = "0"
+
+import mysql.connector
+
+from core.config import MYSQL_CONFIG
+
+# Matches scripts/generate_synthetic_data.py.
+SYNTHETIC_PASSWORD = "Synthetic@2026"
+SYNTHETIC_EMAIL_DOMAIN = "synthetic.tourgen.local"
+DEFAULT_WEIGHTS = "browse=70,booking=15,organizer=10,admin=5"
+DEFAULT_RESULTS_DIR = ROOT_DIR / "benchmarks" / "results"
+SAMPLE_LIMIT = 5000
+ID_PROOF_PDF = b"%PDF-1.4\n1 0 obj<<>>endobj\ntrailer<<>>\n%%EOF\n"
+TOUR_SORTS = ("latest", "price_low", "price_high", "group_small", "date_soon")
+HOTEL_SORTS = ("rating_high", "latest", "price_low", "price_high")
+SEARCH_TERMS = ("Fort", "Lake", "Temple", "Beach", "Valley", "Heritage", "Hill")
+PERCENTILES = (50, 95, 99)
+DATASET_TABLES = ("users", "tours", "tour_itinerary", "master_spots", "services", "bookings", "payments", "hotel_bookings")
+
+_DB_TIMING_RE = re.compile(r'(?:^|,)\s*db;dur=([\d.]+);desc="(\d+) queries"')
+_PAYMENT_PATH_RE = re.compile(r"/payment/(\d+)")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load-test TourGen's hot routes.")
+    parser.add_argument("--mode", choices=("wsgi", "http"), default="wsgi")
+    parser.add_argument("--base-url", default="", help="Server for --mode http (default: start one in-process).")
+    parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds.")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Unmeasured seconds before the measurement.")
+    parser.add_argument("--concurrency", type=int, default=4, help="Virtual users (threads).")
+    parser.add_argument("--scenarios", default=DEFAULT_WEIGHTS, help="Weights as name=weight,...")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="Pause between scenario runs.")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for the virtual users.")
+    parser.add_argument("--password", default=SYNTHETIC_PASSWORD, help="Password of the synthetic accounts.")
+    parser.add_argument("--admin-login", default="", help="Admin email or phone for the admin scenario.")
+    parser.add_argument("--admin-password", default="", help="Admin password.")
+    parser.add_argument("--accept-encoding", default="gzip", help="Accept-Encoding sent with every request.")
+    parser.add_argument("--no-page-cache", action="store_true", help="Disable the page cache of the in-process app.")
+    parser.add_argument("--output", default="", help="Result JSON path (default: benchmarks/results/...).")
+    parser.add_argument("--compare", default="", help="Earlier result JSON to compare against.")
+    return parser.parse_args()
+
+
+def parse_weights(text: str) -> dict[str, float]:
+    weights = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if not name:
+            continue
+        if name not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario {name!r}; choose from {', '.join(SCENARIOS)}.")
+        weights[name] = float(weight or 1)
+    return {name: weight for name, weight in weights.items() if weight > 0}
+
+
+class Response:
+    __slots__ = ("status", "headers", "size")
+
+    def __init__(self, status: int, headers: dict[str, str], size: int):
+        self.status = status
+        self.headers = headers
+        self.size = size
+
+
+class WsgiSession:
+    """One virtual user's cookie jar on top of Flask's test client."""
+
+    def __init__(self, app, accept_encoding: str):
+        self.client = app.test_client()
+        self.accept_encoding = accept_encoding
+
+    def request(self, method, path, data=None, files=None) -> Response:
+        if files:
+            data = dict(data or {})
+            for field, (filename, content) in files.items():
+                data[field] = (io.BytesIO(content), filename)
+        response = self.client.open(
+            path, method=method, data=data, headers={"Accept-Encoding": self.accept_encoding}
+        )
+        body = response.get_data()
+        headers = {key.lower(): value for key, value in response.headers.items()}
+        if "server-timing" in headers:
+            headers["server-timing"] = ", ".join(response.headers.getlist("Server-Timing"))
+        return Response(response.status_code, headers, len(body))
+
+
+class HttpSession:
+    """Keep-alive HTTP connection with a minimal cookie jar."""
+
+    def __init__(self, base_url: str, accept_encoding: str):
+        parts = urlsplit(base_url)
+        self.connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self.netloc = parts.netloc
+        self.prefix = parts.path.rstrip("/")
+        self.accept_encoding = accept_encoding
+        self.cookies: dict[str, str] = {}
+        self.connection = None
+
+    def _encode(self, data, files):
+        if not files:
+            return urlencode(data or {}, doseq=True).encode("utf-8"), "application/x-www-form-urlencoded"
+        boundary = uuid.uuid4().hex
+        body = io.BytesIO()
+        for name, value in (data or {}).items():
+            for item in value if isinstance(value, (list, tuple)) else [value]:
+                body.write(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{item}\r\n'.encode())
+        for name, (filename, content) in files.items():
+            body.write(
+                f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                "Content-Type: application/octet-stream\r\n\r\n".encode()
+            )
+            body.write(content + b"\r\n")
+        body.write(f"--{boundary}--\r\n".encode())
+        return body.getvalue(), f"multipart/form-data; boundary={boundary}"
+
+    def request(self, method, path, data=None, files=None) -> Response:
+        headers = {"Accept-Encoding": self.accept_encoding}
+        if self.cookies:
+            headers["Cookie"] = "; ".join(f"{name}={value}" for name, value in self.cookies.items())
+        body = None
+        if method != "GET":
+            body, headers["Content-Type"] = self._encode(data, files)
+        for attempt in (1, 2):
+            if self.connection is None:
+                self.connection = self.connection_class(self.netloc, timeout=60)
+            try:
+                self.connection.request(method, self.prefix + path, body=body, headers=headers)
+                response = self.connection.getresponse()
+                payload = response.read()
+                break
+            except (http.client.HTTPException, ConnectionError):
+                # The server closed an idle keep-alive connection; retry once.
+                self.connection.close()
+                self.connection = None
+                if attempt == 2:
+                    raise
+        for cookie in response.headers.get_all("Set-Cookie") or ():
+            name, _, value = cookie.split(";", 1)[0].partition("=")
+            if value and "max-age=0" not in cookie.lower():
+                self.cookies[name.strip()] = value
+            else:
+                self.cookies.pop(name.strip(), None)
+        headers = {key.lower(): value for key, value in response.getheaders()}
+        timing = response.headers.get_all("Server-Timing")
+        if timing:
+            headers["server-timing"] = ", ".join(timing)
+        if response.will_close:
+            self.connection.close()
+            self.connection = None
+        return Response(response.status, headers, len(payload))
+
+
+class RouteStats:
+    __slots__ = ("latencies", "statuses", "queries", "db_ms", "bytes", "cache_hits", "failures")
+
+    def __init__(self):
+        self.latencies: list[float] = []
+        self.statuses: Counter = Counter()
+        self.queries: list[int] = []
+        self.db_ms: list[float] = []
+        self.bytes = 0
+        self.cache_hits = 0
+        self.failures = 0
+
+
+class Recorder:
+    def __init__(self, measure_from: float):
+        self.measure_from = measure_from
+        self.lock = threading.Lock()
+        self.routes: dict[str, RouteStats] = {}
+        self.outcomes: dict[str, Counter] = {}
+
+    def measuring(self, started: float) -> bool:
+        return started >= self.measure_from
+
+    def record(self, label, started, seconds, response=None):
+        if not self.measuring(started):
+            return
+        with self.lock:
+            stats = self.routes.setdefault(label, RouteStats())
+            stats.latencies.append(seconds)
+            if response is None:
+                stats.statuses["exception"] += 1
+                stats.failures += 1
+                return
+            stats.statuses[str(response.status)] += 1
+            if response.status >= 400:
+                stats.failures += 1
+            stats.bytes += response.size
+            if response.headers.get("x-page-cache") == "HIT":
+                stats.cache_hits += 1
+            match = _DB_TIMING_RE.search(response.headers.get("server-timing", ""))
+            if match:
+                stats.db_ms.append(float(match.group(1)))
+                stats.queries.append(int(match.group(2)))
+
+    def outcome(self, scenario, started, result):
+        if self.measuring(started):
+            with self.lock:
+                self.outcomes.setdefault(scenario, Counter())[result] += 1
+
+
+class StepFailed(Exception):
+    pass
+
+
+class VirtualUser:
+    def __init__(self, index, session, dataset, recorder, args):
+        self.index = index
+        self.session = session
+        self.dataset = dataset
+        self.recorder = recorder
+        self.args = args
+        self.rng = random.Random(f"{args.seed}:{index}")
+        self.logged_in_as = None
+
+    def call(self, label, method, path, data=None, files=None, expect=(200,)) -> Response:
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, path, data=data, files=files)
+        except Exception as exc:
+            self.recorder.record(label, started, time.perf_counter() - started)
+            raise StepFailed(f"{label}: {exc}") from exc
+        self.recorder.record(label, started, time.perf_counter() - started, response)
+        if response.status not in expect:
+            raise StepFailed(f"{label}: HTTP {response.status}")
+        return response
+
+    def login(self, role, login, password):
+        if self.logged_in_as == (role, login):
+            return
+        if self.logged_in_as is not None:
+            self.call("GET /logout", "GET", "/logout", expect=(302,))
+        response = self.call("POST /login", "POST", "/login", {"login": login, "password": password}, expect=(302,))
+        if "/login" in urlsplit(response.headers.get("location", "")).path:
+            self.logged_in_as = None
+            raise StepFailed(f"login failed for {login}")
+        self.logged_in_as = (role, login)
+
+    def pick(self, name):
+        values = self.dataset[name]
+        if not values:
+            raise StepFailed(f"no {name} in the database")
+        return values[self.rng.randrange(len(values))]
+
+
+def _maybe(rng, probability, value):
+    return value if rng.random() < probability else None
+
+
+def _query(params) -> str:
+    params = {key: value for key, value in params.items() if value not in (None, "")}
+    return f"?{urlencode(params)}" if params else ""
+
+
+def scenario_browse(vu: VirtualUser) -> None:
+    rng = vu.rng
+    vu.call("GET /", "GET", "/")
+    state_id, city_id = vu.pick("cities")
+    tour_filters = {
+        "search": _maybe(rng, 0.2, rng.choice(SEARCH_TERMS)),
+        "state_id": _maybe(rng, 0.3, state_id),
+        "destination_city_id": _maybe(rng, 0.3, city_id),
+        "min_price": _maybe(rng, 0.2, rng.choice((2000, 5000, 10000))),
+        "max_price": _maybe(rng, 0.2, rng.choice((15000, 25000, 50000))),
+        "group_members": _maybe(rng, 0.2, rng.randint(1, 6)),
+        "sort_by": _maybe(rng, 0.5, rng.choice(TOUR_SORTS)),
+    }
+    vu.call("GET /tour", "GET", "/tour" + _query(tour_filters))
+    vu.call("GET /booking/<id>", "GET", f"/booking/{vu.pick('tours')}")
+    hotel_filters = {
+        "state_id": _maybe(rng, 0.3, state_id),
+        "city_id": _maybe(rng, 0.4, city_id),
+        "star_rating": _maybe(rng, 0.3, rng.randint(2, 5)),
+        "sort_by": _maybe(rng, 0.5, rng.choice(HOTEL_SORTS)),
+    }
+    vu.call("GET /hotels", "GET", "/hotels" + _query(hotel_filters))
+    vu.call("GET /hotels/<id>", "GET", f"/hotels/{vu.pick('hotels')}")
+    spot_filters = {"state_id": _maybe(rng, 0.3, state_id), "city_id": _maybe(rng, 0.5, city_id)}
+    vu.call("GET /spots", "GET", "/spots" + _query(spot_filters))
+
+
+def scenario_booking(vu: VirtualUser) -> None:
+    rng = vu.rng
+    vu.login("customer", vu.pick("customers"), vu.args.password)
+    tour_id = vu.pick("open_tours")
+    vu.call("GET /booking/<id>", "GET", f"/booking/{tour_id}")
+    pax = rng.choice((1, 2, 2, 3))
+    form = {
+        "pax_count": pax,
+        "traveler_full_name[]": [f"Load Traveler {index + 1}" for index in range(pax)],
+        "traveler_age[]": [rng.randint(18, 60) for _ in range(pax)],
+        "traveler_id_proof_type[]": ["Aadhaar Card"] * pax,
+        "traveler_id_proof_number[]": [str(rng.randrange(10**11, 10**12)) for _ in range(pax)],
+        "traveler_contact[]": ["9000000000"] * pax,
+        "booking_id_proof_type": "Aadhaar Card",
+        "booking_id_proof_number": str(rng.randrange(10**11, 10**12)),
+    }
+    response = vu.call(
+        "POST /booking/<id>",
+        "POST",
+        f"/booking/{tour_id}",
+        form,
+        files={"booking_id_proof_file": ("id_proof.pdf", ID_PROOF_PDF)},
+        expect=(302,),
+    )
+    match = _PAYMENT_PATH_RE.search(response.headers.get("location", ""))
+    if not match:
+        # Full tour, already paid, or rejected form: the app sent us back.
+        raise StepFailed("booking was not accepted")
+    booking_id = match.group(1)
+    vu.call("GET /payment/<id>", "GET", f"/payment/{booking_id}")
+    vu.call("POST /payment/<id>", "POST", f"/payment/{booking_id}", {"payment_provider": "manual"}, expect=(302,))
+    vu.call("GET /invoice/<id>", "GET", f"/invoice/{booking_id}")
+    vu.call("GET /mybookings", "GET", "/mybookings")
+
+
+def scenario_organizer(vu: VirtualUser) -> None:
+    vu.login("organizer", vu.pick("organizers"), vu.args.password)
+    vu.call("GET /organizer", "GET", "/organizer")
+    _, city_id = vu.pick("cities")
+    vu.call("GET /organizer/api/resources", "GET", f"/organizer/api/resources?city_id={city_id}")
+
+
+def scenario_admin(vu: VirtualUser) -> None:
+    vu.login("admin", vu.args.admin_login, vu.args.admin_password)
+    vu.call("GET /admin", "GET", "/admin")
+    vu.call("GET /admin/api/summary", "GET", "/admin/api/summary")
+    for table in ("bookings", "tours", "users"):
+        vu.call("GET /admin/api/tables/<key>", "GET", f"/admin/api/tables/{table}?limit=50")
+
+
+SCENARIOS = {
+    "browse": scenario_browse,
+    "booking": scenario_booking,
+    "organizer": scenario_organizer,
+    "admin": scenario_admin,
+}
+
+
+def load_dataset() -> tuple[dict[str, list], dict[str, int]]:
+    """Ids and accounts the scenarios draw from, plus approximate table sizes."""
+    connection = mysql.connector.connect(**MYSQL_CONFIG)
+    cur = connection.cursor()
+    queries = {
+        "tours": f"SELECT id FROM tours ORDER BY id DESC LIMIT {SAMPLE_LIMIT}",
+        "open_tours": f"""
+            SELECT id FROM tours
+            WHERE tour_status='open' AND start_date>=CURDATE()
+            ORDER BY id DESC LIMIT {SAMPLE_LIMIT}
+        """,
+        "hotels": f"SELECT service_id FROM hotel_profiles WHERE listing_status='active' LIMIT {SAMPLE_LIMIT}",
+        "cities": f"""
+            SELECT DISTINCT drop_state_id, drop_city_id FROM tours
+            WHERE drop_state_id IS NOT NULL AND drop_city_id IS NOT NULL
+            LIMIT {SAMPLE_LIMIT}
+        """,
+        "customers": f"""
+            SELECT email FROM users
+            WHERE role='customer' AND status='approved' AND email LIKE '%@{SYNTHETIC_EMAIL_DOMAIN}'
+            ORDER BY id LIMIT {SAMPLE_LIMIT}
+        """,
+        "organizers": f"""
+            SELECT email FROM users
+            WHERE role='organizer' AND status='approved' AND email LIKE '%@{SYNTHETIC_EMAIL_DOMAIN}'
+            ORDER BY id LIMIT {SAMPLE_LIMIT}
+        """,
+    }
+    dataset = {}
+    try:
+        for name, sql in queries.items():
+            cur.execute(sql)
+            rows = cur.fetchall()
+            dataset[name] = [tuple(row) if len(row) > 1 else row[0] for row in rows]
+        cur.execute(
+            f"""
+            SELECT table_name, table_rows FROM information_schema.tables
+            WHERE table_schema=DATABASE() AND table_name IN ({",".join(["%s"] * len(DATASET_TABLES))})
+            """,
+            DATASET_TABLES,
+        )
+        sizes = {str(name): int(rows or 0) for name, rows in cur.fetchall()}
+    finally:
+        cur.close()
+        connection.close()
+    return dataset, sizes
+
+
+def check_scenarios(weights, dataset, args) -> dict[str, float]:
+    needs = {
+        "browse": ("tours", "hotels", "cities"),
+        "booking": ("customers", "open_tours"),
+        "organizer": ("organizers", "cities"),
+        "admin": (),
+    }
+    usable = {}
+    for name, weight in weights.items():
+        missing = [key for key in needs[name] if not dataset.get(key)]
+        if name == "admin" and not args.admin_login:
+            missing.append("--admin-login")
+        if missing:
+            print(f"[load-test] Skipping scenario {name}: no {', '.join(missing)}")
+            continue
+        usable[name] = weight
+    if not usable:
+        raise SystemExit("No runnable scenario; generate data with scripts/generate_synthetic_data.py first.")
+    return usable
+
+
+def make_session_factory(args):
+    """``(factory, target, shutdown)`` for the chosen mode."""
+    if args.mode == "http" and args.base_url:
+        args.page_cache = None
+        return (lambda: HttpSession(args.base_url, args.accept_encoding)), args.base_url, lambda: None
+
+    from app import app
+    from core import config
+
+    if args.no_page_cache and config.PAGE_CACHE_ENABLED:
+        raise SystemExit("--no-page-cache did not take effect; core.config was imported too early.")
+    args.page_cache = config.PAGE_CACHE_ENABLED
+
+    if args.mode == "wsgi":
+        return (lambda: WsgiSession(app, args.accept_encoding)), "in-process wsgi", lambda: None
+
+    from werkzeug.serving import make_server
+
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, name="load-test-server", daemon=True)
+    thread.start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    return (lambda: HttpSession(base_url, args.accept_encoding)), f"{base_url} (in-process server)", server.shutdown
+
+
+def run_load(args, weights, dataset, factory) -> tuple[Recorder, float]:
+    names = list(weights)
+    cumulative = []
+    total = 0.0
+    for name in names:
+        total += weights[name]
+        cumulative.append(total)
+
+    started = time.perf_counter()
+    recorder = Recorder(started + args.warmup)
+    stop_at = recorder.measure_from + args.duration
+
+    def worker(index):
+        vu = VirtualUser(index, factory(), dataset, recorder, args)
+        while time.perf_counter() < stop_at:
+            name = names[min(len(names) - 1, next_index(cumulative, vu.rng.random() * total))]
+            scenario_started = time.perf_counter()
+            try:
+                SCENARIOS[name](vu)
+                recorder.outcome(name, scenario_started, "completed")
+            except StepFailed:
+                recorder.outcome(name, scenario_started, "failed")
+            if args.think_ms:
+                time.sleep(args.think_ms / 1000.0)
+
+    threads = [threading.Thread(target=worker, args=(index,), daemon=True) for index in range(max(1, args.concurrency))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    measured = max(time.perf_counter() - recorder.measure_from, 1e-9)
+    return recorder, measured
+
+
+def next_index(cumulative, point) -> int:
+    for index, bound in enumerate(cumulative):
+        if point < bound:
+            return index
+    return len(cumulative) - 1
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000.0, 2)
+
+
+def _mean(values):
+    return round(sum(values) / len(values), 2) if values else None
+
+
+def summarize(recorder: Recorder, measured: float) -> tuple[dict, dict]:
+    routes = {}
+    everything = []
+    all_queries = []
+    failures = 0
+    for label, stats in sorted(recorder.routes.items()):
+        latencies = sorted(stats.latencies)
+        everything.extend(latencies)
+        all_queries.extend(stats.queries)
+        failures += stats.failures
+        routes[label] = {
+            "requests": len(latencies),
+            "rps": round(len(latencies) / measured, 2),
+            "failures": stats.failures,
+            "statuses": dict(sorted(stats.statuses.items())),
+            "mean_ms": _ms(sum(latencies) / len(latencies)) if latencies else None,
+            **{f"p{pct}_ms": _ms(percentile(latencies, pct)) for pct in PERCENTILES},
+            "max_ms": _ms(latencies[-1]) if latencies else None,
+            "db_queries_mean": _mean(stats.queries),
+            "db_queries_max": max(stats.queries) if stats.queries else None,
+            "db_ms_mean": _mean(stats.db_ms),
+            "bytes_mean": round(stats.bytes / len(latencies)) if latencies else 0,
+            "page_cache_hit_ratio": round(stats.cache_hits / len(latencies), 3) if latencies else 0.0,
+        }
+    everything.sort()
+    totals = {
+        "requests": len(everything),
+        "rps": round(len(everything) / measured, 2),
+        "failures": failures,
+        **{f"p{pct}_ms": _ms(percentile(everything, pct)) for pct in PERCENTILES},
+        "db_queries_mean": _mean(all_queries),
+    }
+    return totals, routes
+
+
+def git_state() -> dict:
+    def _git(*args):
+        try:
+            return subprocess.run(
+                ["git", *args], cwd=ROOT_DIR, capture_output=True, text=True, timeout=10, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            return ""
+
+    return {"commit": _git("rev-parse", "--short", "HEAD"), "dirty": bool(_git("status", "--porcelain", "--untracked-files=no"))}
+
+
+def _fmt(value, digits=1):
+    return "-" if value is None else f"{value:.{digits}f}"
+
+
+def print_report(totals, routes, outcomes):
+    header = f"{'route':<32} {'reqs':>7} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'fail':>5} {'q/req':>6} {'cache':>6}"
+    print(header)
+    print("-" * len(header))
+    for label, row in routes.items():
+        print(
+            f"{label:<32} {row['requests']:>7} {row['rps']:>8.1f} {_fmt(row['p50_ms']):>8} {_fmt(row['p95_ms']):>8} "
+            f"{_fmt(row['p99_ms']):>8} {row['failures']:>5} {_fmt(row['db_queries_mean']):>6} "
+            f"{row['page_cache_hit_ratio']:>6.0%}"
+        )
+    print("-" * len(header))
+    print(
+        f"{'total':<32} {totals['requests']:>7} {totals['rps']:>8.1f} {_fmt(totals['p50_ms']):>8} "
+        f"{_fmt(totals['p95_ms']):>8} {_fmt(totals['p99_ms']):>8} {totals['failures']:>5} "
+        f"{_fmt(totals['db_queries_mean']):>6}"
+    )
+    for name, counts in sorted(outcomes.items()):
+        print(f"[load-test] scenario {name}: {counts.get('completed', 0)} completed, {counts.get('failed', 0)} failed")
+    if routes and totals["db_queries_mean"] is None:
+        print("[load-test] No Server-Timing db entry seen; run the server with DB_STATS_SERVER_TIMING=1.")
+
+
+def _delta(new, old):
+    if new is None or old in (None, 0):
+        return "-"
+    return f"{(new - old) / old:+.0%}"
+
+
+def print_comparison(result, baseline_path):
+    with open(baseline_path, encoding="utf-8") as handle:
+        baseline = json.load(handle)
+    print(f"[load-test] Compared with {baseline_path} ({baseline['meta'].get('git', {}).get('commit') or '?'})")
+    header = f"{'route':<32} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'q/req':>12}"
+    print(header)
+    print("-" * len(header))
+    rows = list(result["routes"].items()) + [("total", result["totals"])]
+    old_rows = dict(baseline.get("routes", {}), total=baseline.get("totals", {}))
+    for label, row in rows:
+        old = old_rows.get(label)
+        if not old:
+            print(f"{label:<32} {'(new)':>8}")
+            continue
+        queries = f"{_fmt(old.get('db_queries_mean'))}->{_fmt(row.get('db_queries_mean'))}"
+        print(
+            f"{label:<32} {_delta(row['rps'], old.get('rps')):>8} {_delta(row['p50_ms'], old.get('p50_ms')):>8} "
+            f"{_delta(row['p95_ms'], old.get('p95_ms')):>8} {_delta(row['p99_ms'], old.get('p99_ms')):>8} "
+            f"{queries:>12}"
+        )
+
+
+def main() -> None:
+    args = parse_args()
+    weights = parse_weights(args.scenarios)
+    dataset, sizes = load_dataset()
+    weights = check_scenarios(weights, dataset, args)
+    factory, target, shutdown = make_session_factory(args)
+    started_at = datetime.now(timezone.utc)
+    print(
+        f"[load-test] {args.mode} -> {target}: {args.concurrency} users, "
+        f"{args.warmup:g}s warmup + {args.duration:g}s, scenarios {weights}"
+    )
+    try:
+        recorder, measured = run_load(args, weights, dataset, factory)
+    finally:
+        shutdown()
+
+    totals, routes = summarize(recorder, measured)
+    result = {
+        "meta": {
+            "started_at": started_at.isoformat(timespec="seconds"),
+            "git": git_state(),
+            "mode": args.mode,
+            "target": target,
+            "concurrency": args.concurrency,
+            "duration_s": round(measured, 2),
+            "warmup_s": args.warmup,
+            "think_ms": args.think_ms,
+            "seed": args.seed,
+            "scenarios": weights,
+            "accept_encoding": args.accept_encoding,
+            "page_cache": args.page_cache,
+            "python": platform.python_version(),
+            "dataset_rows": sizes,
+        },
+        "totals": totals,
+        "scenarios": {name: dict(counts) for name, counts in sorted(recorder.outcomes.items())},
+        "routes": routes,
+    }
+    print_report(totals, routes, recorder.outcomes)
+
+    if args.output:
+        output = Path(args.output)
+    else:
+        stamp = started_at.strftime("%Y%m%dT%H%M%SZ")
+        output = DEFAULT_RESULTS_DIR / f"{stamp}-{result['meta']['git']['commit'] or 'nogit'}-{args.mode}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with output.open("w", encoding="utf-8") as handle:
+        json.dump(result, handle, indent=2)
+        handle.write("\n")
+    print(f"[load-test] Results written to {output}")
+
+    if args.compare:
+        print_comparison(result, args.compare)
+
+
+if __name__ == "__main__":
+    main()
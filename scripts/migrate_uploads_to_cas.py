@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""Move legacy timestamp-named uploads into the content-addressed store.
+
+Files written by the old save_upload() (``<20-digit stamp>_<name>``) are
+hashed, stored once under ``cas/<aa>/<bb>/<sha256><ext>`` next to where they
+were, and every DB reference is rewritten. Identical uploads collapse into a
+single file. Hand-placed files (e.g. the spot library referenced by CSV
+imports) are left untouched.
+
+Default behavior is dry-run. Use --apply to execute.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import shutil
+import sys
+from pathlib import Path
+
+import mysql.connector
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from core.config import DERIVED_UPLOAD_FOLDER, DOC_UPLOAD_FOLDER, MYSQL_CONFIG, UPLOAD_FOLDER
+from core.storage import (
+    CAS_DIRNAME,
+    RECORD_STORED_FILE_SQL,
+    UPLOAD_REFERENCE_COLUMNS,
+    content_path,
+    hash_file,
+)
+
+
+LEGACY_NAME_RE = re.compile(r"^\d{20}_(.+)$")
+UPDATE_CHUNK_SIZE = 500
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Deduplicate legacy uploads into the content-addressed store.")
+    parser.add_argument(
+        "--apply",
+        action="store_true",
+        help="Move files and rewrite DB references. Without this flag, dry-run mode is used.",
+    )
+    return parser.parse_args()
+
+
+def _rel(path: str, root: str) -> str:
+    return os.path.relpath(path, root).replace(os.sep, "/")
+
+
+def find_legacy_uploads(upload_root: str) -> list[dict]:
+    derived_root = os.path.abspath(DERIVED_UPLOAD_FOLDER)
+    found = []
+    for dirpath, dirnames, filenames in os.walk(upload_root):
+        dirnames[:] = [
+            name
+            for name in dirnames
+            if name != CAS_DIRNAME and os.path.abspath(os.path.join(dirpath, name)) != derived_root
+        ]
+        for filename in filenames:
+            match = LEGACY_NAME_RE.match(filename)
+            if not match:
+                continue
+            source = os.path.join(dirpath, filename)
+            digest = hash_file(source)
+            target = os.path.join(dirpath, content_path(digest, os.path.splitext(filename)[1]))
+            found.append(
+                {
+                    "source": source,
+                    "target": target,
+                    "sha256": digest,
+                    "size": os.path.getsize(source),
+                    "original_name": match.group(1),
+                }
+            )
+    return found
+
+
+def build_value_maps(files: list[dict]) -> dict[str, dict[str, str]]:
+    """Old -> new DB values, keyed by the base each reference column uses."""
+    roots = {"uploads": UPLOAD_FOLDER, "documents": DOC_UPLOAD_FOLDER}
+    maps: dict[str, dict[str, str]] = {base: {} for base in roots}
+    for item in files:
+        for base, root in roots.items():
+            old_value = _rel(item["source"], root)
+            if not old_value.startswith("../"):
+                maps[base][old_value] = _rel(item["target"], root)
+    return maps
+
+
+def column_exists(cur, table_name: str, column_name: str) -> bool:
+    cur.execute(
+        """
+        SELECT 1
+        FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE()
+          AND TABLE_NAME = %s
+          AND COLUMN_NAME = %s
+        LIMIT 1
+        """,
+        (table_name, column_name),
+    )
+    return cur.fetchone() is not None
+
+
+def rewrite_references(cur, value_maps: dict[str, dict[str, str]], apply: bool) -> int:
+    changed_rows = 0
+    for table_name, column_name, base in UPLOAD_REFERENCE_COLUMNS:
+        mapping = value_maps.get(base) or {}
+        if not mapping or not column_exists(cur, table_name, column_name):
+            continue
+        old_values = list(mapping)
+        for start in range(0, len(old_values), UPDATE_CHUNK_SIZE):
+            chunk = old_values[start : start + UPDATE_CHUNK_SIZE]
+            placeholders = ",".join(["%s"] * len(chunk))
+            cur.execute(
+                f"SELECT `{column_name}`, COUNT(*) FROM `{table_name}` "
+                f"WHERE `{column_name}` IN ({placeholders}) GROUP BY `{column_name}`",
+                tuple(chunk),
+            )
+            for old_value, row_count in cur.fetchall():
+                new_value = mapping[old_value]
+                print(f"{'EXECUTE:' if apply else 'DRY-RUN:'} {table_name}.{column_name}: {old_value} -> {new_value} ({row_count} row(s))")
+                if apply:
+                    cur.execute(
+                        f"UPDATE `{table_name}` SET `{column_name}`=%s WHERE `{column_name}`=%s",
+                        (new_value, old_value),
+                    )
+                changed_rows += row_count
+    return changed_rows
+
+
+def main() -> None:
+    args = parse_args()
+    apply = bool(args.apply)
+
+    files = find_legacy_uploads(UPLOAD_FOLDER)
+    if not files:
+        print("No legacy uploads found.")
+        return
+
+    unique_targets = {item["target"] for item in files}
+    total_bytes = sum(item["size"] for item in files)
+    kept_bytes = sum({item["target"]: item["size"] for item in files}.values())
+    print(
+        f"Found {len(files)} legacy upload(s) -> {len(unique_targets)} unique file(s); "
+        f"{(total_bytes - kept_bytes) / 1024:.1f} KiB reclaimable."
+    )
+
+    conn = mysql.connector.connect(**MYSQL_CONFIG)
+    cur = conn.cursor()
+    try:
+        if apply:
+            # Copy first; originals are only removed once the DB commit succeeded.
+            for item in files:
+                if not os.path.isfile(item["target"]):
+                    os.makedirs(os.path.dirname(item["target"]), exist_ok=True)
+                    tmp_path = f"{item['target']}.tmp"
+                    shutil.copy2(item["source"], tmp_path)
+                    os.replace(tmp_path, item["target"])
+            cur.executemany(
+                RECORD_STORED_FILE_SQL,
+                [
+                    (item["sha256"], _rel(item["target"], UPLOAD_FOLDER), item["size"], item["original_name"][:255])
+                    for item in files
+                ],
+            )
+
+        changed_rows = rewrite_references(cur, build_value_maps(files), apply=apply)
+
+        if apply:
+            conn.commit()
+            for item in files:
+                os.remove(item["source"])
+            print(f"Completed. {changed_rows} DB reference(s) rewritten, {len(files)} legacy file(s) removed.")
+            print("Run scripts/build_image_derivatives.py to create resized images for the new paths.")
+        else:
+            conn.rollback()
+            print(f"Dry-run complete. {changed_rows} DB reference(s) would be rewritten.")
+            print("Re-run with --apply to execute.")
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
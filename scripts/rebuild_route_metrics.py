@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""Rebuild stored itinerary route metrics (tour_route_metrics).
+
+Metrics are written on tour creation and recomputed when spot coordinates
+change; run this after bulk coordinate edits or to backfill existing tours.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from core.db import ensure_runtime_schema, get_db
+from core.route_metrics import refresh_tour_route_metrics, tour_ids_for_spots
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Rebuild tour_route_metrics.")
+    parser.add_argument("--tour-id", type=int, action="append", default=[], help="Only this tour (repeatable).")
+    parser.add_argument(
+        "--spot-id",
+        type=int,
+        action="append",
+        default=[],
+        help="Only tours visiting this spot (repeatable).",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    ensure_runtime_schema()
+
+    tour_ids = set(args.tour_id) | set(tour_ids_for_spots(args.spot_id))
+    db = get_db()
+    cur = db.cursor()
+    try:
+        if not args.tour_id and not args.spot_id:
+            cur.execute("SELECT id FROM tours")
+            tour_ids = {row[0] for row in cur.fetchall()}
+        touched = refresh_tour_route_metrics(cur, tour_ids)
+        db.commit()
+        print(f"Route metrics rebuilt. Tours touched: {touched}")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        cur.close()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
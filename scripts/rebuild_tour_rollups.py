@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Rebuild organizer tour rollups from bookings, payments and external bookings.
+
+Rollups are kept current on every booking write; run this to repair them
+after manual data fixes, imports, or a failed refresh.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from core.db import ensure_runtime_schema, get_db
+from core.rollups import rebuild_tour_rollups, refresh_tour_rollups
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Rebuild organizer_tour_rollups.")
+    parser.add_argument("--organizer-id", type=int, default=0, help="Only rebuild this organizer's tours.")
+    parser.add_argument(
+        "--tour-id",
+        type=int,
+        action="append",
+        default=[],
+        help="Only refresh the given tour (repeatable).",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    ensure_runtime_schema()
+
+    db = get_db()
+    cur = db.cursor()
+    try:
+        if args.tour_id:
+            touched = refresh_tour_rollups(cur, args.tour_id)
+        else:
+            touched = rebuild_tour_rollups(cur, organizer_id=args.organizer_id or None)
+        db.commit()
+        print(f"Rollups rebuilt. Rows touched: {touched}")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        cur.close()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
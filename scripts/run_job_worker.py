@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Run background job workers (CSV imports and other long operations).
+
+Start one or more of these next to the web server:
+
+    python scripts/run_job_worker.py --threads 2
+
+Use --once to drain the queue and exit (handy for cron or manual runs).
+"""
+
+from __future__ import annotations
+
+import argparse
+import signal
+import sys
+import threading
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from core.config import JOB_POLL_SECONDS, JOB_WORKER_THREADS
+from core.db import ensure_runtime_schema
+from core.jobs import JOB_HANDLERS, requeue_stale_jobs, work_loop
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Process queued background jobs.")
+    parser.add_argument("--threads", type=int, default=JOB_WORKER_THREADS, help="Worker threads to run.")
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=JOB_POLL_SECONDS,
+        help="Seconds to wait between polls when the queue is empty.",
+    )
+    parser.add_argument("--once", action="store_true", help="Exit once the queue is empty.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    ensure_runtime_schema()
+
+    recovered = requeue_stale_jobs()
+    if recovered:
+        print(f"[job] Recovered {recovered} stale running job(s).")
+
+    stop_event = threading.Event()
+
+    def _stop(signum, _frame):
+        print(f"[job] Signal {signum} received, finishing current jobs...")
+        stop_event.set()
+
+    signal.signal(signal.SIGINT, _stop)
+    signal.signal(signal.SIGTERM, _stop)
+
+    thread_count = max(1, args.threads)
+    workers = [
+        threading.Thread(
+            target=work_loop,
+            args=(stop_event, args.poll_interval, args.once),
+            name=f"job-worker-{index + 1}",
+            daemon=True,
+        )
+        for index in range(thread_count)
+    ]
+    print(f"[job] Starting {thread_count} worker thread(s) for: {', '.join(sorted(JOB_HANDLERS))}")
+    for worker in workers:
+        worker.start()
+    # Join with a timeout so the main thread keeps handling signals.
+    while any(worker.is_alive() for worker in workers):
+        for worker in workers:
+            worker.join(timeout=1)
+    print("[job] Workers stopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,7 @@ from typing import Dict, List
 from werkzeug.security import generate_password_hash
 
 from core.db import get_db
+from core.rollups import refresh_tour_rollups
 
 
 SEED_EMAIL_PREFIX = "seed.traveler."
@@ -319,6 +320,7 @@ def main() -> None:
             if max_group > 0:
                 next_status = "full" if tour_remaining.get(tour_id, 0) <= 0 else "open"
                 cur.execute("UPDATE tours SET tour_status=%s WHERE id=%s", (next_status, tour_id))
+        refresh_tour_rollups(cur, touched_tours)
 
         # Create hotel bookings
         room_remaining = {int(r["room_type_id"]): int(r["available_rooms"] or 0) for r in room_types}
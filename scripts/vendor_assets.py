@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""Download the pinned frontend vendor files into static/vendor.
+
+The files and versions are listed in ``core.assets.VENDOR_ASSETS``. The
+committed ``static/vendor/vendor-lock.json`` pins every file by its SRI
+integrity value (``sha384-<base64>``), the form upstreams publish, so pins
+can be checked against the release notes. A download that does not match
+its pin, or that has no pin, is rejected. ``--update`` is the only way to
+record a new pin: verify the file first, then commit the lock.
+``--check`` verifies the local copies only. Afterwards, run
+scripts/build_static_assets.py to rebuild the bundles. The app does not
+start while a vendor file is missing (``core.assets.init_assets``).
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+from urllib import request as urlrequest
+from urllib.error import URLError
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from core.assets import VENDOR_ASSETS
+
+LOCK_FILE = "vendor/vendor-lock.json"
+DOWNLOAD_TIMEOUT_SECONDS = 30
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Vendor pinned CDN assets into static/vendor.")
+    parser.add_argument("--static-dir", default=str(ROOT_DIR / "static"), help="Static folder to write into.")
+    parser.add_argument("--update", action="store_true", help="Record pins for new or changed files.")
+    parser.add_argument("--check", action="store_true", help="Only verify local files against the lock file.")
+    return parser.parse_args()
+
+
+def _integrity(data: bytes) -> str:
+    return "sha384-" + base64.b64encode(hashlib.sha384(data).digest()).decode("ascii")
+
+
+def _load_lock(path: Path) -> dict:
+    if not path.exists():
+        return {}
+    with path.open(encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def _download(url: str) -> bytes:
+    req = urlrequest.Request(url, headers={"User-Agent": "tourgen-vendor-assets"})
+    with urlrequest.urlopen(req, timeout=DOWNLOAD_TIMEOUT_SECONDS) as response:
+        return response.read()
+
+
+def check(static_dir: Path, lock: dict) -> int:
+    failures = 0
+    for filename in VENDOR_ASSETS:
+        path = static_dir / filename
+        expected = (lock.get(filename) or {}).get("integrity")
+        if not expected:
+            print(f"[vendor] unpinned {filename}")
+            failures += 1
+        elif not path.exists():
+            print(f"[vendor] missing {filename}")
+            failures += 1
+        elif _integrity(path.read_bytes()) != expected:
+            print(f"[vendor] hash mismatch {filename}")
+            failures += 1
+    return failures
+
+
+def vendor(static_dir: Path, lock: dict, update: bool) -> int:
+    failures = 0
+    for filename, url in VENDOR_ASSETS.items():
+        try:
+            data = _download(url)
+        except (URLError, OSError) as exc:
+            print(f"[vendor] download failed {filename}: {exc}")
+            failures += 1
+            continue
+        integrity = _integrity(data)
+        entry = lock.get(filename) or {}
+        pinned = entry.get("integrity") if entry.get("url") == url else None
+        if integrity != pinned and not update:
+            reason = "hash mismatch" if pinned else "no pin in the lock file"
+            print(f"[vendor] {reason} for {filename}; not written (verify it, then use --update)")
+            failures += 1
+            continue
+        path = static_dir / filename
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(path.name + ".tmp")
+        temp_path.write_bytes(data)
+        os.replace(temp_path, path)
+        lock[filename] = {"url": url, "integrity": integrity, "bytes": len(data)}
+        print(f"[vendor] {filename}: {len(data)} bytes")
+    return failures
+
+
+def main() -> None:
+    args = parse_args()
+    static_dir = Path(args.static_dir).resolve()
+    lock_path = static_dir / LOCK_FILE
+    lock = _load_lock(lock_path)
+    if args.check:
+        failures = check(static_dir, lock)
+    else:
+        failures = vendor(static_dir, lock, args.update)
+        if args.update:
+            lock_path.parent.mkdir(parents=True, exist_ok=True)
+            with lock_path.open("w", encoding="utf-8") as handle:
+                json.dump(dict(sorted(lock.items())), handle, indent=2)
+                handle.write("\n")
+    if failures:
+        raise SystemExit(f"[vendor] {failures} file(s) failed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import random
+
+from core.itinerary_optimizer import optimise_itinerary
+
+
+def _stops(points_by_day):
+    stops = []
+    for day_number, points in enumerate(points_by_day, start=1):
+        for lat, lng in points:
+            stops.append(
+                {"spot_id": len(stops) + 1, "day_number": day_number, "latitude": lat, "longitude": lng}
+            )
+    return stops
+
+
+def test_reordered_day_does_not_lengthen_the_tour():
+    # Reordering day 1 on its own ends it far from day 2 (previously -885.9 km).
+    stops = _stops(
+        [
+            [(19.4138, 79.6545), (25.6321, 80.3063), (23.0810, 74.6186)],
+            [(23.0988, 74.4959), (20.5476, 79.5666)],
+            [(19.9322, 78.1914), (22.7848, 79.7091)],
+        ]
+    )
+    result = optimise_itinerary(stops)
+    assert result["saved_km"] >= 0
+    assert result["optimised_km"] <= result["original_km"]
+
+
+def test_random_multi_day_drafts_never_get_longer():
+    rng = random.Random(20260220)
+    for _ in range(500):
+        stop_count = rng.randint(3, 9)
+        day_count = rng.randint(2, 4)
+        stops = [
+            {
+                "spot_id": index + 1,
+                "day_number": 1 + (index * day_count) // stop_count,
+                "latitude": rng.uniform(19.0, 26.0),
+                "longitude": rng.uniform(74.0, 84.0),
+            }
+            for index in range(stop_count)
+        ]
+        result = optimise_itinerary(stops)
+        assert result["saved_km"] >= 0, stops
+        suggested = [spot_id for day in result["days"] for spot_id in day["spot_ids"]]
+        assert sorted(suggested) == [stop["spot_id"] for stop in stops]